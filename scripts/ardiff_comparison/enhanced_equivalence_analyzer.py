@@ -20,6 +20,12 @@ from dataclasses import dataclass
 from typing import List, Dict, Set, Tuple, Optional
 import hashlib
 
+try:
+    from path_corpus import PathCorpus
+    PATH_CORPUS_AVAILABLE = True
+except ImportError:
+    PATH_CORPUS_AVAILABLE = False
+
 @dataclass
 class ConstraintAnalysis:
     """约束分析结果"""
@@ -164,14 +170,18 @@ class ConstraintClassifier:
 class LayeredEquivalenceChecker:
     """分层等价性检查器"""
     
-    def __init__(self, timeout=30000):
+    def __init__(self, timeout=30000, corpus=None):
         self.timeout = timeout
         self.classifier = ConstraintClassifier()
         self.z3_total_time = 0.0
         self.z3_call_count = 0
+        self.corpus = corpus
     
     def extract_constraint_formula(self, file_path: str):
-        """从文件中提取约束公式（复用原有方法）"""
+        """从文件中提取约束公式（复用原有方法），优先读取打包语料"""
+        if self.corpus is not None and file_path in self.corpus:
+            return self.corpus.constraint_formula(file_path)
+        
         with open(file_path, 'r') as f:
             content = f.read()
         
@@ -465,9 +475,9 @@ class LayeredEquivalenceChecker:
 class EnhancedEquivalenceAnalyzer:
     """增强等价性分析器"""
     
-    def __init__(self, benchmark_dir: str = '.'):
+    def __init__(self, benchmark_dir: str = '.', corpus=None):
         self.benchmark_dir = benchmark_dir
-        self.checker = LayeredEquivalenceChecker()
+        self.checker = LayeredEquivalenceChecker(corpus=corpus)
         
     def analyze_path_pair(self, file1: str, file2: str) -> LayeredEquivalenceResult:
         """分析单个路径对"""
@@ -546,10 +556,17 @@ def main():
     parser.add_argument('--file2', help='第二个路径文件')
     parser.add_argument('--benchmark', default='.', help='基准测试目录')
     parser.add_argument('--output', default='layered_equivalence_report.txt', help='输出报告文件')
+    parser.add_argument('--corpus', help='打包路径语料文件 (path_corpus.py 生成)，替代逐个读取文本文件')
     
     args = parser.parse_args()
     
-    analyzer = EnhancedEquivalenceAnalyzer(args.benchmark)
+    corpus = None
+    if args.corpus:
+        if not PATH_CORPUS_AVAILABLE:
+            parser.error("--corpus 需要 path_corpus 模块 (src/symbolic_analysis/equivalence) 位于 PYTHONPATH 中")
+        corpus = PathCorpus(args.corpus)
+    
+    analyzer = EnhancedEquivalenceAnalyzer(args.benchmark, corpus)
     
     if args.file1 and args.file2:
               
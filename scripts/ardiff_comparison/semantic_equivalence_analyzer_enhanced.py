@@ -8,6 +8,7 @@
 """
 
 import re
+import ast
 import z3
 from z3 import *
 import glob
@@ -36,7 +37,7 @@ class ArrayStateComparator:
             if line.startswith('; 数组初始值:'):
                 try:
                     array_str = line.split(':', 1)[1].strip()
-                    array_initial = eval(array_str)                                
+                    array_initial = ast.literal_eval(array_str)                                
                 except:
                     pass
                     
@@ -44,7 +45,7 @@ class ArrayStateComparator:
             elif line.startswith('; 数组最终值:'):
                 try:
                     array_str = line.split(':', 1)[1].strip()
-                    array_final = eval(array_str)                                
+                    array_final = ast.literal_eval(array_str)                                
                 except:
                     pass
                     
@@ -10,25 +10,98 @@ import claripy
 import re
 import os
 import glob
+import time
+import json
 from claripy.backends.backend_z3 import claripy_solver_to_smt2
 import logging
 
+try:
+    from memory_optimized_analysis import MemoryBudget
+    MEMORY_BUDGET_AVAILABLE = True
+except ImportError:
+    MEMORY_BUDGET_AVAILABLE = False
+
+try:
+    from loop_summarization import LoopSummarizer
+    LOOP_SUMMARIZATION_AVAILABLE = True
+except ImportError:
+    LOOP_SUMMARIZATION_AVAILABLE = False
+
+try:
+    from state_merging import PostDominatorMerge, MERGE_WAIT_STASH
+    STATE_MERGING_AVAILABLE = True
+except ImportError:
+    STATE_MERGING_AVAILABLE = False
+
+try:
+    from project_cache import ProjectCache
+    PROJECT_CACHE_AVAILABLE = True
+except ImportError:
+    PROJECT_CACHE_AVAILABLE = False
+
+try:
+    from function_entry import build_function_entry_state, ARRAY_INIT_MODES
+    FUNCTION_ENTRY_AVAILABLE = True
+except ImportError:
+    FUNCTION_ENTRY_AVAILABLE = False
+    ARRAY_INIT_MODES = ('concrete', 'symbolic')
+
+try:
+    from concrete_execution import enable_unicorn, ConcreteExecutionStats
+    CONCRETE_EXECUTION_AVAILABLE = True
+except ImportError:
+    CONCRETE_EXECUTION_AVAILABLE = False
+
+try:
+    from path_streaming import StreamDeadended
+    PATH_STREAMING_AVAILABLE = True
+except ImportError:
+    PATH_STREAMING_AVAILABLE = False
+
+try:
+    from path_fingerprint import PathFingerprinter, record_multiplicity
+    PATH_FINGERPRINT_AVAILABLE = True
+except ImportError:
+    PATH_FINGERPRINT_AVAILABLE = False
+
+MERGE_MODES = ('none', 'veritesting', 'postdom')
+ENTRY_MODES = ('entry', 'function')
+
         
 logging.getLogger('angr').setLevel(logging.WARNING)
 logging.getLogger('claripy').setLevel(logging.WARNING)
 
-       
-symbolic_var_counter = 0
-symbolic_variables = {}
-
 class BenchmarkSymbolicExecution:
     """专门用于benchmark程序的符号执行"""
     
-    def __init__(self, binary_path, output_prefix=None, timeout=120):
+    def __init__(self, binary_path, output_prefix=None, timeout=120, memory_budget_mb=None, summarize_loops=False,
+                 merge_mode='none', project_cache=True, entry_mode='entry', target_function=None,
+                 array_init='concrete', unicorn=False, stream_paths=True, dedup_paths=False):
         self.binary_path = binary_path
         self.timeout = timeout
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_budget = None
+        self.summarize_loops = summarize_loops
+        self.loop_summarizer = None
+        self.merge_mode = merge_mode
+        self.state_merger = None
+        self.project_cache = ProjectCache() if project_cache and PROJECT_CACHE_AVAILABLE else None
+        self.project_cache_info = {'cache': 'disabled'}
+        self.entry_mode = entry_mode
+        self.target_function = target_function or self.default_target_function(binary_path, entry_mode)
+        self.array_init = array_init
+        self.function_entry = None
+        self.unicorn = unicorn
+        self.concrete_stats = None
+        self.stream_paths = stream_paths and PATH_STREAMING_AVAILABLE
+        self.path_streamer = None
+        self.exploration_start = None
+        self.dedup_paths = dedup_paths
+        self.path_fingerprinter = None
         self.project = None
+        self.symbolic_variables = {}
         self.paths_info = []
+        self.timing = {'setup_time': 0.0, 'exploration_time': 0.0, 'analysis_time': 0.0}
         
                 
         if output_prefix is None:
@@ -37,10 +110,22 @@ class BenchmarkSymbolicExecution:
         else:
             self.output_prefix = output_prefix
     
+    @staticmethod
+    def default_target_function(binary_path, entry_mode):
+        """function 入口模式下从 s121_O1 这类文件名推出内核函数名，否则沿用 s000"""
+        match = re.match(r'(\w+?)_O[0123s]$', os.path.basename(binary_path))
+        if entry_mode == 'function' and match:
+            return match.group(1)
+        return 's000'
+    
     def setup_project(self):
         """设置angr项目"""
-        self.project = angr.Project(self.binary_path, auto_load_libs=False)
-        print(f"加载二进制文件: {self.binary_path}")
+        if self.project_cache:
+            self.project, self.project_cache_info = self.project_cache.load(self.binary_path, auto_load_libs=False)
+            print(f"加载二进制文件: {self.binary_path} (项目缓存: {self.project_cache_info['cache']})")
+        else:
+            self.project = angr.Project(self.binary_path, auto_load_libs=False)
+            print(f"加载二进制文件: {self.binary_path}")
         
                 
         self.find_target_functions()
@@ -48,16 +133,23 @@ class BenchmarkSymbolicExecution:
     def find_target_functions(self):
         """查找目标函数"""
                   
-        s000_symbol = self.project.loader.find_symbol('s000')
+        s000_symbol = self.project.loader.find_symbol(self.target_function)
         if s000_symbol:
-            print(f"找到s000函数地址: 0x{s000_symbol.rebased_addr:x}")
+            print(f"找到{self.target_function}函数地址: 0x{s000_symbol.rebased_addr:x}")
             self.s000_addr = s000_symbol.rebased_addr
         else:
-            print("未找到s000函数，将分析整个main函数")
+            print(f"未找到{self.target_function}函数，将分析整个main函数")
             self.s000_addr = None
     
     def create_symbolic_state(self):
         """创建带符号变量的初始状态"""
+        if self.entry_mode == 'function':
+            if not FUNCTION_ENTRY_AVAILABLE:
+                raise RuntimeError("函数级入口需要 function_entry 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            if self.s000_addr:
+                return self.create_function_state()
+            print(f"未找到{self.target_function}函数，回退到程序入口状态")
+        
         initial_state = self.project.factory.entry_state()
         
                            
@@ -68,11 +160,9 @@ class BenchmarkSymbolicExecution:
             initial_state.solver.add(count_var >= 0)
             initial_state.solver.add(count_var <= 10)           
             
-            global symbolic_var_counter, symbolic_variables
-            symbolic_variables['count_param'] = count_var
-            symbolic_var_counter += 1
+            self.symbolic_variables['count_param'] = count_var
             
-            print(f"创建符号变量: count_param (范围: 0-10)")
+            print("创建符号变量: count_param (范围: 0-10)")
         
                          
                          
@@ -81,24 +171,40 @@ class BenchmarkSymbolicExecution:
             initial_state.solver.add(array_var >= 0)
             initial_state.solver.add(array_var <= 200)        
             
-            symbolic_variables[f'array_b_{i}'] = array_var
-            symbolic_var_counter += 1
+            self.symbolic_variables[f'array_b_{i}'] = array_var
             
             print(f"创建符号变量: array_b_{i} (范围: 0-200)")
         
         return initial_state
     
+    def create_function_state(self):
+        """在目标函数入口创建 call_state，全局数组按 array_init 预先填充，函数返回即终止"""
+        count_var = claripy.BVS('count_param', 32)
+        self.function_entry = build_function_entry_state(self.project, self.target_function, args=(count_var,),
+                                                         array_init=self.array_init)
+        initial_state = self.function_entry.state
+        initial_state.solver.add(count_var >= 0)
+        initial_state.solver.add(count_var <= 10)
+        
+        self.symbolic_variables['count_param'] = count_var
+        self.symbolic_variables.update(self.function_entry.variables)
+        
+        print(f"函数级入口: {self.target_function} @ 0x{self.s000_addr:x} (数组初始化: {self.array_init})")
+        print(f"创建符号变量: count_param (范围: 0-10)，数组元素符号变量 {len(self.function_entry.variables)} 个")
+        return initial_state
+    
     def run_symbolic_execution(self):
         """运行符号执行"""
         print(f"开始符号执行: {self.binary_path}")
         
                 
-        global symbolic_var_counter, symbolic_variables
-        symbolic_var_counter = 0
-        symbolic_variables = {}
+        self.symbolic_variables = {}
+        self.paths_info = []
         
               
+        setup_start = time.time()
         self.setup_project()
+        self.timing['setup_time'] = time.time() - setup_start
         
         if self.project is None:
             print("项目初始化失败")
@@ -106,74 +212,156 @@ class BenchmarkSymbolicExecution:
         
                        
         initial_state = self.create_symbolic_state()
+        if self.dedup_paths:
+            if not PATH_FINGERPRINT_AVAILABLE:
+                raise RuntimeError("路径去重需要 path_fingerprint 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.path_fingerprinter = PathFingerprinter()
+        if self.unicorn:
+            if not CONCRETE_EXECUTION_AVAILABLE:
+                raise RuntimeError("unicorn 具体执行需要 concrete_execution 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            enable_unicorn(initial_state)
         
                  
         simgr = self.project.factory.simulation_manager(initial_state)
+        if self.unicorn:
+            self.concrete_stats = ConcreteExecutionStats()
+            simgr.use_technique(self.concrete_stats)
+            print("启用 unicorn 具体执行: 不涉及符号数据的代码交给 unicorn 原生执行")
+        if self.memory_budget_mb:
+            if not MEMORY_BUDGET_AVAILABLE:
+                raise RuntimeError("内存预算需要 memory_optimized_analysis 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.memory_budget = MemoryBudget(self.memory_budget_mb)
+            simgr.use_technique(self.memory_budget)
+            print(f"启用内存预算: {self.memory_budget_mb} MB (进程 RSS)")
+        if self.summarize_loops:
+            if not LOOP_SUMMARIZATION_AVAILABLE:
+                raise RuntimeError("循环摘要需要 loop_summarization 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.loop_summarizer = LoopSummarizer()
+            simgr.use_technique(self.loop_summarizer)
+            print(f"启用循环摘要: 识别到 {len(self.loop_summarizer.regions)} 个可摘要区域")
+        if self.merge_mode == 'veritesting':
+            simgr.use_technique(angr.exploration_techniques.Veritesting())
+            print("启用状态合并: veritesting")
+        elif self.merge_mode == 'postdom':
+            if not STATE_MERGING_AVAILABLE:
+                raise RuntimeError("后支配点合并需要 state_merging 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.state_merger = PostDominatorMerge()
+            simgr.use_technique(self.state_merger)
+            print(f"启用状态合并: 后支配点汇合 ({len(self.state_merger.join_points)} 个汇合点)")
+        
+                
+        # 循环摘要要在探索结束后合并终止状态，此时不能提前输出
+        if self.stream_paths and not self.loop_summarizer:
+            self.path_streamer = StreamDeadended(self.analyze_state)
+            simgr.use_technique(self.path_streamer)
         
                 
         print("开始探索路径...")
+        self.exploration_start = time.time()
         simgr.run(timeout=self.timeout)
+        self.timing['exploration_time'] = time.time() - self.exploration_start - self.timing['analysis_time']
         
-        print(f"符号执行完成：")
-        print(f"  终止路径数: {len(simgr.deadended)}")
+        print("符号执行完成：")
+        print(f"  终止路径数: {len(simgr.deadended) + (self.path_streamer.streamed if self.path_streamer else 0)}")
         print(f"  活跃路径数: {len(simgr.active)}")
         print(f"  错误路径数: {len(simgr.errored)}")
+        if self.memory_budget:
+            print(f"  内存预算丢弃状态数: {self.memory_budget.pruned_count} (溢出: {self.memory_budget.spilled_count})")
+        if self.loop_summarizer:
+            print(f"  循环摘要合并状态数: {self.loop_summarizer.merged_states} -> {self.loop_summarizer.summarized_paths} 条摘要路径")
+        if self.state_merger:
+            print(f"  后支配点合并次数: {self.state_merger.merge_count} (合并状态数: {self.state_merger.merged_states})")
+        if self.concrete_stats:
+            stats = self.concrete_stats.summary()
+            print(f"  具体/符号执行基本块: {stats['concrete_blocks']} / {stats['symbolic_blocks']} "
+                  f"(指令: {stats['concrete_instructions']} / {stats['symbolic_instructions']})")
         
                 
-        all_states = simgr.deadended + simgr.active
+        remaining_stashes = ['deadended', 'active']
+        if self.state_merger:
+            remaining_stashes.append(MERGE_WAIT_STASH)
+        all_states = []
+        for stash in remaining_stashes:
+            all_states += simgr.stashes[stash]
+            simgr.stashes[stash] = []
         if simgr.errored:
             print(f"  处理错误状态: {len(simgr.errored)}")
             for errored in simgr.errored:
                 all_states.append(errored.state)
+            simgr.stashes['errored'] = []
         
         self.analyze_states(all_states)
         
+        if self.path_fingerprinter:
+            self.write_multiplicities()
+        
         return self.paths_info
     
     def analyze_states(self, states):
-        """分析所有状态"""
-        for i, state in enumerate(states):
-            print(f"\n分析路径 {i + 1}...")
-            
-                    
-            signature = self.extract_path_signature(state)
-            
-                     
-            smt_constraints = self.generate_smt_constraints(state)
-            
-                    
-            path_info = {
-                'index': i + 1,
-                'signature': signature,
-                'smt_constraints': smt_constraints,
-                'state': state
-            }
-            
-            self.paths_info.append(path_info)
-            
-                   
-            self.save_path_to_file(path_info)
-            
-                  
-            print(f"  符号变量值: {signature['variables']}")
-            print(f"  约束数量: {signature['constraints']['count']}")
+        """依次分析状态，分析完即释放"""
+        while states:
+            self.analyze_state(states.pop(0))
+    
+    def analyze_state(self, state):
+        """分析一个状态并立即写出路径文件，paths_info 中只保留签名，不保留状态本身"""
+        analysis_start = time.time()
+        index = len(self.paths_info) + 1
+        if self.path_fingerprinter:
+            canonical_index = self.path_fingerprinter.register(state, index)
+            if canonical_index is not None:
+                print(f"\n终止状态与路径 {canonical_index} 指纹相同，计入其重复数")
+                self.timing['analysis_time'] += time.time() - analysis_start
+                return
+        print(f"\n分析路径 {index}...")
+        
+                
+        signature = self.extract_path_signature(state)
+        
+                
+        path_info = {
+            'index': index,
+            'signature': signature,
+            'filename': f"{self.output_prefix}_path_{index}.txt",
+            'multiplicity': 1
+        }
+        
+               
+        self.save_path_to_file(path_info, state)
+        self.paths_info.append(path_info)
+        
+              
+        print(f"  符号变量值: {signature['variables']}")
+        print(f"  约束数量: {signature['constraints']['count']}")
+        self.timing['analysis_time'] += time.time() - analysis_start
+    
+    def write_multiplicities(self):
+        """把重复数写入规范路径文件"""
+        for index, count in self.path_fingerprinter.multiplicities().items():
+            path_info = self.paths_info[index - 1]
+            path_info['multiplicity'] = count
+            record_multiplicity(path_info['filename'], count)
+        summary = self.path_fingerprinter.summary()
+        print(f"路径去重: {summary['distinct_paths']} 条不同路径，{summary['duplicate_paths']} 条重复路径已归并")
     
     def extract_path_signature(self, state):
         """提取路径的多维签名"""
         signature = {}
         
                    
-        global symbolic_variables
-        variable_values = {}
-        for var_name, sym_var in symbolic_variables.items():
+        var_names = list(self.symbolic_variables)
+        variable_values = dict.fromkeys(var_names)
+        if var_names:
+            # 把所有变量拼接成一个位向量，一次模型查询取得全部见证值；不可满足时全部为 None
+            variables = [self.symbolic_variables[name] for name in var_names]
             try:
-                if state.solver.satisfiable():
-                    val = state.solver.eval(sym_var, cast_to=int)
-                    variable_values[var_name] = val
-                else:
-                    variable_values[var_name] = None
-            except:
-                variable_values[var_name] = None
+                witness = state.solver.eval_upto(claripy.Concat(*variables), 1)
+            except angr.errors.SimUnsatError:
+                witness = []
+            if witness:
+                value = witness[0]
+                for name, variable in zip(reversed(var_names), reversed(variables)):
+                    variable_values[name] = value & ((1 << variable.size()) - 1)
+                    value >>= variable.size()
         signature['variables'] = variable_values
         
                      
@@ -216,33 +404,94 @@ class BenchmarkSymbolicExecution:
     def generate_smt_constraints(self, state):
         """生成SMT约束"""
         solver = claripy.Solver()
-        for constraint in state.solver.constraints:
-            solver.add(constraint)
+        solver.add(state.solver.constraints)
         smt2_text = claripy_solver_to_smt2(solver)
         return smt2_text
     
 
     
-    def save_path_to_file(self, path_info):
-        """保存路径信息到文件"""
-        filename = f"{self.output_prefix}_path_{path_info['index']}.txt"
+    def save_path_to_file(self, path_info, state):
+        """保存路径信息到文件（SMT-LIB 文本在写出时才生成，不在内存中保留）"""
+        filename = path_info['filename']
         
         with open(filename, "w", encoding='utf-8') as f:
-            f.write(path_info['smt_constraints'])
+            f.write(self.generate_smt_constraints(state))
             f.write("\n; 路径签名信息:\n")
             f.write(f"; 符号变量值: {path_info['signature']['variables']}\n")
             f.write(f"; 约束信息: {path_info['signature']['constraints']}\n")
             f.write(f"; 执行轨迹: {path_info['signature']['execution_trace']}\n")
             f.write(f"; 内存哈希: {path_info['signature']['memory_hash']}\n")
+            if self.memory_budget:
+                f.write(f"; 内存预算: {self.memory_budget.summary()}\n")
+            if self.loop_summarizer:
+                f.write(f"; 循环摘要: {self.loop_summarizer.summary()}\n")
+            if self.merge_mode != 'none':
+                merge_summary = self.state_merger.summary() if self.state_merger else {}
+                f.write(f"; 状态合并: {dict(mode=self.merge_mode, **merge_summary)}\n")
+            if self.function_entry:
+                f.write(f"; 函数级入口: {dict(array_init=self.array_init, **self.function_entry.summary())}\n")
+            if self.concrete_stats:
+                f.write(f"; 具体执行: {self.concrete_stats.summary()}\n")
+            f.write("; \n")
+            f.write("; 时间信息:\n")
+            f.write(f"; 项目设置时间: {self.timing['setup_time']:.3f} 秒\n")
+            if self.project_cache_info['cache'] == 'warm':
+                f.write(f"; 项目缓存: 命中 (冷启动设置时间: {self.project_cache_info['cold_setup_time']:.3f} 秒)\n")
+            elif self.project_cache_info['cache'] == 'cold':
+                f.write("; 项目缓存: 未命中 (已写入缓存)\n")
+            if self.timing['exploration_time']:
+                f.write(f"; 路径探索时间: {self.timing['exploration_time']:.3f} 秒\n")
+            else:
+                elapsed = time.time() - self.exploration_start - self.timing['analysis_time']
+                f.write(f"; 路径探索时间: {elapsed:.3f} 秒 (流式输出，截至本路径终止)\n")
         
         print(f"  已保存到: {filename}")
 
+def run_job(binary_path, timeout=120, output_prefix=None, memory_budget_mb=None, summarize_loops=False,
+            merge_mode='none', project_cache=True, entry_mode='entry', target_function=None, array_init='concrete',
+            unicorn=False, stream_paths=True, dedup_paths=False):
+    """分析单个二进制文件并返回结构化结果（供常驻工作进程直接调用）"""
+    analyzer = BenchmarkSymbolicExecution(binary_path, output_prefix, timeout, memory_budget_mb, summarize_loops,
+                                          merge_mode, project_cache, entry_mode, target_function, array_init, unicorn,
+                                          stream_paths, dedup_paths)
+    start_time = time.time()
+    results = analyzer.run_symbolic_execution()
+    return {
+        'kind': 'symbolic_execution',
+        'binary_path': binary_path,
+        'paths_found': len(results),
+        'total_time': time.time() - start_time,
+        'setup_time': analyzer.timing['setup_time'],
+        'project_cache': analyzer.project_cache_info.get('cache'),
+        'cold_setup_time': analyzer.project_cache_info.get('cold_setup_time'),
+        'exploration_time': analyzer.timing['exploration_time'],
+        'analysis_time': analyzer.timing['analysis_time'],
+        'memory_budget': analyzer.memory_budget.summary() if analyzer.memory_budget else None,
+        'loop_summary': analyzer.loop_summarizer.summary() if analyzer.loop_summarizer else None,
+        'merge_mode': merge_mode,
+        'merge_summary': analyzer.state_merger.summary() if analyzer.state_merger else None,
+        'entry_mode': entry_mode,
+        'function_entry': analyzer.function_entry.summary() if analyzer.function_entry else None,
+        'concrete_execution': analyzer.concrete_stats.summary() if analyzer.concrete_stats else None,
+        'streamed_paths': analyzer.path_streamer.streamed if analyzer.path_streamer else 0,
+        'path_dedup': analyzer.path_fingerprinter.summary() if analyzer.path_fingerprinter else None
+    }
+
 class BenchmarkAnalyzer:
     """benchmark批量分析器"""
     
-    def __init__(self, benchmark_dir, timeout=120):
+    def __init__(self, benchmark_dir, timeout=120, memory_budget_mb=None, summarize_loops=False, merge_mode='none',
+                 entry_mode='entry', target_function=None, array_init='concrete', unicorn=False, dedup_paths=False):
         self.benchmark_dir = benchmark_dir
         self.timeout = timeout
+        self.memory_budget_mb = memory_budget_mb
+        self.summarize_loops = summarize_loops
+        self.merge_mode = merge_mode
+        self.entry_mode = entry_mode
+        self.target_function = target_function
+        self.array_init = array_init
+        self.unicorn = unicorn
+        self.dedup_paths = dedup_paths
         self.results = {}
     
     def find_binary_files(self):
@@ -273,7 +522,11 @@ class BenchmarkAnalyzer:
             output_prefix = basename
             
             try:
-                analyzer = BenchmarkSymbolicExecution(binary_path, output_prefix, self.timeout)
+                analyzer = BenchmarkSymbolicExecution(binary_path, output_prefix, self.timeout, self.memory_budget_mb,
+                                                      self.summarize_loops, self.merge_mode,
+                                                      entry_mode=self.entry_mode, target_function=self.target_function,
+                                                      array_init=self.array_init, unicorn=self.unicorn,
+                                                      dedup_paths=self.dedup_paths)
                 results = analyzer.run_symbolic_execution()
                 self.results[basename] = results
                 
@@ -295,11 +548,17 @@ class BenchmarkAnalyzer:
             
             f.write(f"分析目录: {self.benchmark_dir}\n")
             f.write(f"分析的二进制文件数量: {len(self.results)}\n")
-            f.write("符号化策略: 函数参数 + 数组元素\n\n")
+            f.write("符号化策略: 函数参数 + 数组元素\n")
+            f.write(f"循环摘要: {'启用' if self.summarize_loops else '关闭'}\n")
+            f.write(f"状态合并: {self.merge_mode}\n")
+            f.write(f"入口模式: {self.entry_mode}\n")
+            f.write(f"unicorn 具体执行: {'启用' if self.unicorn else '关闭'}\n\n")
             
             for binary_name, paths in self.results.items():
                 f.write(f"二进制文件: {binary_name}\n")
                 f.write(f"  发现路径数: {len(paths)}\n")
+                if self.dedup_paths:
+                    f.write(f"  去重前终止状态数: {sum(path['multiplicity'] for path in paths)}\n")
                 f.write(f"  生成的文件: {binary_name}_path_*.txt\n\n")
             
             f.write("下一步: 使用 semantic_equivalence_analyzer.py 进行等价性分析\n")
@@ -316,20 +575,54 @@ def main():
     parser.add_argument('--binary', help='单个二进制文件路径')
     parser.add_argument('--timeout', type=int, default=120, help='符号执行超时时间(秒)')
     parser.add_argument('--output-prefix', help='输出文件前缀')
+    parser.add_argument('--memory-budget', type=int, help='单进程内存预算(MB)，接近预算时丢弃低优先级状态')
+    parser.add_argument('--summarize-loops', action='store_true', help='将 a..e 数组上的计数循环按迭代次数合并为一条摘要路径')
+    parser.add_argument('--merge-mode', choices=MERGE_MODES, default='none',
+                        help='状态合并模式: none / veritesting / postdom（在直接后支配点汇合分支状态）')
+    parser.add_argument('--entry-mode', choices=ENTRY_MODES, default='entry',
+                        help='入口模式: entry（从程序入口执行）/ function（在目标函数入口构造 call_state，返回即终止）')
+    parser.add_argument('--function', help='function 入口模式下的目标函数名（默认从 s121_O1 这类文件名推出，否则为 s000）')
+    parser.add_argument('--array-init', choices=ARRAY_INIT_MODES, default='concrete',
+                        help='function 入口模式下全局数组 a..e 的预填充方式: concrete / symbolic')
+    parser.add_argument('--unicorn', action='store_true',
+                        help='用 unicorn 具体执行不涉及符号数据的代码（如 init_data），并统计具体/符号执行指令数')
+    parser.add_argument('--no-stream', action='store_true',
+                        help='探索结束后再统一分析终止状态（默认每条路径终止时立即写出并释放状态）')
+    parser.add_argument('--dedup-paths', action='store_true',
+                        help='按约束/数组指纹归并重复路径，只写出规范路径并记录重复数')
+    parser.add_argument('--no-project-cache', action='store_true', help='不使用按二进制哈希缓存的 angr 项目/CFG')
+    parser.add_argument('--result-file', help='以 JSON-lines 格式追加结构化结果（供批量驱动读取）')
+    parser.add_argument('--quiet', action='store_true', help='关闭控制台输出（配合 --result-file 使用）')
     
     args = parser.parse_args()
     
+    if args.quiet:
+        sys.stdout = open(os.devnull, 'w')
+    
     if args.benchmark:
         print(f"开始批量分析benchmark: {args.benchmark}")
-        analyzer = BenchmarkAnalyzer(args.benchmark, args.timeout)
+        analyzer = BenchmarkAnalyzer(args.benchmark, args.timeout, args.memory_budget, args.summarize_loops,
+                                     args.merge_mode, args.entry_mode, args.function, args.array_init, args.unicorn,
+                                     args.dedup_paths)
         analyzer.analyze_all_binaries()
         analyzer.generate_summary_report()
         
     elif args.binary:
         print(f"开始分析单个文件: {args.binary}")
-        analyzer = BenchmarkSymbolicExecution(args.binary, args.output_prefix, args.timeout)
-        results = analyzer.run_symbolic_execution()
-        print(f"分析完成！共发现 {len(results)} 条路径")
+        record = run_job(args.binary, args.timeout, args.output_prefix, args.memory_budget, args.summarize_loops,
+                         args.merge_mode, not args.no_project_cache, args.entry_mode, args.function, args.array_init,
+                         args.unicorn, not args.no_stream, args.dedup_paths)
+        print("时间统计:")
+        print(f"  项目设置: {record['setup_time']:.3f} 秒 (项目缓存: {record['project_cache']})")
+        print(f"  路径探索: {record['exploration_time']:.3f} 秒")
+        print(f"  状态分析: {record['analysis_time']:.3f} 秒")
+        if record['concrete_execution']:
+            print(f"  具体执行统计: {record['concrete_execution']}")
+        print(f"分析完成！共发现 {record['paths_found']} 条路径")
+        
+        if args.result_file:
+            with open(args.result_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
         
     else:
         parser.print_help()
@@ -0,0 +1,93 @@
+"""
+约束公式解析耗时微基准
+
+对比两种方式在路径语料上的解析开销:
+1. 逐对解析: 每次比较都调用 build_smt_formula + parse_smt2_string
+2. 预解析存储: 每个路径只解析一次 (ParsedFormulaStore)，变量映射通过 substitute 应用
+"""
+
+import os
+import re
+import glob
+import time
+import argparse
+from itertools import combinations
+from collections import defaultdict
+from z3 import *
+from semantic_equivalence_analyzer import EnhancedConstraintChecker, ParsedFormulaStore
+
+def load_corpus(paths_dir):
+    """按程序和优化等级加载路径文件"""
+    checker = EnhancedConstraintChecker()
+    corpus = defaultdict(dict)
+
+    for file_path in sorted(glob.glob(os.path.join(paths_dir, "*_path_*.txt"))):
+        match = re.match(r'^(.+)_(O\d+)_path_\d+\.txt$', os.path.basename(file_path))
+        if not match:
+            continue
+        program, optimization = match.groups()
+        path_info = checker.extract_path_info(file_path)
+        path_info['file'] = file_path
+        corpus[program].setdefault(optimization, []).append(path_info)
+
+    return checker, corpus
+
+def iter_pairs(corpus):
+    """枚举批量分析会执行的全部路径对"""
+    for program, optimizations in sorted(corpus.items()):
+        for opt1, opt2 in combinations(sorted(optimizations), 2):
+            for path1 in optimizations[opt1]:
+                for path2 in optimizations[opt2]:
+                    yield path1, path2
+
+def benchmark_per_pair_parsing(checker, corpus):
+    """旧方式: 每个路径对都重新构建并解析SMT文本"""
+    pair_count = 0
+    start_time = time.time()
+
+    for path1, path2 in iter_pairs(corpus):
+        var_mapping = checker.create_variable_mapping(path1['variables'], path2['variables'])
+        parse_smt2_string(checker.build_smt_formula(path1['variables'], path1['constraints']))
+        parse_smt2_string(checker.build_smt_formula(path2['variables'], path2['constraints'], var_mapping))
+        pair_count += 1
+
+    return pair_count, time.time() - start_time
+
+def benchmark_formula_store(checker, corpus):
+    """新方式: 每个路径只解析一次，映射通过 substitute 应用"""
+    store = ParsedFormulaStore(checker)
+    pair_count = 0
+    start_time = time.time()
+
+    for path1, path2 in iter_pairs(corpus):
+        var_mapping = checker.create_variable_mapping(path1['variables'], path2['variables'])
+        store.entry_for(path1)
+        store.mapped_formula(path2, var_mapping)
+        pair_count += 1
+
+    return pair_count, time.time() - start_time, store.parse_count
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='约束公式解析耗时微基准')
+    parser.add_argument('--paths-dir', default='data/tsvc/paths', help='路径文件目录')
+    args = parser.parse_args()
+
+    load_start = time.time()
+    checker, corpus = load_corpus(args.paths_dir)
+    load_time = time.time() - load_start
+    path_count = sum(len(paths) for optimizations in corpus.values() for paths in optimizations.values())
+
+    print(f"📂 语料: {args.paths_dir} ({len(corpus)} 个程序, {path_count} 条路径, 加载 {load_time:.3f} 秒)")
+
+    pair_count, before_time = benchmark_per_pair_parsing(checker, corpus)
+    _, after_time, parse_count = benchmark_formula_store(checker, corpus)
+
+    print(f"🔁 路径对数: {pair_count}")
+    print(f"  逐对解析:   {before_time:.3f} 秒 ({pair_count * 2} 次解析)")
+    print(f"  预解析存储: {after_time:.3f} 秒 ({parse_count} 次解析)")
+    if after_time > 0:
+        print(f"  加速比:     {before_time / after_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,12 @@ except ImportError:
 
 from semantic_equivalence_analyzer import PathClusterAnalyzer
 
+try:
+    from project_cache import load_project
+    PROJECT_CACHE_AVAILABLE = True
+except ImportError:
+    PROJECT_CACHE_AVAILABLE = False
+
 class ImprovedRealTSVCAnalyzer:
     """改进的真实TSVC benchmark分析器"""
     
@@ -164,7 +170,11 @@ int main(int argc, char* argv[]) {{
         
         try:
                       
-            project = angr.Project(str(binary_path), auto_load_libs=False)
+            if PROJECT_CACHE_AVAILABLE:
+                project, cache_info = load_project(binary_path, auto_load_libs=False)
+                print(f"    项目缓存: {cache_info['cache']} ({cache_info['setup_time']:.3f} 秒)")
+            else:
+                project = angr.Project(str(binary_path), auto_load_libs=False)
             
                     
             state = project.factory.entry_state()
@@ -0,0 +1,297 @@
+"""
+Cheap refutation of path-formula equivalence by concrete evaluation.
+
+Most path pairs handed to the solver turn out to be not equivalent, and each of
+them pays a full ``check()`` on the XOR of the two formulas. ``ConcreteRefuter``
+first evaluates both formulas on a pool of candidate assignments:
+
+* the concrete witnesses stored in each path file (``; 输入变量值:`` and friends),
+* boundary values of every variable (0, 1, signed/unsigned extremes) and every
+  numeral in the formulas plus/minus one,
+* seeded random samples.
+
+Evaluation walks the Z3 DAG once per query with NumPy ``uint64`` columns, one
+row per assignment, so the whole pool is decided in a handful of vector ops.
+A row where the formulas disagree is re-checked with ``substitute``/``simplify``
+before it is reported, so a distinguishing input is always a genuine
+counterexample; formulas using unsupported operators or bit-vectors wider than
+64 bits are simply left to the solver.
+"""
+
+import random
+import numpy as np
+import z3
+
+MAX_WIDTH = 64
+# Older Z3 releases report boolean equality as Z3_OP_IFF
+BOOL_EQ_KINDS = (z3.Z3_OP_EQ, getattr(z3, 'Z3_OP_IFF', z3.Z3_OP_EQ))
+
+class UnsupportedFormula(Exception):
+    """Raised when a formula cannot be evaluated by the vectorized evaluator."""
+
+def width_mask(width):
+    return (1 << width) - 1
+
+def resolve_witness(values, variables, var_mapping=None):
+    """Map witness values keyed by short names (``scanf_0``) onto declared variable names.
+
+    ``values`` comes from a path file, ``variables`` are the declared
+    ``{name: bit_width}`` of the same path, and ``var_mapping`` renames them into
+    the variable space the formula is checked in.
+    """
+    resolved = {}
+    for key, value in (values or {}).items():
+        if not isinstance(value, int):
+            continue
+        for name in variables:
+            if name == key or name.startswith(f"{key}_"):
+                resolved[(var_mapping or {}).get(name, name)] = value
+                break
+    return resolved
+
+class VectorEvaluator:
+    """Evaluate a Z3 bit-vector/boolean formula on N assignments at once."""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self.memo = {}
+
+    def bv_const(self, value, width):
+        return np.full(self.rows, value & width_mask(width), dtype=np.uint64)
+
+    @staticmethod
+    def to_signed(values, width):
+        if width == MAX_WIDTH:
+            return values.view(np.int64)
+        sign = ((values >> np.uint64(width - 1)) & np.uint64(1)).astype(np.int64)
+        return values.astype(np.int64) - (sign << np.int64(width))
+
+    @staticmethod
+    def wrap(values, width):
+        return values & np.uint64(width_mask(width))
+
+    def evaluate(self, expr):
+        key = expr.get_id()
+        cached = self.memo.get(key)
+        if cached is None:
+            cached = self.compute(expr)
+            self.memo[key] = cached
+        return cached
+
+    def compute(self, expr):
+        if z3.is_bv(expr) and expr.size() > MAX_WIDTH:
+            raise UnsupportedFormula(f"bit-vector wider than {MAX_WIDTH} bits")
+
+        kind = expr.decl().kind()
+        args = [expr.arg(i) for i in range(expr.num_args())]
+
+        if kind == z3.Z3_OP_TRUE:
+            return np.ones(self.rows, dtype=bool)
+        if kind == z3.Z3_OP_FALSE:
+            return np.zeros(self.rows, dtype=bool)
+        if kind == z3.Z3_OP_BNUM:
+            return self.bv_const(expr.as_long(), expr.size())
+        if kind == z3.Z3_OP_UNINTERPRETED and not args:
+            name = expr.decl().name()
+            if name not in self.columns:
+                raise UnsupportedFormula(f"unknown variable {name}")
+            return self.columns[name]
+
+        values = [self.evaluate(arg) for arg in args]
+
+        if kind == z3.Z3_OP_NOT:
+            return ~values[0]
+        if kind == z3.Z3_OP_AND:
+            return np.logical_and.reduce(values) if values else np.ones(self.rows, dtype=bool)
+        if kind == z3.Z3_OP_OR:
+            return np.logical_or.reduce(values) if values else np.zeros(self.rows, dtype=bool)
+        if kind == z3.Z3_OP_XOR:
+            return np.logical_xor.reduce(values)
+        if kind == z3.Z3_OP_IMPLIES:
+            return ~values[0] | values[1]
+        if kind in BOOL_EQ_KINDS:
+            return values[0] == values[1]
+        if kind == z3.Z3_OP_DISTINCT:
+            if len(values) != 2:
+                raise UnsupportedFormula("n-ary distinct")
+            return values[0] != values[1]
+        if kind == z3.Z3_OP_ITE:
+            return np.where(values[0], values[1], values[2])
+
+        if not args or not z3.is_bv(args[0]):
+            raise UnsupportedFormula(f"operator {expr.decl().name()}")
+        width = args[0].size()
+        a = values[0]
+        b = values[1] if len(values) > 1 else None
+
+        comparisons = {
+            z3.Z3_OP_ULEQ: lambda: a <= b,
+            z3.Z3_OP_ULT: lambda: a < b,
+            z3.Z3_OP_UGEQ: lambda: a >= b,
+            z3.Z3_OP_UGT: lambda: a > b,
+            z3.Z3_OP_SLEQ: lambda: self.to_signed(a, width) <= self.to_signed(b, width),
+            z3.Z3_OP_SLT: lambda: self.to_signed(a, width) < self.to_signed(b, width),
+            z3.Z3_OP_SGEQ: lambda: self.to_signed(a, width) >= self.to_signed(b, width),
+            z3.Z3_OP_SGT: lambda: self.to_signed(a, width) > self.to_signed(b, width),
+        }
+        if kind in comparisons:
+            return comparisons[kind]()
+
+        out_width = expr.size()
+        if kind == z3.Z3_OP_BADD:
+            result = a
+            for value in values[1:]:
+                result = self.wrap(result + value, out_width)
+            return result
+        if kind == z3.Z3_OP_BMUL:
+            result = a
+            for value in values[1:]:
+                result = self.wrap(result * value, out_width)
+            return result
+        if kind == z3.Z3_OP_BSUB:
+            return self.wrap(a - b, out_width)
+        if kind == z3.Z3_OP_BNEG:
+            return self.wrap(np.uint64(0) - a, out_width)
+        if kind == z3.Z3_OP_BAND:
+            return np.bitwise_and.reduce(values)
+        if kind == z3.Z3_OP_BOR:
+            return np.bitwise_or.reduce(values)
+        if kind == z3.Z3_OP_BXOR:
+            return np.bitwise_xor.reduce(values)
+        if kind == z3.Z3_OP_BNOT:
+            return self.wrap(~a, out_width)
+        if kind in (z3.Z3_OP_BUDIV, z3.Z3_OP_BUDIV_I):
+            safe = np.where(b == 0, np.uint64(1), b)
+            return np.where(b == 0, np.uint64(width_mask(out_width)), a // safe)
+        if kind in (z3.Z3_OP_BUREM, z3.Z3_OP_BUREM_I):
+            safe = np.where(b == 0, np.uint64(1), b)
+            return np.where(b == 0, a, a % safe)
+        if kind == z3.Z3_OP_BSHL:
+            shifted = self.wrap(a << np.minimum(b, np.uint64(MAX_WIDTH - 1)), out_width)
+            return np.where(b >= np.uint64(out_width), np.uint64(0), shifted)
+        if kind == z3.Z3_OP_BLSHR:
+            shifted = a >> np.minimum(b, np.uint64(MAX_WIDTH - 1))
+            return np.where(b >= np.uint64(out_width), np.uint64(0), shifted)
+        if kind == z3.Z3_OP_BASHR:
+            amount = np.minimum(b, np.uint64(out_width - 1)).astype(np.int64)
+            return self.wrap((self.to_signed(a, out_width) >> amount).astype(np.uint64), out_width)
+        if kind == z3.Z3_OP_EXTRACT:
+            high, low = expr.params()
+            return self.wrap(a >> np.uint64(low), high - low + 1)
+        if kind == z3.Z3_OP_ZERO_EXT:
+            return a
+        if kind == z3.Z3_OP_SIGN_EXT:
+            return self.wrap(self.to_signed(a, width).astype(np.uint64), out_width)
+        if kind == z3.Z3_OP_CONCAT:
+            result = a
+            for arg, value in zip(args[1:], values[1:]):
+                result = (result << np.uint64(arg.size())) | value
+            return result
+
+        raise UnsupportedFormula(f"operator {expr.decl().name()}")
+
+class ConcreteRefuter:
+    """Search a pool of concrete assignments for one that separates two formulas."""
+
+    def __init__(self, random_samples=256, max_rows=4096, seed=0):
+        self.random_samples = random_samples
+        self.max_rows = max_rows
+        self.seed = seed
+        self.attempts = 0
+        self.refuted = 0
+        self.unsupported = 0
+
+    @staticmethod
+    def collect_leaves(formulas):
+        """Return ``({name: width}, {width: numerals})`` for the formulas' free variables and constants."""
+        variables = {}
+        numerals = {}
+        seen = set()
+        stack = list(formulas)
+        while stack:
+            expr = stack.pop()
+            key = expr.get_id()
+            if key in seen:
+                continue
+            seen.add(key)
+            if z3.is_bv_value(expr):
+                numerals.setdefault(expr.size(), set()).add(expr.as_long())
+            elif z3.is_const(expr) and expr.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+                if not z3.is_bv(expr):
+                    raise UnsupportedFormula(f"non bit-vector variable {expr}")
+                variables[expr.decl().name()] = expr.size()
+            stack.extend(expr.children())
+        return variables, numerals
+
+    @staticmethod
+    def boundary_values(width, numerals):
+        mask = width_mask(width)
+        values = {0, 1, 2, mask, mask - 1, mask >> 1, (mask >> 1) + 1}
+        for numeral_width, constants in numerals.items():
+            if numeral_width > width:
+                continue
+            for constant in constants:
+                values.update({(constant - 1) & mask, constant & mask, (constant + 1) & mask})
+        return sorted(values)
+
+    def candidate_rows(self, variables, numerals, witnesses):
+        """Build the candidate assignments as a list of ``{name: value}`` rows."""
+        rng = random.Random(self.seed)
+        names = sorted(variables)
+        base = {name: 0 for name in names}
+        rows = []
+
+        for witness in witnesses:
+            if witness:
+                rows.append({name: witness.get(name, 0) & width_mask(variables[name]) for name in names})
+        if rows:
+            base = dict(rows[0])
+
+        boundaries = {name: self.boundary_values(variables[name], numerals) for name in names}
+        if len(names) <= 2 and np.prod([len(boundaries[name]) for name in names]) <= self.max_rows // 2:
+            grid = [{}]
+            for name in names:
+                grid = [dict(row, **{name: value}) for row in grid for value in boundaries[name]]
+            rows.extend(grid)
+        else:
+            for name in names:
+                rows.extend(dict(base, **{name: value}) for value in boundaries[name])
+
+        for _ in range(self.random_samples):
+            rows.append({
+                name: rng.choice(boundaries[name]) if rng.random() < 0.5
+                else rng.getrandbits(variables[name])
+                for name in names
+            })
+        return rows[:self.max_rows]
+
+    def refute(self, formula1, formula2, witnesses=()):
+        """Return a model string for an input on which the formulas differ, or None."""
+        self.attempts += 1
+        try:
+            variables, numerals = self.collect_leaves([formula1, formula2])
+            rows = self.candidate_rows(variables, numerals, witnesses)
+            if not rows:
+                return None
+            columns = {
+                name: np.array([row[name] for row in rows], dtype=np.uint64)
+                for name in variables
+            }
+            evaluator = VectorEvaluator(columns, len(rows))
+            differs = np.nonzero(evaluator.evaluate(formula1) != evaluator.evaluate(formula2))[0]
+        except (UnsupportedFormula, z3.Z3Exception, OverflowError):
+            self.unsupported += 1
+            return None
+
+        ctx = formula1.ctx
+        for row_index in differs[:8]:
+            assignment = rows[row_index]
+            substitutions = [
+                (z3.BitVec(name, width, ctx=ctx), z3.BitVecVal(assignment[name], width, ctx=ctx))
+                for name, width in variables.items()
+            ]
+            if z3.is_true(z3.simplify(z3.substitute(z3.Xor(formula1, formula2), *substitutions))):
+                self.refuted += 1
+                return "[" + ", ".join(f"{name} = {assignment[name]}" for name in sorted(assignment)) + "]"
+        return None
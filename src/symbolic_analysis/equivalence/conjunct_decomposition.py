@@ -0,0 +1,149 @@
+"""
+Per-component decomposition of equivalence queries.
+
+Path formulas are conjunctions of many asserts, and long ``vtv``/``vpv`` paths
+constrain many array elements independently of each other. Checking them as one
+monolithic ``F1 xor F2`` query makes the solver reason about all of them at once.
+
+``ConjunctDecomposer`` flattens both formulas into conjuncts and partitions the
+conjuncts of *both* sides together into connected components of the
+"shares a variable" relation (ground conjuncts form one extra component). A
+component therefore pairs the conjuncts of F1 and F2 over the same variables,
+and the components range over disjoint variable sets. For such formulas
+
+    F1 <=> F2   iff   every component has F1_C <=> F2_C,
+                      or F1 and F2 are both unsatisfiable,
+
+so each component is checked with its own small XOR query. Only when a component
+differs are the two sides tested for satisfiability (again per component, as a
+conjunction of independent parts is satisfiable iff each part is). Component
+verdicts are cached by the text of the component formulas, so the same array
+constraint shared by many path pairs is solved once. Formulas that form a single
+component are left to the caller's monolithic query.
+"""
+
+import hashlib
+import z3
+
+class ConjunctDecomposer:
+    """Check equivalence component by component over variable-disjoint conjuncts."""
+
+    def __init__(self, max_cache_entries=100000):
+        self.max_cache_entries = max_cache_entries
+        self.verdicts = {}
+
+    @staticmethod
+    def conjuncts(formula):
+        """Flatten nested top-level ``and`` into a list of conjuncts."""
+        result = []
+        stack = [formula]
+        while stack:
+            expr = stack.pop()
+            if z3.is_and(expr):
+                stack.extend(reversed(expr.children()))
+            elif not z3.is_true(expr):
+                result.append(expr)
+        return result
+
+    @staticmethod
+    def variables(expr):
+        """Names of the uninterpreted constants occurring in ``expr``."""
+        names = set()
+        seen = set()
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if node.get_id() in seen:
+                continue
+            seen.add(node.get_id())
+            if z3.is_const(node) and node.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+                names.add(node.decl().name())
+            stack.extend(node.children())
+        return names
+
+    def components(self, conjuncts1, conjuncts2):
+        """Group the conjuncts of both sides into ``(side1, side2)`` lists over disjoint variables."""
+        parent = {}
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        tagged = [(0, expr, self.variables(expr)) for expr in conjuncts1]
+        tagged += [(1, expr, self.variables(expr)) for expr in conjuncts2]
+        for _, _, names in tagged:
+            names = sorted(names)
+            for name in names:
+                parent.setdefault(name, name)
+            for name in names[1:]:
+                root, other = find(names[0]), find(name)
+                if root != other:
+                    parent[other] = root
+
+        groups = {}
+        for side, expr, names in tagged:
+            root = find(next(iter(names))) if names else None
+            groups.setdefault(root, ([], []))[side].append(expr)
+        return list(groups.values())
+
+    def solve_cached(self, formula1, formula2, solve):
+        """Solve ``formula1 xor formula2`` through the component cache; return ``(result, model, hit)``."""
+        key = hashlib.sha256(f"{formula1.sexpr()}\n{formula2.sexpr()}".encode('utf-8')).hexdigest()
+        cached = self.verdicts.get(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+        result, model = solve(formula1, formula2)
+        result = str(result)
+        if result != 'unknown':
+            if len(self.verdicts) >= self.max_cache_entries:
+                self.verdicts.pop(next(iter(self.verdicts)))
+            self.verdicts[key] = (result, model)
+        return result, model, False
+
+    def check(self, formula1, formula2, solve):
+        """Decide ``formula1 xor formula2`` per component.
+
+        ``solve(f1, f2)`` decides one small XOR query and returns
+        ``(result, model)``. Returns ``(result, model, details)`` with a z3
+        ``sat``/``unsat``/``unknown`` result, or None when the formulas form a
+        single component. The model only covers the first differing component.
+        """
+        ctx = formula1.ctx
+        groups = self.components(self.conjuncts(formula1), self.conjuncts(formula2))
+        if len(groups) < 2:
+            return None
+
+        details = {"components": len(groups), "component_queries": 0, "component_cache_hits": 0}
+        def conjoin(parts):
+            return z3.And(*parts) if len(parts) > 1 else parts[0] if parts else z3.BoolVal(True, ctx=ctx)
+        def run(f1, f2):
+            result, model, hit = self.solve_cached(f1, f2, solve)
+            details["component_queries"] += 1
+            details["component_cache_hits"] += int(hit)
+            return result, model
+
+        sides = [(conjoin(part1), conjoin(part2)) for part1, part2 in groups]
+        differing = None
+        for component1, component2 in sides:
+            result, model = run(component1, component2)
+            if result == 'unknown':
+                return z3.unknown, None, details
+            if result == 'sat':
+                differing = model
+                break
+        else:
+            return z3.unsat, None, details
+
+        # a differing component only matters if at least one side is satisfiable
+        false = z3.BoolVal(False, ctx=ctx)
+        for index in (0, 1):
+            for component in sides:
+                result, _ = run(component[index], false)
+                if result == 'unknown':
+                    return z3.unknown, None, details
+                if result == 'unsat':
+                    break
+            else:
+                return z3.sat, differing, details
+        return z3.unsat, None, details
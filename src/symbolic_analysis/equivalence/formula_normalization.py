@@ -0,0 +1,177 @@
+"""
+Canonical normalization and structural hashing of path formulas.
+
+Paths produced for different optimization levels are often the same formula up
+to ``let`` sharing, operand order and the counters in claripy variable names
+(``scanf_0_57_32`` vs ``scanf_0_91_32``). ``FormulaNormalizer`` reduces a parsed
+Z3 formula to a canonical DAG:
+
+* ``let`` bindings are already inlined by the parser; shared subterms are
+  hash-consed, so a node's key is computed once no matter how often it occurs,
+* nested associative operators are flattened and operands of commutative
+  operators are sorted by key,
+* ground subterms are folded to constants, and ``and``/``or`` drop neutral
+  and duplicate operands and short-circuit on absorbing ones,
+* variables are renamed by order of first occurrence in the sorted DAG.
+
+The result is a ``NormalForm`` with a structural hash and the variables in
+canonical order. Two formulas with equal hashes are identical up to that
+renaming, so a pair is equivalent without calling the solver when renaming the
+second formula's variables into the first path's names (the same renaming the
+solver query uses) yields the first formula's canonical variables. ``pair_key``
+combines both hashes with the resulting variable alignment and serves as a
+verdict cache key that does not depend on variable counters or formatting.
+"""
+
+import hashlib
+import z3
+
+ASSOCIATIVE = {
+    z3.Z3_OP_AND, z3.Z3_OP_OR, z3.Z3_OP_BADD, z3.Z3_OP_BMUL,
+    z3.Z3_OP_BAND, z3.Z3_OP_BOR, z3.Z3_OP_BXOR,
+}
+COMMUTATIVE = ASSOCIATIVE | {z3.Z3_OP_EQ, z3.Z3_OP_DISTINCT, z3.Z3_OP_XOR}
+
+def digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class Node:
+    """One hash-consed node of a normalized formula.
+
+    ``key`` ignores variable names and orders commutative operands; ``exact_key``
+    includes them and identifies duplicate operands.
+    """
+
+    __slots__ = ('kind', 'label', 'children', 'key', 'exact_key', 'name', 'value')
+
+    def __init__(self, kind, label, children=(), name=None, value=None):
+        self.kind = kind
+        self.label = label
+        self.children = tuple(children)
+        self.name = name
+        self.value = value
+        self.key = digest(label + '(' + ','.join(child.key for child in self.children) + ')')
+        if name is not None:
+            self.exact_key = digest(f"{label}:{name}")
+        else:
+            self.exact_key = digest(label + '(' + ','.join(child.exact_key for child in self.children) + ')')
+
+    def is_constant(self):
+        return self.value is not None
+
+class NormalForm:
+    """Structural hash of a formula and its variables in canonical order."""
+
+    def __init__(self, structural_hash, variables):
+        self.structural_hash = structural_hash
+        self.variables = variables
+
+    def same_structure(self, other, renaming=None):
+        """True when ``other`` becomes this formula once ``renaming`` is applied to its variables."""
+        if self.structural_hash != other.structural_hash:
+            return False
+        return [(renaming or {}).get(name, name) for name in other.variables] == self.variables
+
+def pair_key(form1, form2, renaming=None):
+    """Name-independent description of a pair: both hashes plus which canonical variables coincide.
+
+    ``renaming`` is applied to the variables of ``form2`` exactly as it is to
+    the second formula of the solver query, so pairs that share a key pose the
+    same query up to variable names.
+    """
+    positions1 = {name: index for index, name in enumerate(form1.variables)}
+    alignment = {}
+    for index, name in enumerate(form2.variables):
+        renamed = (renaming or {}).get(name, name)
+        if renamed in positions1:
+            alignment[str(index)] = positions1[renamed]
+    return form1.structural_hash, form2.structural_hash, alignment
+
+class FormulaNormalizer:
+    """Build canonical hash-consed forms of Z3 formulas."""
+
+    def __init__(self):
+        self.normalized_count = 0
+
+    def build(self, expr, memo):
+        key = expr.get_id()
+        node = memo.get(key)
+        if node is None:
+            node = self.build_node(expr, memo)
+            memo[key] = node
+        return node
+
+    def build_node(self, expr, memo):
+        if z3.is_true(expr) or z3.is_false(expr):
+            return Node('bool', str(z3.is_true(expr)).lower(), value=z3.is_true(expr))
+        if z3.is_bv_value(expr):
+            return Node('bv', f"#b{expr.size()}:{expr.as_long()}", value=expr.as_long())
+        if z3.is_const(expr) and expr.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+            # variables are keyed by sort only until canonical renaming
+            return Node('var', f"var:{expr.sort().sexpr()}", name=expr.decl().name())
+
+        decl = expr.decl()
+        kind = decl.kind()
+        children = [self.build(child, memo) for child in expr.children()]
+
+        if children and all(child.is_constant() for child in children):
+            folded = z3.simplify(expr)
+            if z3.is_true(folded) or z3.is_false(folded) or z3.is_bv_value(folded):
+                return self.build_node(folded, memo)
+
+        if kind in ASSOCIATIVE:
+            children = [grandchild for child in children
+                        for grandchild in (child.children if child.label == decl.name() else (child,))]
+
+        if kind in (z3.Z3_OP_AND, z3.Z3_OP_OR):
+            neutral = kind == z3.Z3_OP_AND
+            if any(child.value is (not neutral) for child in children):
+                return Node('bool', str(not neutral).lower(), value=not neutral)
+            unique = {}
+            for child in children:
+                if child.value is not neutral:
+                    unique.setdefault(child.exact_key, child)
+            children = list(unique.values())
+            if not children:
+                return Node('bool', str(neutral).lower(), value=neutral)
+            if len(children) == 1:
+                return children[0]
+
+        if kind in COMMUTATIVE:
+            children = sorted(children, key=lambda child: (child.key, child.exact_key))
+
+        params = ','.join(str(param) for param in expr.params())
+        label = f"{decl.name()}[{params}]" if params else decl.name()
+        return Node('app', label, children)
+
+    def normalize(self, formula):
+        """Return the ``NormalForm`` of a Z3 boolean formula."""
+        root = self.build(formula, {})
+
+        order = {}
+        seen = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if node.kind == 'var':
+                order.setdefault(node.name, len(order))
+            stack.extend(reversed(node.children))
+
+        keys = {}
+        def renamed_key(node):
+            cached = keys.get(id(node))
+            if cached is None:
+                if node.kind == 'var':
+                    cached = digest(f"v{order[node.name]}:{node.label}")
+                elif not node.children:
+                    cached = node.key
+                else:
+                    cached = digest(node.label + '(' + ','.join(renamed_key(child) for child in node.children) + ')')
+                keys[id(node)] = cached
+            return cached
+
+        self.normalized_count += 1
+        return NormalForm(renamed_key(root), sorted(order, key=order.get))
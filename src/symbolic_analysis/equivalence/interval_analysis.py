@@ -0,0 +1,380 @@
+"""
+Interval fast path for path formulas over one or two variables.
+
+Most TSVC path constraints are conjunctions of ``bvuge``/``bvule``/``bvsge``
+bounds on a single ``scanf_0_*`` input, often seen through ``zero_extend``,
+``extract``, ``bvshl`` by a constant or a constant offset. For such formulas the
+exact set of satisfying inputs is a finite union of intervals, so equivalence
+can be decided by comparing those sets instead of calling the solver.
+
+``IntervalDecider`` computes that set by abstract interpretation:
+
+* every atom ``term OP constant`` becomes an interval set over the term's
+  values, which is pulled back through the term (zero/sign extension, extract,
+  shifts by constants, ``bvadd``/``bvsub`` of a constant, low-bit masks and
+  concatenation with a constant prefix) onto the underlying variable;
+* the boolean structure is evaluated in negation normal form as a union of
+  boxes (one interval set per variable).
+
+Two-variable formulas are compared through a canonical form: the first
+variable's range is cut into maximal segments on which the second variable's
+set is constant. Anything outside this fragment (atoms relating two terms,
+non-constant shifts, more than two variables, too many boxes) raises
+``UnsupportedConstraint`` and the caller falls back to Z3. A ``not_equivalent``
+verdict is always confirmed by substituting the distinguishing input.
+"""
+
+import z3
+
+MAX_VARIABLES = 2
+MAX_BOXES = 256
+MAX_EXTRACT_PIECES = 4096
+
+class UnsupportedConstraint(Exception):
+    """Raised when a formula lies outside the interval fragment."""
+
+def width_mask(width):
+    return (1 << width) - 1
+
+def normalize(intervals):
+    """Sort, drop empty and merge overlapping or adjacent ``(lo, hi)`` intervals."""
+    merged = []
+    for lo, hi in sorted(interval for interval in intervals if interval[0] <= interval[1]):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+def full(width):
+    return [(0, width_mask(width))]
+
+def intersect(a, b):
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo, hi = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if lo <= hi:
+            result.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+def union(a, b):
+    return normalize(a + b)
+
+def complement(a, width):
+    result = []
+    start = 0
+    for lo, hi in a:
+        if lo > start:
+            result.append((start, lo - 1))
+        start = hi + 1
+    if start <= width_mask(width):
+        result.append((start, width_mask(width)))
+    return result
+
+def difference(a, b, width):
+    return intersect(a, complement(b, width))
+
+def shift_wrapped(a, offset, width):
+    """``{(v + offset) mod 2^width : v in a}``."""
+    modulus = 1 << width
+    pieces = []
+    for lo, hi in a:
+        start = (lo + offset) % modulus
+        end = start + (hi - lo)
+        if end < modulus:
+            pieces.append((start, end))
+        else:
+            pieces.extend([(start, modulus - 1), (0, end - modulus)])
+    return normalize(pieces)
+
+def signed_range(low, high, width):
+    """Unsigned encodings of the values whose two's-complement reading lies in ``[low, high]``."""
+    half = 1 << (width - 1)
+    low, high = max(low, -half), min(high, half - 1)
+    if low > high:
+        return []
+    pieces = []
+    if high >= 0:
+        pieces.append((max(low, 0), high))
+    if low < 0:
+        pieces.append((low + (1 << width), min(high, -1) + (1 << width)))
+    return normalize(pieces)
+
+def mod_preimage(values, bits, width):
+    """Values ``v < 2^width`` with ``v mod 2^bits`` in ``values``."""
+    if bits >= width:
+        return intersect(values, full(width))
+    residues = intersect(values, full(bits))
+    if not residues:
+        return []
+    if residues == full(bits):
+        return full(width)
+    copies = 1 << (width - bits)
+    if copies * len(residues) > MAX_EXTRACT_PIECES:
+        raise UnsupportedConstraint("low-bit extract with too many residue classes")
+    return normalize([(lo + (j << bits), hi + (j << bits)) for j in range(copies) for lo, hi in residues])
+
+def lshr_preimage(values, amount, width):
+    """Values ``v < 2^width`` with ``v >> amount`` in ``values``."""
+    low_bits = width_mask(amount)
+    return intersect(normalize([(lo << amount, (hi << amount) | low_bits) for lo, hi in values]), full(width))
+
+COMPARISON_FLIP = {
+    z3.Z3_OP_ULEQ: z3.Z3_OP_UGEQ, z3.Z3_OP_UGEQ: z3.Z3_OP_ULEQ,
+    z3.Z3_OP_ULT: z3.Z3_OP_UGT, z3.Z3_OP_UGT: z3.Z3_OP_ULT,
+    z3.Z3_OP_SLEQ: z3.Z3_OP_SGEQ, z3.Z3_OP_SGEQ: z3.Z3_OP_SLEQ,
+    z3.Z3_OP_SLT: z3.Z3_OP_SGT, z3.Z3_OP_SGT: z3.Z3_OP_SLT,
+    z3.Z3_OP_EQ: z3.Z3_OP_EQ, z3.Z3_OP_DISTINCT: z3.Z3_OP_DISTINCT,
+}
+
+def comparison_values(kind, constant, width):
+    """Term values ``t`` satisfying ``t OP constant``."""
+    mask = width_mask(width)
+    half = 1 << (width - 1)
+    signed = constant - (1 << width) if constant >= half else constant
+    if kind == z3.Z3_OP_ULEQ:
+        return normalize([(0, constant)])
+    if kind == z3.Z3_OP_ULT:
+        return normalize([(0, constant - 1)])
+    if kind == z3.Z3_OP_UGEQ:
+        return normalize([(constant, mask)])
+    if kind == z3.Z3_OP_UGT:
+        return normalize([(constant + 1, mask)])
+    if kind == z3.Z3_OP_SLEQ:
+        return signed_range(-half, signed, width)
+    if kind == z3.Z3_OP_SLT:
+        return signed_range(-half, signed - 1, width)
+    if kind == z3.Z3_OP_SGEQ:
+        return signed_range(signed, half - 1, width)
+    if kind == z3.Z3_OP_SGT:
+        return signed_range(signed + 1, half - 1, width)
+    if kind == z3.Z3_OP_EQ:
+        return [(constant, constant)]
+    return complement([(constant, constant)], width)
+
+class IntervalDecider:
+    """Decide equivalence of one- or two-variable formulas by comparing satisfying interval sets."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.decided = 0
+        self.widths = {}
+
+    def preimage(self, term, values):
+        """Return ``(variable, interval set)`` of variable values for which ``term`` lies in ``values``."""
+        width = term.size()
+        values = intersect(values, full(width))
+        kind = term.decl().kind()
+        args = term.children()
+
+        if kind == z3.Z3_OP_UNINTERPRETED and not args:
+            name = term.decl().name()
+            if self.widths.setdefault(name, width) != width:
+                raise UnsupportedConstraint(f"variable {name} used at several widths")
+            return name, values
+
+        if kind == z3.Z3_OP_ZERO_EXT:
+            return self.preimage(args[0], intersect(values, full(args[0].size())))
+
+        if kind == z3.Z3_OP_SIGN_EXT:
+            inner = args[0].size()
+            half = 1 << (inner - 1)
+            negative_base = (1 << width) - half
+            negatives = intersect(values, [(negative_base, width_mask(width))])
+            pieces = intersect(values, [(0, half - 1)])
+            pieces += [(lo - negative_base + half, hi - negative_base + half) for lo, hi in negatives]
+            return self.preimage(args[0], normalize(pieces))
+
+        if kind == z3.Z3_OP_EXTRACT:
+            high, low = term.params()
+            inner = args[0].size()
+            shifted = mod_preimage(values, high - low + 1, inner - low)
+            return self.preimage(args[0], lshr_preimage(shifted, low, inner))
+
+        if kind in (z3.Z3_OP_BSHL, z3.Z3_OP_BLSHR):
+            if not z3.is_bv_value(args[1]) or args[1].as_long() >= width:
+                raise UnsupportedConstraint("shift by a non-constant or out-of-range amount")
+            amount = args[1].as_long()
+            if kind == z3.Z3_OP_BLSHR:
+                return self.preimage(args[0], lshr_preimage(values, amount, width))
+            # (v << amount) keeps the low width-amount bits of v, scaled by 2^amount
+            quotients = normalize([(-(-lo >> amount), hi >> amount) for lo, hi in values])
+            return self.preimage(args[0], mod_preimage(quotients, width - amount, width))
+
+        if kind == z3.Z3_OP_BADD:
+            terms = [arg for arg in args if not z3.is_bv_value(arg)]
+            if len(terms) != 1:
+                raise UnsupportedConstraint("bvadd over more than one term")
+            offset = sum(arg.as_long() for arg in args if z3.is_bv_value(arg))
+            return self.preimage(terms[0], shift_wrapped(values, -offset, width))
+
+        if kind == z3.Z3_OP_BSUB:
+            if len(args) != 2 or z3.is_bv_value(args[0]) or not z3.is_bv_value(args[1]):
+                raise UnsupportedConstraint("bvsub other than term minus constant")
+            return self.preimage(args[0], shift_wrapped(values, args[1].as_long(), width))
+
+        if kind == z3.Z3_OP_BAND and len(args) == 2:
+            masks = [arg for arg in args if z3.is_bv_value(arg)]
+            terms = [arg for arg in args if not z3.is_bv_value(arg)]
+            if len(masks) == 1 and len(terms) == 1:
+                mask = masks[0].as_long()
+                if mask & (mask + 1) == 0:
+                    bits = mask.bit_length()
+                    return self.preimage(terms[0], mod_preimage(values, bits, width) if bits else
+                                         (full(width) if intersect(values, [(0, 0)]) else []))
+            raise UnsupportedConstraint("bvand with a non low-bit mask")
+
+        if kind == z3.Z3_OP_CONCAT and all(z3.is_bv_value(arg) for arg in args[:-1]):
+            tail = args[-1]
+            prefix = 0
+            for arg in args[:-1]:
+                prefix = (prefix << arg.size()) | arg.as_long()
+            base = prefix << tail.size()
+            window = intersect(values, [(base, base + width_mask(tail.size()))])
+            return self.preimage(tail, [(lo - base, hi - base) for lo, hi in window])
+
+        raise UnsupportedConstraint(f"term {term.decl().name()}")
+
+    def atom(self, expr):
+        """Return ``(variable, interval set)`` satisfying a comparison against a constant."""
+        kind = expr.decl().kind()
+        left, right = expr.children()
+        if not z3.is_bv(left):
+            raise UnsupportedConstraint("comparison between booleans")
+        if z3.is_bv_value(right) and not z3.is_bv_value(left):
+            term, constant = left, right.as_long()
+        elif z3.is_bv_value(left) and not z3.is_bv_value(right):
+            term, constant, kind = right, left.as_long(), COMPARISON_FLIP[kind]
+        else:
+            raise UnsupportedConstraint("comparison between two terms")
+        return self.preimage(term, comparison_values(kind, constant, term.size()))
+
+    @staticmethod
+    def intersect_boxes(boxes1, boxes2):
+        result = []
+        for box1 in boxes1:
+            for box2 in boxes2:
+                box = dict(box1)
+                for name, values in box2.items():
+                    box[name] = intersect(box[name], values) if name in box else values
+                if all(box.values()):
+                    result.append(box)
+                if len(result) > MAX_BOXES:
+                    raise UnsupportedConstraint("too many boxes")
+        return result
+
+    def boxes(self, expr, positive=True):
+        """Satisfying set of ``expr`` (or of its negation) as a list of ``{variable: intervals}`` boxes."""
+        kind = expr.decl().kind()
+        args = expr.children()
+
+        if kind in (z3.Z3_OP_TRUE, z3.Z3_OP_FALSE):
+            return [{}] if (kind == z3.Z3_OP_TRUE) == positive else []
+        if kind == z3.Z3_OP_NOT:
+            return self.boxes(args[0], not positive)
+        if kind in (z3.Z3_OP_AND, z3.Z3_OP_OR, z3.Z3_OP_IMPLIES):
+            if kind == z3.Z3_OP_IMPLIES:
+                parts = [self.boxes(args[0], not positive), self.boxes(args[1], positive)]
+                conjunctive = not positive
+            else:
+                parts = [self.boxes(arg, positive) for arg in args]
+                conjunctive = (kind == z3.Z3_OP_AND) == positive
+            if not conjunctive:
+                result = [box for part in parts for box in part]
+                if len(result) > MAX_BOXES:
+                    raise UnsupportedConstraint("too many boxes")
+                return result
+            result = [{}]
+            for part in parts:
+                result = self.intersect_boxes(result, part)
+            return result
+        if kind in COMPARISON_FLIP:
+            name, values = self.atom(expr)
+            if not positive:
+                values = complement(values, self.widths[name])
+            return [{name: values}] if values else []
+
+        raise UnsupportedConstraint(f"connective {expr.decl().name()}")
+
+    def canonical(self, boxes, names):
+        """Unique representation of a box union over ``names`` (at most two variables)."""
+        completed = [[box.get(name, full(self.widths[name])) for name in names] for box in boxes]
+        if not names:
+            return bool(completed)
+        if len(names) == 1:
+            result = []
+            for box in completed:
+                result = union(result, box[0])
+            return result
+
+        cuts = {0, 1 << self.widths[names[0]]}
+        for box in completed:
+            for lo, hi in box[0]:
+                cuts.update((lo, hi + 1))
+        cuts = sorted(cuts)
+        segments = []
+        for lo, end in zip(cuts, cuts[1:]):
+            column = []
+            for box in completed:
+                if intersect(box[0], [(lo, lo)]):
+                    column = union(column, box[1])
+            if segments and segments[-1][2] == column:
+                segments[-1] = (segments[-1][0], end - 1, column)
+            else:
+                segments.append((lo, end - 1, column))
+        return segments
+
+    def distinguishing_input(self, canonical1, canonical2, names):
+        """An assignment inside exactly one of the two canonical sets."""
+        if not names:
+            return {}
+        if len(names) == 1:
+            width = self.widths[names[0]]
+            differing = union(difference(canonical1, canonical2, width), difference(canonical2, canonical1, width))
+            return {names[0]: differing[0][0]}
+
+        width = self.widths[names[1]]
+        for lo, hi, column1 in canonical1:
+            for lo2, hi2, column2 in canonical2:
+                if max(lo, lo2) > min(hi, hi2) or column1 == column2:
+                    continue
+                differing = union(difference(column1, column2, width), difference(column2, column1, width))
+                return {names[0]: max(lo, lo2), names[1]: differing[0][0]}
+        return None
+
+    def decide(self, formula1, formula2):
+        """Return ``(verdict, model)`` when both formulas are in the interval fragment, else None."""
+        self.attempts += 1
+        self.widths = {}
+        try:
+            boxes1 = self.boxes(formula1)
+            boxes2 = self.boxes(formula2)
+            names = sorted(self.widths)
+            if len(names) > MAX_VARIABLES:
+                return None
+            canonical1 = self.canonical(boxes1, names)
+            canonical2 = self.canonical(boxes2, names)
+        except (UnsupportedConstraint, z3.Z3Exception, ValueError):
+            return None
+
+        if canonical1 == canonical2:
+            self.decided += 1
+            return "equivalent", None
+
+        assignment = self.distinguishing_input(canonical1, canonical2, names)
+        if assignment is None:
+            return None
+        ctx = formula1.ctx
+        substitutions = [
+            (z3.BitVec(name, self.widths[name], ctx=ctx), z3.BitVecVal(value, self.widths[name], ctx=ctx))
+            for name, value in assignment.items()
+        ]
+        if not z3.is_true(z3.simplify(z3.substitute(z3.Xor(formula1, formula2), *substitutions))):
+            return None
+        self.decided += 1
+        return "not_equivalent", "[" + ", ".join(f"{name} = {value}" for name, value in sorted(assignment.items())) + "]"
@@ -0,0 +1,249 @@
+"""
+Packed, memory-mappable corpus of symbolic-execution path files.
+
+A corpus file replaces a directory of ``*_path_N.txt`` files with one binary
+file made of three parts:
+
+* a fixed header (magic, version, index offset/length),
+* a data section with a UTF-8 text heap for assert bodies and little-endian
+  int64 columns (assert offsets/lengths, array indices/values),
+* a JSON index with one record per original path file (variables, assert
+  span, array-state spans and digests, signature metadata).
+
+Readers map the file once and slice the columns with ``numpy.frombuffer``, so
+array states are zero-copy views into the mapping and loading a whole corpus
+costs one open/mmap instead of an open/read/regex cycle per path file.
+"""
+
+import os
+import re
+import ast
+import glob
+import json
+import mmap
+import time
+import struct
+import argparse
+import numpy as np
+
+CORPUS_MAGIC = b'SAPCORP1'
+CORPUS_VERSION = 1
+HEADER_FORMAT = '<8sIQQ'
+HEADER_SIZE = 32
+COLUMN_DTYPE = np.dtype('<i8')
+
+def parse_signature_metadata(content):
+    """Extract the ``;`` comment metadata consumed by the signature-based analyzers."""
+    def literal(pattern, default):
+        match = re.search(pattern, content)
+        if not match:
+            return default
+        try:
+            return ast.literal_eval(match.group(1))
+        except (ValueError, SyntaxError):
+            return default
+
+    hash_match = re.search(r'; 内存哈希: (.+)', content)
+    try:
+        memory_hash = int(hash_match.group(1)) if hash_match else 0
+    except ValueError:
+        memory_hash = 0
+
+    output_match = re.search(r'; 程序输出:\s*(.+?)(?:\n|$)', content, re.DOTALL)
+
+    return {
+        'variable_values': literal(r'; 变量值: (.+)', {}),
+        'input_values': literal(r'; 输入变量值: (.+)', {}),
+        'symbol_values': literal(r'; 符号变量值: (.+)', {}),
+        'constraint_info': literal(r'; 约束信息: (.+)', {'count': 0, 'types': []}),
+        'memory_hash': memory_hash,
+        'program_output': output_match.group(1).strip() if output_match else "",
+        'multiplicity': literal(r'; 路径重复数: (\d+)', 1)
+    }
+
+class PathCorpusWriter:
+    """Accumulates parsed path files and writes them as one packed corpus file."""
+
+    def __init__(self):
+        self.text_heap = bytearray()
+        self.assert_offsets = []
+        self.assert_lengths = []
+        self.array_indices = []
+        self.array_values = []
+        self.records = []
+
+    def add_array_state(self, snapshot):
+        """Append an array state to the int64 columns and return its index entry."""
+        entry = {'digest': snapshot.digest, 'arrays': {}}
+        for name, (indices, values) in snapshot.arrays.items():
+            if indices.dtype == object or values.dtype == object:
+                entry['arrays'][name] = {'items': [[k, v] for k, v in zip(indices.tolist(), values.tolist())]}
+                continue
+            entry['arrays'][name] = {'start': len(self.array_indices), 'count': len(indices)}
+            self.array_indices.extend(indices.tolist())
+            self.array_values.extend(values.tolist())
+        return entry
+
+    def add_path(self, name, path_info, signature):
+        """Add one parsed path file under its original file name."""
+        assert_start = len(self.assert_offsets)
+        for constraint in path_info['constraints']:
+            encoded = constraint.encode('utf-8')
+            self.assert_offsets.append(len(self.text_heap))
+            self.assert_lengths.append(len(encoded))
+            self.text_heap.extend(encoded)
+
+        self.records.append({
+            'name': name,
+            'variables': path_info['variables'],
+            'asserts': [assert_start, len(path_info['constraints'])],
+            'array_initial': self.add_array_state(path_info['array_initial']),
+            'array_final': self.add_array_state(path_info['array_final']),
+            'signature': signature
+        })
+
+    def write(self, output_path):
+        """Write header, data section and index to ``output_path``."""
+        columns = {}
+        with open(output_path, 'wb') as f:
+            f.write(b'\0' * HEADER_SIZE)
+
+            heap_offset = f.tell()
+            f.write(self.text_heap)
+            for column_name in ('assert_offsets', 'assert_lengths', 'array_indices', 'array_values'):
+                f.write(b'\0' * (-f.tell() % COLUMN_DTYPE.itemsize))
+                values = np.asarray(getattr(self, column_name), dtype=COLUMN_DTYPE)
+                columns[column_name] = [f.tell(), len(values)]
+                f.write(values.tobytes())
+
+            index = {
+                'version': CORPUS_VERSION,
+                'text_heap': [heap_offset, len(self.text_heap)],
+                'columns': columns,
+                'records': self.records
+            }
+            index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+            index_offset = f.tell()
+            f.write(index_bytes)
+
+            f.seek(0)
+            f.write(struct.pack(HEADER_FORMAT, CORPUS_MAGIC, CORPUS_VERSION, index_offset, len(index_bytes)))
+
+class PathCorpus:
+    """Read-only, memory-mapped view of a packed path corpus."""
+
+    def __init__(self, corpus_path):
+        self.corpus_path = corpus_path
+        self.file = open(corpus_path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_offset, index_length = struct.unpack_from(HEADER_FORMAT, self.buffer, 0)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(f"{corpus_path} is not a version {CORPUS_VERSION} path corpus")
+
+        index = json.loads(self.buffer[index_offset:index_offset + index_length].decode('utf-8'))
+        self.heap_offset, _ = index['text_heap']
+        self.columns = {
+            name: np.frombuffer(self.buffer, dtype=COLUMN_DTYPE, count=count, offset=offset)
+            for name, (offset, count) in index['columns'].items()
+        }
+        self.records = {record['name']: record for record in index['records']}
+
+    def __getstate__(self):
+        return {'corpus_path': self.corpus_path}
+
+    def __setstate__(self, state):
+        self.__init__(state['corpus_path'])
+
+    def __contains__(self, file_path):
+        return os.path.basename(file_path) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def files_with_prefix(self, prefix):
+        """Return the paths a ``glob(prefix + '*.txt')`` over the original directory would yield."""
+        directory, base = os.path.split(prefix)
+        return sorted(
+            os.path.join(directory, name) for name in self.records
+            if name.startswith(base) and name.endswith('.txt')
+        )
+
+    def record(self, file_path):
+        return self.records[os.path.basename(file_path)]
+
+    def constraints(self, file_path):
+        """Decode the assert bodies of a path."""
+        start, count = self.record(file_path)['asserts']
+        offsets = self.columns['assert_offsets'][start:start + count]
+        lengths = self.columns['assert_lengths'][start:start + count]
+        return [
+            self.buffer[self.heap_offset + offset:self.heap_offset + offset + length].decode('utf-8')
+            for offset, length in zip(offsets.tolist(), lengths.tolist())
+        ]
+
+    def array_state(self, entry):
+        """Return ``({name: (indices, values)}, digest)`` with int64 views into the mapping."""
+        arrays = {}
+        for name, span in entry['arrays'].items():
+            if 'items' in span:
+                items = span['items']
+                arrays[name] = (np.array([k for k, _ in items], dtype=object),
+                                np.array([v for _, v in items], dtype=object))
+                continue
+            start, count = span['start'], span['count']
+            arrays[name] = (self.columns['array_indices'][start:start + count],
+                            self.columns['array_values'][start:start + count])
+        return arrays, entry['digest']
+
+    def constraint_formula(self, file_path):
+        """Return ``(variables, constraints)`` like the text extractors do."""
+        return dict(self.record(file_path)['variables']), self.constraints(file_path)
+
+    def path_signature(self, file_path):
+        """Return the signature dictionary produced by ``extract_path_signature_from_file``."""
+        signature = self.record(file_path)['signature']
+        return {
+            'file_path': file_path,
+            'variable_values': signature['variable_values'],
+            'constraint_info': signature['constraint_info'],
+            'memory_hash': signature['memory_hash'],
+            'program_output': signature['program_output']
+        }
+
+    def close(self):
+        self.columns = {}
+        self.buffer.close()
+        self.file.close()
+
+def convert_directory(paths_dir, output_path, pattern="*_path_*.txt"):
+    """Pack every path file in ``paths_dir`` into a single corpus file."""
+    from semantic_equivalence_analyzer import EnhancedConstraintChecker
+
+    checker = EnhancedConstraintChecker()
+    writer = PathCorpusWriter()
+    for file_path in sorted(glob.glob(os.path.join(paths_dir, pattern))):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        writer.add_path(os.path.basename(file_path), checker.extract_path_info(file_path),
+                        parse_signature_metadata(content))
+    writer.write(output_path)
+    return len(writer.records)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a directory of path files into a packed path corpus')
+    parser.add_argument('paths_dir', help='Directory containing *_path_N.txt files')
+    parser.add_argument('--output', help='Corpus file to write (default: <paths_dir>.corpus)')
+    parser.add_argument('--pattern', default='*_path_*.txt', help='Glob pattern for path files inside paths_dir')
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.normpath(args.paths_dir) + '.corpus'
+
+    start_time = time.time()
+    count = convert_directory(args.paths_dir, output_path, args.pattern)
+    convert_time = time.time() - start_time
+    print(f"Packed {count} path files into {output_path} "
+          f"({os.path.getsize(output_path)} bytes, {convert_time:.3f} seconds)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Portfolio solving with adaptive timeouts for equivalence queries.
+
+A single default ``Solver()`` with a fixed timeout is a poor fit for a corpus
+where most queries are trivial and a few are hard, and where the best Z3
+configuration differs from query to query. ``PortfolioSolver`` decides
+``formula1 xor formula2`` by
+
+* racing several configurations (``STRATEGIES``) in separate processes, taking
+  the first ``sat``/``unsat`` answer and terminating the others, and
+* starting with a short timeout and escalating it geometrically, up to the
+  caller's timeout, only for queries that come back ``unknown``.
+
+The query is shipped to the racing processes as SMT-LIB text, each process
+parses it into its own context. Racing only happens in the top-level process:
+inside any child process, such as a ``--jobs`` pool worker (ProcessPoolExecutor
+workers are not daemonic, so they could otherwise fork a race per query), the
+strategies are tried one after another in-process instead.
+The strategy that produced each verdict is returned so defaults can be tuned.
+"""
+
+import time
+import queue
+import multiprocessing
+import z3
+
+STRATEGIES = ('default', 'qfbv', 'preprocess', 'sat')
+RESULT_GRACE = 2.0
+
+def make_solver(strategy, ctx):
+    """Return a solver for one portfolio strategy."""
+    if strategy == 'default':
+        return z3.Solver(ctx=ctx)
+    if strategy == 'qfbv':
+        return z3.Tactic('qfbv', ctx=ctx).solver()
+    if strategy == 'preprocess':
+        return z3.Then('simplify', 'solve-eqs', 'smt', ctx=ctx).solver()
+    if strategy == 'sat':
+        return z3.Then('simplify', 'bit-blast', 'sat', ctx=ctx).solver()
+    raise ValueError(f"unknown portfolio strategy: {strategy}")
+
+def solve_with_strategy(strategy, assertions, timeout, ctx):
+    """Run one strategy; return ``(result_name, model_text)``."""
+    solver = make_solver(strategy, ctx)
+    solver.set("timeout", timeout)
+    solver.add(assertions)
+    result = solver.check()
+    model = str(solver.model()) if result == z3.sat else None
+    return str(result), model
+
+def strategy_worker(strategy, query, timeout, results):
+    """Process entry point: parse ``query`` in a fresh context and report the strategy's answer."""
+    try:
+        ctx = z3.Context()
+        result, model = solve_with_strategy(strategy, z3.parse_smt2_string(query, ctx=ctx), timeout, ctx)
+    except Exception:
+        result, model = 'unknown', None
+    results.put((strategy, result, model))
+
+class PortfolioSolver:
+    """Race Z3 configurations and escalate timeouts for ``unknown`` queries."""
+
+    def __init__(self, strategies=STRATEGIES, initial_timeout=None, escalation=4, parallel=True):
+        for strategy in strategies:
+            if strategy not in STRATEGIES:
+                raise ValueError(f"unknown portfolio strategy: {strategy}")
+        self.strategies = tuple(strategies)
+        self.initial_timeout = initial_timeout
+        self.escalation = escalation
+        self.parallel = parallel
+
+    def can_race(self):
+        """Race only from the top-level process; pool workers already use one core each."""
+        return (self.parallel and len(self.strategies) > 1
+                and multiprocessing.parent_process() is None)
+
+    def race(self, query, timeout):
+        """Start every strategy in its own process; return the first definitive answer."""
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=strategy_worker, args=(strategy, query, timeout, results), daemon=True)
+            for strategy in self.strategies
+        ]
+        for process in processes:
+            process.start()
+
+        outcome = ('unknown', None, None)
+        deadline = time.time() + timeout / 1000 + RESULT_GRACE
+        try:
+            for _ in processes:
+                try:
+                    strategy, result, model = results.get(timeout=max(0.01, deadline - time.time()))
+                except queue.Empty:
+                    break
+                if result in ('sat', 'unsat'):
+                    outcome = (result, model, strategy)
+                    break
+        finally:
+            # losers may still be solving or blocked flushing their answer into the queue
+            for process in processes:
+                process.terminate()
+                process.join()
+            results.close()
+        return outcome
+
+    def run_in_sequence(self, assertion, timeout):
+        """Try the strategies one after another in the caller's context."""
+        for strategy in self.strategies:
+            result, model = solve_with_strategy(strategy, assertion, timeout, assertion.ctx)
+            if result in ('sat', 'unsat'):
+                return result, model, strategy
+        return 'unknown', None, None
+
+    def check(self, formula1, formula2, max_timeout):
+        """Decide whether the formulas differ somewhere.
+
+        Returns ``(result, model, details)`` where ``result`` is ``z3.sat``,
+        ``z3.unsat`` or ``z3.unknown`` and ``details`` records the winning
+        strategy, the timeout that produced the answer and the number of rounds.
+        """
+        assertion = z3.Xor(formula1, formula2)
+        timeout = min(self.initial_timeout or max_timeout, max_timeout)
+        query = None
+        rounds = 0
+        while True:
+            rounds += 1
+            if self.can_race():
+                if query is None:
+                    serializer = z3.Solver(ctx=assertion.ctx)
+                    serializer.add(assertion)
+                    query = serializer.to_smt2()
+                result, model, strategy = self.race(query, timeout)
+            else:
+                result, model, strategy = self.run_in_sequence(assertion, timeout)
+            if result != 'unknown' or timeout >= max_timeout:
+                break
+            timeout = min(max_timeout, timeout * self.escalation)
+
+        verdict = {'sat': z3.sat, 'unsat': z3.unsat}.get(result, z3.unknown)
+        return verdict, model, {"strategy": strategy, "timeout_ms": timeout, "rounds": rounds}
@@ -9,15 +9,180 @@ The analyzer combines constraint equivalence and array-state comparisons
 to reason about full path equivalence between two programs.
 """
 
+import os
+import sys
 import re
 import z3
 from z3 import *
 import glob
 import time
 import datetime
+import ast
 import json
+import hashlib
+import multiprocessing.util
 from itertools import combinations
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from verdict_cache import EquivalenceVerdictCache
+    VERDICT_CACHE_AVAILABLE = True
+except ImportError:
+    VERDICT_CACHE_AVAILABLE = False
+
+try:
+    from path_corpus import PathCorpus
+    PATH_CORPUS_AVAILABLE = True
+except ImportError:
+    PATH_CORPUS_AVAILABLE = False
+
+try:
+    from concrete_refutation import ConcreteRefuter, resolve_witness
+    CONCRETE_REFUTATION_AVAILABLE = True
+except ImportError:
+    CONCRETE_REFUTATION_AVAILABLE = False
+
+try:
+    from interval_analysis import IntervalDecider
+    INTERVAL_ANALYSIS_AVAILABLE = True
+except ImportError:
+    INTERVAL_ANALYSIS_AVAILABLE = False
+
+try:
+    from formula_normalization import FormulaNormalizer, pair_key
+    FORMULA_NORMALIZATION_AVAILABLE = True
+except ImportError:
+    FORMULA_NORMALIZATION_AVAILABLE = False
+
+try:
+    from portfolio_solver import PortfolioSolver, STRATEGIES
+    PORTFOLIO_SOLVER_AVAILABLE = True
+except ImportError:
+    PORTFOLIO_SOLVER_AVAILABLE = False
+
+try:
+    from conjunct_decomposition import ConjunctDecomposer
+    CONJUNCT_DECOMPOSITION_AVAILABLE = True
+except ImportError:
+    CONJUNCT_DECOMPOSITION_AVAILABLE = False
+
+ARRAY_BLOCK_PATTERN = re.compile(r"'([^']+)'\s*:\s*\{([^{}]*)\}")
+INTEGER_PAIRS_PATTERN = re.compile(r'\s*(?:-?\d+\s*:\s*-?\d+\s*(?:,\s*)?)*')
+MULTIPLICITY_PATTERN = re.compile(r'^; 路径重复数:\s*(\d+)', re.MULTILINE)
+WITNESS_PATTERN = re.compile(r'^; (?:输入变量值|变量值|符号变量值):\s*(.+)$', re.MULTILINE)
+
+def parse_witness(content):
+    """Merge the concrete input values recorded in a path file's ``;`` metadata."""
+    witness = {}
+    for match in WITNESS_PATTERN.finditer(content):
+        try:
+            values = ast.literal_eval(match.group(1))
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(values, dict):
+            witness.update(values)
+    return witness
+
+def invert_mapping(var_mapping):
+    """Turn a ``{path1 name: path2 name}`` alignment into the renaming applied to path 2."""
+    return {name2: name1 for name1, name2 in (var_mapping or {}).items() if name1 != name2}
+
+class ArrayStateSnapshot:
+    """Compact array state: per-array sorted index/value vectors plus a content digest.
+
+    Vectors are NumPy arrays when NumPy is installed and plain tuples otherwise.
+    """
+
+    def __init__(self, arrays=None, digest=None):
+        self.arrays = {}
+        for name, (indices, values) in (arrays or {}).items():
+            if not NUMPY_AVAILABLE:
+                order = sorted(range(len(indices)), key=indices.__getitem__)
+                indices, values = tuple(indices[k] for k in order), tuple(values[k] for k in order)
+            elif len(indices) > 1 and not np.all(indices[:-1] <= indices[1:]):
+                order = np.argsort(indices, kind='stable')
+                indices, values = indices[order], values[order]
+            self.arrays[name] = (indices, values)
+        self.digest = digest or self.compute_digest()
+
+    def __bool__(self):
+        return bool(self.arrays)
+
+    def __eq__(self, other):
+        return isinstance(other, ArrayStateSnapshot) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    @staticmethod
+    def to_vector(items):
+        if not NUMPY_AVAILABLE:
+            return tuple(items)
+        if all(type(item) is int for item in items):
+            try:
+                return np.array(items, dtype=np.int64)
+            except OverflowError:
+                pass
+        return np.array(items, dtype=object)
+
+    @classmethod
+    def from_dict(cls, state):
+        """Build a snapshot from a ``{array: {index: value}}`` dictionary."""
+        arrays = {}
+        for name, values in (state or {}).items():
+            indices = list(values.keys())
+            arrays[name] = (cls.to_vector(indices), cls.to_vector([values[idx] for idx in indices]))
+        return cls(arrays)
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a ``{'a': {0: 1, ...}, ...}`` literal without ``eval``.
+
+        Integer-only states are read with regular expressions straight into
+        int64 vectors; anything else goes through ``ast.literal_eval``.
+        """
+        text = text.strip()
+        blocks = ARRAY_BLOCK_PATTERN.findall(text)
+        skeleton = ARRAY_BLOCK_PATTERN.sub('', text)
+        if re.fullmatch(r'\{[\s,]*\}', skeleton) and all(
+            INTEGER_PAIRS_PATTERN.fullmatch(body) for _, body in blocks
+        ):
+            arrays = {}
+            for name, body in blocks:
+                numbers = [int(number) for number in re.findall(r'-?\d+', body)]
+                arrays[name] = (cls.to_vector(numbers[0::2]), cls.to_vector(numbers[1::2]))
+            return cls(arrays)
+        return cls.from_dict(ast.literal_eval(text))
+
+    def compute_digest(self):
+        if not self.arrays:
+            return "empty"
+        digest = hashlib.sha1()
+        for name in sorted(self.arrays):
+            indices, values = self.arrays[name]
+            digest.update(name.encode('utf-8'))
+            for vector in (indices, values):
+                if not NUMPY_AVAILABLE:
+                    digest.update(repr(list(vector)).encode('utf-8'))
+                elif vector.dtype == object:
+                    digest.update(repr(vector.tolist()).encode('utf-8'))
+                else:
+                    digest.update(str(len(vector)).encode('utf-8'))
+                    digest.update(vector.tobytes())
+        return digest.hexdigest()
+
+    def to_dict(self):
+        return {
+            name: dict(zip(indices.tolist(), values.tolist())) if NUMPY_AVAILABLE else dict(zip(indices, values))
+            for name, (indices, values) in self.arrays.items()
+        }
 
 class ArrayStateComparator:
     """Helper for comparing encoded array states extracted from path files."""
@@ -27,8 +192,8 @@ class ArrayStateComparator:
         
     def parse_array_state(self, content):
         """Parse initial and final array states from a path file."""
-        array_initial = {}
-        array_final = {}
+        array_initial = ArrayStateSnapshot()
+        array_final = ArrayStateSnapshot()
         
         lines = content.split('\n')
         for line in lines:
@@ -38,46 +203,163 @@ class ArrayStateComparator:
             if line.startswith('; 数组初始值:') or line.startswith('; Initial array state:'):
                 try:
                     array_str = line.split(':', 1)[1].strip()
-                    array_initial = eval(array_str)                                
-                except:
+                    array_initial = ArrayStateSnapshot.parse(array_str)
+                except (ValueError, SyntaxError):
                     pass
                     
                                       
             elif line.startswith('; 数组最终值:') or line.startswith('; Final array state:'):
                 try:
                     array_str = line.split(':', 1)[1].strip()
-                    array_final = eval(array_str)                                
-                except:
+                    array_final = ArrayStateSnapshot.parse(array_str)
+                except (ValueError, SyntaxError):
                     pass
                     
         return array_initial, array_final
     
     def compare_array_states(self, state1, state2):
-        """Compare two array-state dictionaries for structural and value equality."""
+        """Compare two array states: digest check first, then vectorized value comparison."""
+        if not isinstance(state1, ArrayStateSnapshot):
+            state1 = ArrayStateSnapshot.from_dict(state1)
+        if not isinstance(state2, ArrayStateSnapshot):
+            state2 = ArrayStateSnapshot.from_dict(state2)
+        
         if not state1 and not state2:
             return True, "both_empty"
             
         if not state1 or not state2:
             return False, "one_empty"
-            
+        
+        if state1.digest == state2.digest:
+            return True, "identical"
                              
-        if set(state1.keys()) != set(state2.keys()):
-            return False, f"different_arrays: {set(state1.keys())} vs {set(state2.keys())}"
+        if set(state1.arrays) != set(state2.arrays):
+            return False, f"different_arrays: {set(state1.arrays)} vs {set(state2.arrays)}"
             
                                              
-        for array_name in state1.keys():
-            arr1 = state1[array_name]
-            arr2 = state2[array_name]
+        for array_name in state1.arrays:
+            indices1, values1 = state1.arrays[array_name]
+            indices2, values2 = state2.arrays[array_name]
             
-            if set(arr1.keys()) != set(arr2.keys()):
-                return False, f"different_indices_in_{array_name}: {set(arr1.keys())} vs {set(arr2.keys())}"
-                
-            for idx in arr1.keys():
-                if arr1[idx] != arr2[idx]:
-                    return False, f"different_value_in_{array_name}[{idx}]: {arr1[idx]} vs {arr2[idx]}"
+            if not NUMPY_AVAILABLE:
+                if indices1 != indices2:
+                    return False, f"different_indices_in_{array_name}: {set(indices1)} vs {set(indices2)}"
+                differing = [k for k, (value1, value2) in enumerate(zip(values1, values2)) if value1 != value2]
+                first_indices = [indices1[k] for k in differing[:5]]
+            else:
+                if len(indices1) != len(indices2) or np.any(indices1 != indices2):
+                    return False, f"different_indices_in_{array_name}: {set(indices1.tolist())} vs {set(indices2.tolist())}"
+                differing = np.flatnonzero(values1 != values2)
+                first_indices = indices1[differing[:5]].tolist()
+            if len(differing):
+                first = differing[0]
+                return False, (f"different_value_in_{array_name}[{indices1[first]}]: {values1[first]} vs {values2[first]} "
+                               f"({len(differing)} differing, first indices {first_indices})")
                     
         return True, "identical"
 
+class PathSignatureIndex:
+    """Bucket paths by cheap invariants so only plausible pairs reach the solver.
+
+    Two paths can only be fully equivalent if their declared variables line up
+    under the scanf mapping and both array states are identical, so a pair whose
+    signatures differ is pruned without a Z3 query. Pruned pairs are never
+    classified, so they are missing from the partially equivalent pairs; the
+    analyzer therefore only prunes when asked to (``--prune``).
+    """
+
+    def __init__(self, paths):
+        self.buckets = defaultdict(list)
+        for index, path_info in enumerate(paths):
+            self.buckets[self.compute_signature(path_info)].append(index)
+
+    @staticmethod
+    def array_state_digest(state):
+        """Return the content digest of an array state."""
+        if not isinstance(state, ArrayStateSnapshot):
+            state = ArrayStateSnapshot.from_dict(state)
+        return state.digest
+
+    @staticmethod
+    def variable_shape(variables):
+        """Describe declared variables independently of scanf naming suffixes."""
+        scanf_widths = []
+        other_vars = []
+        for name, bit_width in variables.items():
+            match = re.search(r'scanf_(\d+)', name)
+            if match:
+                scanf_widths.append((int(match.group(1)), bit_width))
+            else:
+                other_vars.append((name, bit_width))
+        scanf_widths.sort()
+        return (tuple(width for _, width in scanf_widths), tuple(sorted(other_vars)))
+
+    def compute_signature(self, path_info):
+        """Compute the bucket key of a single loaded path."""
+        return (
+            self.variable_shape(path_info['variables']),
+            self.array_state_digest(path_info['array_initial']),
+            self.array_state_digest(path_info['array_final'])
+        )
+
+    def candidates_for(self, path_info):
+        """Return the indices of indexed paths sharing the bucket of ``path_info``."""
+        return self.buckets.get(self.compute_signature(path_info), [])
+
+class ParsedFormulaStore:
+    """Per-run store that parses each path's constraints into Z3 ASTs exactly once.
+
+    Formulas are keyed by path file, parsed in a single shared context, and the
+    scanf variable mapping is applied with ``substitute`` instead of rewriting
+    SMT-LIB text for every pair.
+    """
+
+    def __init__(self, checker, ctx=None):
+        self.checker = checker
+        self.ctx = ctx
+        self.entries = {}
+        self.parse_time = 0.0
+        self.parse_count = 0
+
+    def path_key(self, path_info):
+        return path_info.get('file', id(path_info))
+
+    def entry_for(self, path_info):
+        """Return ``(smt_text, formula, declared_consts)`` for a path, parsing it on first use."""
+        key = self.path_key(path_info)
+        entry = self.entries.get(key)
+        if entry is None:
+            parse_start = time.time()
+            smt_text = self.checker.build_smt_formula(path_info['variables'], path_info['constraints'])
+            parsed = parse_smt2_string(smt_text, ctx=self.ctx)
+            formula = And(*parsed) if len(parsed) > 1 else parsed[0] if parsed else BoolVal(True, ctx=self.ctx)
+            declared = {
+                name: BitVec(name, bit_width, ctx=self.ctx)
+                for name, bit_width in path_info['variables'].items()
+            }
+            entry = (smt_text, formula, declared)
+            self.entries[key] = entry
+            self.parse_time += time.time() - parse_start
+            self.parse_count += 1
+        return entry
+
+    def mapped_formula(self, path_info, var_mapping):
+        """Return the formula of path 2 renamed into path-1 variables.
+
+        ``var_mapping`` is the ``{path1 name: path2 name}`` alignment from
+        ``create_variable_mapping``; it is inverted before substitution since
+        the formula only declares path-2 names.
+        """
+        _, formula, declared = self.entry_for(path_info)
+        substitutions = []
+        for old_name, new_name in invert_mapping(var_mapping).items():
+            if old_name in declared:
+                old_const = declared[old_name]
+                substitutions.append((old_const, BitVec(new_name, old_const.size(), ctx=self.ctx)))
+        if not substitutions:
+            return formula
+        return substitute(formula, *substitutions)
+
 class EnhancedConstraintChecker:
     """Enhanced checker for logical constraint equivalence plus array-state checks."""
     
@@ -88,6 +370,29 @@ class EnhancedConstraintChecker:
         self.array_time = 0.0
         self.array_call_count = 0
         self.array_comparator = ArrayStateComparator()
+        self.ctx = None
+        self.verdict_cache = None
+        self.formula_store = None
+        self.corpus = None
+        self.incremental = False
+        self.incremental_path_key = None
+        self.incremental_solver = None
+        self.cache_hit_count = 0
+        self.cache_miss_count = 0
+        self.refuter = None
+        self.refuted_pair_count = 0
+        self.interval_decider = None
+        self.interval_pair_count = 0
+        self.normalizer = None
+        self.normal_forms = {}
+        self.structural_pair_count = 0
+        self.portfolio = None
+        self.strategy_wins = defaultdict(int)
+        self.timeout_escalations = 0
+        self.decomposer = None
+        self.decomposed_pair_count = 0
+        self.component_query_count = 0
+        self.component_cache_hit_count = 0
         
     def normalize_variable_names(self, formula, var_mapping):
         """Normalize variable names so that the two formulas can be compared."""
@@ -97,6 +402,9 @@ class EnhancedConstraintChecker:
     
     def extract_path_info(self, file_path):
         """Extract full path information (constraints + array states) from a file."""
+        if self.corpus is not None and file_path in self.corpus:
+            return self.extract_corpus_path_info(file_path)
+        
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
@@ -121,11 +429,33 @@ class EnhancedConstraintChecker:
                                       
         array_initial, array_final = self.array_comparator.parse_array_state(content)
         
+        multiplicity_match = MULTIPLICITY_PATTERN.search(content)
+        
         return {
             'variables': variables,
             'constraints': constraints,
             'array_initial': array_initial,
-            'array_final': array_final
+            'array_final': array_final,
+            'multiplicity': int(multiplicity_match.group(1)) if multiplicity_match else 1,
+            'witness': parse_witness(content)
+        }
+    
+    def extract_corpus_path_info(self, file_path):
+        """Build path information from the packed corpus instead of re-reading the text file."""
+        variables, constraints = self.corpus.constraint_formula(file_path)
+        record = self.corpus.record(file_path)
+        
+        return {
+            'variables': variables,
+            'constraints': constraints,
+            'array_initial': ArrayStateSnapshot(*self.corpus.array_state(record['array_initial'])),
+            'array_final': ArrayStateSnapshot(*self.corpus.array_state(record['array_final'])),
+            'multiplicity': record['signature'].get('multiplicity', 1),
+            'witness': {
+                **record['signature'].get('variable_values', {}),
+                **record['signature'].get('input_values', {}),
+                **record['signature'].get('symbol_values', {})
+            }
         }
     
     def create_variable_mapping(self, vars1, vars2):
@@ -176,11 +506,16 @@ class EnhancedConstraintChecker:
                                                 
         print("    Step 1: checking constraint equivalence...")
         constraint_start = time.time()
-        constraint_result, constraint_details = self.check_constraint_equivalence(
-            path1_info['constraints'], path2_info['constraints'],
-            path1_info['variables'], path2_info['variables'],
-            var_mapping
-        )
+        if self.formula_store is not None:
+            constraint_result, constraint_details = self.check_stored_equivalence(
+                path1_info, path2_info, var_mapping
+            )
+        else:
+            constraint_result, constraint_details = self.check_constraint_equivalence(
+                path1_info['constraints'], path2_info['constraints'],
+                path1_info['variables'], path2_info['variables'],
+                var_mapping, self.path_witnesses(path1_info, path2_info, var_mapping)
+            )
         constraint_time = time.time() - constraint_start
         result['constraint_time'] = constraint_time
         result['details']['constraint'] = constraint_details
@@ -204,7 +539,7 @@ class EnhancedConstraintChecker:
                 print(f"      ✓ Initial array states match (time: {array_initial_time:.3f}s)")
                 
                                                     
-            print("    Step 3: checking final array states...")
+                print("    Step 3: checking final array states...")
                 array_final_start = time.time()
                 final_same, final_details = self.array_comparator.compare_array_states(
                     path1_info['array_final'], path2_info['array_final']
@@ -227,58 +562,285 @@ class EnhancedConstraintChecker:
         
         result['total_time'] = time.time() - total_start_time
         
-                                            
-        self.constraint_time += constraint_time
+        self.accumulate_timing(result)
+        
+        return result
+    
+    def accumulate_timing(self, result):
+        """Add the timings of one three-step result to the running statistics."""
+        self.constraint_time += result['constraint_time']
         self.constraint_call_count += 1
         if result['constraint_equivalent']:
             self.array_time += result['array_initial_time'] + result['array_final_time']
             self.array_call_count += 2
         
-        return result
+        cache_hit = result['details'].get('constraint', {}).get('cache_hit')
+        if cache_hit is True:
+            self.cache_hit_count += 1
+        elif cache_hit is False:
+            self.cache_miss_count += 1
+        
+        decided_by = result['details'].get('constraint', {}).get('decided_by')
+        if cache_hit is not True and decided_by == 'refutation':
+            self.refuted_pair_count += 1
+        elif cache_hit is not True and decided_by == 'interval':
+            self.interval_pair_count += 1
+        elif cache_hit is not True and decided_by == 'structural':
+            self.structural_pair_count += 1
+        
+        constraint_details = result['details'].get('constraint', {})
+        if cache_hit is not True and 'rounds' in constraint_details:
+            self.timeout_escalations += constraint_details['rounds'] - 1
+            if constraint_details.get('strategy'):
+                self.strategy_wins[constraint_details['strategy']] += 1
+        if cache_hit is not True and 'components' in constraint_details:
+            self.decomposed_pair_count += 1
+            self.component_query_count += constraint_details['component_queries']
+            self.component_cache_hit_count += constraint_details['component_cache_hits']
+    
+    def path_witnesses(self, path1_info, path2_info, var_mapping):
+        """Concrete witnesses of both paths, keyed by the variable names used in the query."""
+        if self.refuter is None:
+            return []
+        return [
+            resolve_witness(path1_info.get('witness'), path1_info['variables']),
+            resolve_witness(path2_info.get('witness'), path2_info['variables'], invert_mapping(var_mapping))
+        ]
+    
+    def refute_by_evaluation(self, formula1, formula2, witnesses, cache_key, start_time):
+        """Try to decide ``not_equivalent`` by concrete evaluation; None means fall through to Z3."""
+        if self.refuter is None:
+            return None
+        model = self.refuter.refute(formula1, formula2, witnesses)
+        if model is None:
+            return None
+        return self.record_fast_verdict("not_equivalent", model, "refutation", cache_key, start_time)
+    
+    def decide_by_intervals(self, formula1, formula2, cache_key, start_time):
+        """Decide one- or two-variable range formulas by interval comparison; None means fall through."""
+        if self.interval_decider is None:
+            return None
+        decided = self.interval_decider.decide(formula1, formula2)
+        if decided is None:
+            return None
+        verdict, model = decided
+        return self.record_fast_verdict(verdict, model, "interval", cache_key, start_time)
     
-    def check_constraint_equivalence(self, constraints1, constraints2, vars1, vars2, var_mapping):
+    def record_fast_verdict(self, verdict, model, decided_by, cache_key, start_time):
+        """Build ``(verdict, details)`` for a verdict reached without Z3 and store it in the cache."""
+        details = {"solve_time": time.time() - start_time, "decided_by": decided_by}
+        if model is not None:
+            details["model"] = model
+        if cache_key is not None:
+            self.verdict_cache.put(cache_key, verdict, details)
+            details["cache_hit"] = False
+        return verdict, details
+    
+    def check_constraint_equivalence(self, constraints1, constraints2, vars1, vars2, var_mapping, witnesses=()):
         """Check whether two sets of constraints are logically equivalent."""
         start_time = time.time()
         
-        solver = Solver()
-        solver.set("timeout", self.timeout)
-        
         try:
                                                
             smt_formula1 = self.build_smt_formula(vars1, constraints1)
-            smt_formula2 = self.build_smt_formula(vars2, constraints2, var_mapping)
+            renaming = invert_mapping(var_mapping)
+            smt_formula2 = self.build_smt_formula(vars2, constraints2, renaming)
+            
+            cache_key, cached = self.lookup_cached_verdict(smt_formula1, smt_formula2, renaming, start_time)
+            if cached is not None:
+                return cached
             
                                      
-            F1 = parse_smt2_string(smt_formula1)
-            F2 = parse_smt2_string(smt_formula2)
+            F1 = parse_smt2_string(smt_formula1, ctx=self.ctx)
+            F2 = parse_smt2_string(smt_formula2, ctx=self.ctx)
             
                                                       
-            formula1 = And(*F1) if len(F1) > 1 else F1[0] if F1 else BoolVal(True)
-            formula2 = And(*F2) if len(F2) > 1 else F2[0] if F2 else BoolVal(True)
+            formula1 = And(*F1) if len(F1) > 1 else F1[0] if F1 else BoolVal(True, ctx=self.ctx)
+            formula2 = And(*F2) if len(F2) > 1 else F2[0] if F2 else BoolVal(True, ctx=self.ctx)
             
-                                                             
-            equivalence_check = Or(
-                And(formula1, Not(formula2)),
-                And(Not(formula1), formula2)
-            )
+            # formula2 is already written in path-1 variables
+            forms = self.normal_form_pair(formula1, formula2)
+            if forms is not None and forms[0].same_structure(forms[1]):
+                return self.record_fast_verdict("equivalent", None, "structural", cache_key, start_time)
             
-            solver.add(equivalence_check)
-            result = solver.check()
+            decided = self.decide_by_intervals(formula1, formula2, cache_key, start_time)
+            if decided is not None:
+                return decided
             
-            solve_time = time.time() - start_time
+            refuted = self.refute_by_evaluation(formula1, formula2, witnesses, cache_key, start_time)
+            if refuted is not None:
+                return refuted
             
-            if result == unsat:
-                return "equivalent", {"solve_time": solve_time}
-            elif result == sat:
-                model = solver.model()
-                return "not_equivalent", {"model": str(model), "solve_time": solve_time}
-            else:
-                return "unknown", {"solve_time": solve_time}
+            return self.solve_equivalence(formula1, formula2, cache_key, start_time)
                 
         except Exception as e:
             solve_time = time.time() - start_time
             return "error", {"error": str(e), "solve_time": solve_time}
     
+    def check_stored_equivalence(self, path1_info, path2_info, var_mapping):
+        """Check constraint equivalence using ASTs from the preparsed formula store."""
+        start_time = time.time()
+        
+        try:
+            smt_formula1, formula1, _ = self.formula_store.entry_for(path1_info)
+            smt_formula2, unmapped_formula2, _ = self.formula_store.entry_for(path2_info)
+            renaming = invert_mapping(var_mapping)
+            
+            forms = self.normal_form_pair(formula1, unmapped_formula2, path1_info, path2_info)
+            cache_key, cached = self.lookup_cached_verdict(smt_formula1, smt_formula2, renaming, start_time, forms)
+            if cached is not None:
+                return cached
+            
+            # same order as check_constraint_equivalence: cache lookup first, then the structural shortcut
+            if forms is not None and forms[0].same_structure(forms[1], renaming):
+                return self.record_fast_verdict("equivalent", None, "structural", cache_key, start_time)
+            
+            formula2 = self.formula_store.mapped_formula(path2_info, var_mapping)
+            decided = self.decide_by_intervals(formula1, formula2, cache_key, start_time)
+            if decided is not None:
+                return decided
+            refuted = self.refute_by_evaluation(
+                formula1, formula2, self.path_witnesses(path1_info, path2_info, var_mapping), cache_key, start_time
+            )
+            if refuted is not None:
+                return refuted
+            if self.incremental:
+                return self.solve_incremental(path1_info, formula1, formula2, cache_key, start_time)
+            return self.solve_equivalence(formula1, formula2, cache_key, start_time)
+        
+        except Exception as e:
+            solve_time = time.time() - start_time
+            return "error", {"error": str(e), "solve_time": solve_time}
+    
+    def normal_form_pair(self, formula1, formula2, path1_info=None, path2_info=None):
+        """Canonical forms of both formulas (memoized per path file), or None when normalization is off."""
+        if self.normalizer is None:
+            return None
+        forms = []
+        for formula, path_info in ((formula1, path1_info), (formula2, path2_info)):
+            key = self.formula_store.path_key(path_info) if path_info is not None else None
+            form = self.normal_forms.get(key) if key is not None else None
+            if form is None:
+                try:
+                    form = self.normalizer.normalize(formula)
+                except RecursionError:
+                    return None
+                if key is not None:
+                    self.normal_forms[key] = form
+            forms.append(form)
+        return forms
+    
+    def lookup_cached_verdict(self, smt_formula1, smt_formula2, renaming, start_time, forms=None):
+        """Return ``(cache_key, cached_result)``; both are None when caching is disabled.
+
+        ``renaming`` is the renaming applied to path 2 for the solver query. With
+        canonical ``forms`` the key is built from their structural hashes and
+        variable alignment, so it survives renamed variables and reformatting.
+        """
+        if self.verdict_cache is None:
+            return None, None
+        
+        if forms is not None:
+            cache_key = self.verdict_cache.make_key(*pair_key(forms[0], forms[1], renaming), self.timeout)
+        else:
+            cache_key = self.verdict_cache.make_key(smt_formula1, smt_formula2, renaming, self.timeout)
+        cached = self.verdict_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        
+        verdict, details = cached
+        details.update({"solve_time": time.time() - start_time, "cache_hit": True})
+        return cache_key, (verdict, details)
+    
+    def solve_equivalence(self, formula1, formula2, cache_key, start_time):
+        """Decide ``formula1 <=> formula2`` with Z3 and record the verdict in the cache."""
+        if self.decomposer is not None:
+            decomposed = self.decomposer.check(formula1, formula2, self.solve_component)
+            if decomposed is not None:
+                result, model, decomposition_details = decomposed
+                return self.record_verdict(result, model, cache_key, start_time, decomposition_details)
+        
+        if self.portfolio is not None:
+            result, model, portfolio_details = self.portfolio.check(formula1, formula2, self.timeout)
+            return self.record_verdict(result, model, cache_key, start_time, portfolio_details)
+        
+        solver = Solver(ctx=self.ctx)
+        solver.set("timeout", self.timeout)
+        
+                                                         
+        equivalence_check = Or(
+            And(formula1, Not(formula2)),
+            And(Not(formula1), formula2)
+        )
+        
+        solver.add(equivalence_check)
+        result = solver.check()
+        model = str(solver.model()) if result == sat else None
+        
+        return self.record_verdict(result, model, cache_key, start_time)
+    
+    def solve_component(self, formula1, formula2):
+        """Decide one component-level XOR query; returns ``(result, model)``."""
+        if self.portfolio is not None:
+            result, model, _ = self.portfolio.check(formula1, formula2, self.timeout)
+            return result, model
+        solver = Solver(ctx=formula1.ctx)
+        solver.set("timeout", self.timeout)
+        solver.add(Xor(formula1, formula2))
+        result = solver.check()
+        return result, str(solver.model()) if result == sat else None
+    
+    def solve_incremental(self, path1_info, formula1, formula2, cache_key, start_time):
+        """Decide equivalence on a solver kept per path1, testing each candidate inside push/pop.
+
+        ``formula1`` is asserted once behind the literal ``path1_holds``; every
+        candidate only adds ``path1_holds xor formula2`` in a fresh scope, so
+        lemmas learned about path1 are reused across candidates.
+        """
+        path1_key = self.formula_store.path_key(path1_info)
+        if self.incremental_path_key != path1_key:
+            solver = Solver(ctx=self.ctx)
+            solver.set("timeout", self.timeout)
+            path1_holds = Bool('path1_holds', ctx=self.ctx)
+            solver.add(path1_holds == formula1)
+            self.incremental_solver = (solver, path1_holds)
+            self.incremental_path_key = path1_key
+        
+        solver, path1_holds = self.incremental_solver
+        solver.push()
+        try:
+            solver.add(Xor(path1_holds, formula2))
+            result = solver.check()
+            model = None
+            if result == sat:
+                assignment = solver.model()
+                model = "[" + ", ".join(
+                    f"{decl.name()} = {assignment[decl]}"
+                    for decl in assignment.decls() if decl.name() != 'path1_holds'
+                ) + "]"
+        finally:
+            solver.pop()
+        
+        return self.record_verdict(result, model, cache_key, start_time)
+    
+    def record_verdict(self, result, model, cache_key, start_time, extra_details=None):
+        """Turn a solver result into ``(verdict, details)`` and store it in the cache."""
+        solve_time = time.time() - start_time
+        
+        if result == unsat:
+            verdict, details = "equivalent", {"solve_time": solve_time}
+        elif result == sat:
+            verdict, details = "not_equivalent", {"model": model, "solve_time": solve_time}
+        else:
+            verdict, details = "unknown", {"solve_time": solve_time}
+        details.update(extra_details or {})
+        
+        if cache_key is not None:
+            self.verdict_cache.put(cache_key, verdict, details)
+            details["cache_hit"] = False
+        
+        return verdict, details
+    
     def build_smt_formula(self, variables, constraints, var_mapping=None):
         """Build a complete SMT-LIB formula from variable declarations and constraints."""
                                             
@@ -290,11 +852,10 @@ class EnhancedConstraintChecker:
                 new_name = var_mapping.get(old_name, old_name)
                 mapped_variables[new_name] = bit_width
             
+            # rename all variables in one pass so a target name is never renamed again
+            pattern = re.compile(r'\b(' + '|'.join(map(re.escape, var_mapping)) + r')\b')
             for constraint in constraints:
-                mapped_constraint = constraint
-                for old_name, new_name in var_mapping.items():
-                    mapped_constraint = re.sub(rf'\b{old_name}\b', new_name, mapped_constraint)
-                mapped_constraints.append(mapped_constraint)
+                mapped_constraints.append(pattern.sub(lambda match: var_mapping[match.group(1)], constraint))
             
             variables = mapped_variables
             constraints = mapped_constraints
@@ -314,15 +875,76 @@ class EnhancedConstraintChecker:
         
         return '\n'.join(formula_parts)
 
+pair_worker_state = {}
+
+def init_pair_worker(paths1, paths2, checker_options):
+    """Set up a pool worker with its own checker and Z3 context."""
+    sys.stdout = open(os.devnull, 'w')
+    checker = EnhancedConstraintChecker(timeout=checker_options['timeout'])
+    checker.ctx = Context()
+    checker.verdict_cache = checker_options['verdict_cache']
+    if checker.verdict_cache is not None:
+        # buffered last-access times are written when the worker exits
+        multiprocessing.util.Finalize(checker.verdict_cache, checker.verdict_cache.flush, exitpriority=10)
+    checker.incremental = checker_options['incremental']
+    if checker_options['refutation']:
+        checker.refuter = ConcreteRefuter()
+    if checker_options['intervals']:
+        checker.interval_decider = IntervalDecider()
+    if checker_options['normalize']:
+        checker.normalizer = FormulaNormalizer()
+    checker.portfolio = checker_options['portfolio']
+    if checker_options['decompose']:
+        checker.decomposer = ConjunctDecomposer()
+    if checker_options['use_formula_store']:
+        checker.formula_store = ParsedFormulaStore(checker, ctx=checker.ctx)
+    pair_worker_state['checker'] = checker
+    pair_worker_state['paths1'] = paths1
+    pair_worker_state['paths2'] = paths2
+
+def check_pair_worker(pair):
+    """Run the three-step check for one (path1, path2) index pair inside a worker."""
+    i, j = pair
+    checker = pair_worker_state['checker']
+    pair_start_time = time.time()
+    equivalence_result = checker.check_three_step_equivalence(
+        pair_worker_state['paths1'][i], pair_worker_state['paths2'][j]
+    )
+    return i, j, equivalence_result, time.time() - pair_start_time
+
 class EnhancedPathAnalyzer:
     """High-level driver that orchestrates enhanced path equivalence analysis."""
     
-    def __init__(self):
+    def __init__(self, prune_candidates=False, jobs=1, preparse_formulas=True, incremental=False, refutation=True,
+                 intervals=True, normalize=True, portfolio=False, initial_timeout=None,
+                 decompose=False):
         self.checker = EnhancedConstraintChecker()
+        if preparse_formulas or incremental:
+            self.checker.formula_store = ParsedFormulaStore(self.checker)
+        self.checker.incremental = incremental
+        if refutation and CONCRETE_REFUTATION_AVAILABLE:
+            self.checker.refuter = ConcreteRefuter()
+        if intervals and INTERVAL_ANALYSIS_AVAILABLE:
+            self.checker.interval_decider = IntervalDecider()
+        if normalize and FORMULA_NORMALIZATION_AVAILABLE:
+            self.checker.normalizer = FormulaNormalizer()
+        if portfolio or initial_timeout:
+            if not PORTFOLIO_SOLVER_AVAILABLE:
+                raise RuntimeError("--portfolio/--initial-timeout require the portfolio_solver module (src/symbolic_analysis/equivalence) on PYTHONPATH")
+            strategies = STRATEGIES if portfolio else ('default',)
+            self.checker.portfolio = PortfolioSolver(strategies, initial_timeout=initial_timeout)
+        if decompose:
+            if not CONJUNCT_DECOMPOSITION_AVAILABLE:
+                raise RuntimeError("--decompose requires the conjunct_decomposition module (src/symbolic_analysis/equivalence) on PYTHONPATH")
+            self.checker.decomposer = ConjunctDecomposer()
         self.analysis_start_time = None
         self.analysis_end_time = None
         self.detailed_timing = []
         self.symbolic_execution_time = 0.0           
+        self.prune_candidates = prune_candidates
+        self.jobs = jobs
+        self.pruned_pair_count = 0
+        self.solved_pair_count = 0
         
     def set_symbolic_execution_time(self, se_time):
         """Set the symbolic execution time (from an external run) for reporting."""
@@ -334,8 +956,12 @@ class EnhancedPathAnalyzer:
         print(f"开始程序等价性分析: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
                                  
-        files1 = sorted(glob.glob(f"{file_prefix1}*.txt"))
-        files2 = sorted(glob.glob(f"{file_prefix2}*.txt"))
+        if self.checker.corpus is not None:
+            files1 = self.checker.corpus.files_with_prefix(file_prefix1)
+            files2 = self.checker.corpus.files_with_prefix(file_prefix2)
+        else:
+            files1 = sorted(glob.glob(f"{file_prefix1}*.txt"))
+            files2 = sorted(glob.glob(f"{file_prefix2}*.txt"))
         
         print(f"程序1路径数: {len(files1)}")
         print(f"程序2路径数: {len(files2)}")
@@ -370,7 +996,13 @@ class EnhancedPathAnalyzer:
                                                  
         comparison_start = time.time()
         results = self.find_equivalent_paths_three_step(paths1, paths2)
+        if self.checker.verdict_cache is not None:
+            self.checker.verdict_cache.flush()
         comparison_time = time.time() - comparison_start
+        results['paths1_count'] = len(paths1)
+        results['paths2_count'] = len(paths2)
+        results['paths1_multiplicity'] = sum(path.get('multiplicity', 1) for path in paths1)
+        results['paths2_multiplicity'] = sum(path.get('multiplicity', 1) for path in paths2)
         
         self.analysis_end_time = time.time()
         total_time = self.analysis_end_time - self.analysis_start_time
@@ -387,24 +1019,100 @@ class EnhancedPathAnalyzer:
             'array_total_time': self.checker.array_time,
             'array_call_count': self.checker.array_call_count,
             'array_avg_time': self.checker.array_time / max(1, self.checker.array_call_count),
+            'formula_parse_time': self.checker.formula_store.parse_time if self.checker.formula_store else 0.0,
+            'formula_parse_count': self.checker.formula_store.parse_count if self.checker.formula_store else 0,
+            'cache_hits': self.checker.cache_hit_count,
+            'cache_misses': self.checker.cache_miss_count,
+            'refuted_pair_count': self.checker.refuted_pair_count,
+            'refuted_fraction': self.checker.refuted_pair_count / max(1, self.checker.constraint_call_count),
+            'interval_pair_count': self.checker.interval_pair_count,
+            'structural_pair_count': self.checker.structural_pair_count,
+            'strategy_wins': dict(self.checker.strategy_wins),
+            'timeout_escalations': self.checker.timeout_escalations,
+            'decomposed_pair_count': self.checker.decomposed_pair_count,
+            'component_query_count': self.checker.component_query_count,
+            'component_cache_hits': self.checker.component_cache_hit_count,
+            'pruned_pair_count': self.pruned_pair_count,
+            'solved_pair_count': self.solved_pair_count,
             'detailed_timing': self.detailed_timing,
             'start_time': datetime.datetime.fromtimestamp(self.analysis_start_time).strftime('%Y-%m-%d %H:%M:%S'),
             'end_time': datetime.datetime.fromtimestamp(self.analysis_end_time).strftime('%Y-%m-%d %H:%M:%S')
         }
         
                               
-        print(f"\n⏱️  Timing summary:")
+        print("\n⏱️  Timing summary:")
         print(f"  Symbolic execution (external): {self.symbolic_execution_time:.3f} seconds")
         print(f"  File loading: {load_time:.3f} seconds")
         print(f"  Path comparison: {comparison_time:.3f} seconds")
         print(f"    - SMT constraint checking: {self.checker.constraint_time:.3f} seconds ({self.checker.constraint_call_count} calls)")
         print(f"    - Array state comparison: {self.checker.array_time:.3f} seconds ({self.checker.array_call_count} calls)")
+        print(f"    - Candidate pruning: {self.pruned_pair_count} pairs pruned, {self.solved_pair_count} pairs solved")
+        print(f"    - Verdict cache: {self.checker.cache_hit_count} hits, {self.checker.cache_miss_count} misses")
+        print(f"    - Concrete refutation: {self.checker.refuted_pair_count} pairs decided "
+              f"({results['timing_info']['refuted_fraction']:.1%} of constraint checks)")
+        print(f"    - Interval fast path: {self.checker.interval_pair_count} pairs decided")
+        print(f"    - Structurally identical: {self.checker.structural_pair_count} pairs")
+        if self.checker.portfolio is not None:
+            print(f"    - Portfolio wins: {dict(self.checker.strategy_wins)}, "
+                  f"{self.checker.timeout_escalations} timeout escalations")
+        if self.checker.decomposer is not None:
+            print(f"    - Decomposition: {self.checker.decomposed_pair_count} pairs split into "
+                  f"{self.checker.component_query_count} component queries "
+                  f"({self.checker.component_cache_hit_count} cached)")
+        print(f"    - Formula parsing: {results['timing_info']['formula_parse_time']:.3f} seconds ({results['timing_info']['formula_parse_count']} paths)")
         print(f"  Total analysis time: {total_time:.3f} seconds")
         
         return results
     
+    def build_result_record(self, results, prefix1, prefix2, report_file):
+        """Build the machine-readable summary emitted on the result channel."""
+        timing = results['timing_info']
+        return {
+            'kind': 'equivalence',
+            'prefix1': prefix1,
+            'prefix2': prefix2,
+            'report_file': report_file,
+            'program_equivalent': bool(results['program_equivalent']),
+            'paths1_count': int(results['paths1_count']),
+            'paths2_count': int(results['paths2_count']),
+            'paths1_multiplicity': int(results.get('paths1_multiplicity', results['paths1_count'])),
+            'paths2_multiplicity': int(results.get('paths2_multiplicity', results['paths2_count'])),
+            'equivalent_pairs': len(results['equivalent_pairs']),
+            'partial_pairs': len(results['partial_equivalent_pairs']),
+            'non_equivalent_pairs': len(results['non_equivalent_pairs']),
+            'error_pairs': len(results['error_pairs']),
+            'total_pairs': (len(results['equivalent_pairs']) + len(results['partial_equivalent_pairs'])
+                            + len(results['non_equivalent_pairs'])),
+            'total_time': float(timing['total_time']),
+            'load_time': float(timing['load_time']),
+            'comparison_time': float(timing['comparison_time']),
+            'symbolic_execution_time': float(timing['symbolic_execution_time']),
+            'solve_time': float(timing['constraint_total_time']),
+            'solver_calls': int(timing['constraint_call_count']),
+            'array_time': float(timing['array_total_time']),
+            'formula_parse_time': float(timing['formula_parse_time']),
+            'pruned_pair_count': int(timing['pruned_pair_count']),
+            'solved_pair_count': int(timing['solved_pair_count']),
+            'cache_hits': int(timing['cache_hits']),
+            'cache_misses': int(timing['cache_misses']),
+            'refuted_pair_count': int(timing.get('refuted_pair_count', 0)),
+            'refuted_fraction': float(timing.get('refuted_fraction', 0.0)),
+            'interval_pair_count': int(timing.get('interval_pair_count', 0)),
+            'structural_pair_count': int(timing.get('structural_pair_count', 0)),
+            'strategy_wins': dict(timing.get('strategy_wins', {})),
+            'timeout_escalations': int(timing.get('timeout_escalations', 0)),
+            'decomposed_pair_count': int(timing.get('decomposed_pair_count', 0)),
+            'component_query_count': int(timing.get('component_query_count', 0)),
+            'component_cache_hits': int(timing.get('component_cache_hits', 0))
+        }
+    
     def find_equivalent_paths_three_step(self, paths1, paths2):
-        """Use the three-step procedure to identify equivalent path pairs."""
+        """Use the three-step procedure to identify equivalent path pairs.
+
+        A path file may stand for several identical paths (``multiplicity``, written
+        by generation-time deduplication). Matching then consumes multiplicities
+        greedily, which gives the same verdict as expanding every duplicate file.
+        """
         results = {
             'equivalent_pairs': [],
             'partial_equivalent_pairs': [],                                                 
@@ -415,103 +1123,173 @@ class EnhancedPathAnalyzer:
             'program_equivalent': False
         }
         
-        total_comparisons = len(paths1) * len(paths2)
+        if self.prune_candidates:
+            signature_index = PathSignatureIndex(paths2)
+            candidate_sets = [set(signature_index.candidates_for(path1)) for path1 in paths1]
+            print(f"\nSignature buckets: {len(signature_index.buckets)} for {len(paths2)} paths of program 2")
+        else:
+            candidate_sets = [set(range(len(paths2))) for _ in paths1]
+        
+        total_comparisons = sum(len(candidates) for candidates in candidate_sets)
+        
+        remaining2 = [path2.get('multiplicity', 1) for path2 in paths2]
+        
         current_comparison = 0
         comparison_start_time = time.time()
         
         print(f"\nStarting three-step equivalence checking ({total_comparisons} comparisons):")
         
-        for i, path1 in enumerate(paths1):
-            path1_matched = False
+        executor = self.start_pair_pool(paths1, paths2) if self.jobs > 1 else None
+        try:
+            for i, path1 in enumerate(paths1):
+                path1_matched = False
+                needed = path1.get('multiplicity', 1)
+                pending = None
+                if executor is not None:
+                    pending = self.submit_pair_checks(executor, i, [
+                        j for j in range(len(paths2)) if remaining2[j] and j in candidate_sets[i]
+                    ])
             
-            for j, path2 in enumerate(paths2):
-                if j in [pair['path2_index'] for pair in results['equivalent_pairs']]:
-                    continue            
+                for j, path2 in enumerate(paths2):
+                    if remaining2[j] == 0:
+                        continue            
+                
+                    if j not in candidate_sets[i]:
+                        self.pruned_pair_count += 1
+                        continue
                     
-                current_comparison += 1
-                pair_start_time = time.time()
+                    current_comparison += 1
+                    self.solved_pair_count += 1
+                    pair_start_time = time.time()
                 
                                           
-                if current_comparison > 1:
-                    elapsed = time.time() - comparison_start_time
-                    avg_time = elapsed / (current_comparison - 1)
-                    remaining = total_comparisons - current_comparison
-                    estimated_remaining = avg_time * remaining
-                    print(f"  Comparing {i+1}-{j+1} ({current_comparison}/{total_comparisons}, {current_comparison/total_comparisons*100:.1f}%) "
-                          f"- estimated remaining: {estimated_remaining:.1f}s")
-                else:
-                    print(f"  Comparing paths {i+1} vs {j+1}")
+                    if current_comparison > 1:
+                        elapsed = time.time() - comparison_start_time
+                        avg_time = elapsed / (current_comparison - 1)
+                        remaining = total_comparisons - current_comparison
+                        estimated_remaining = avg_time * remaining
+                        print(f"  Comparing {i+1}-{j+1} ({current_comparison}/{total_comparisons}, {current_comparison/total_comparisons*100:.1f}%) "
+                              f"- estimated remaining: {estimated_remaining:.1f}s")
+                    else:
+                        print(f"  Comparing paths {i+1} vs {j+1}")
                 
                                                                     
-                equivalence_result = self.checker.check_three_step_equivalence(path1, path2)
-                
-                pair_time = time.time() - pair_start_time
+                    if pending is not None:
+                        _, _, equivalence_result, pair_time = pending.pop(j).result()
+                        self.checker.accumulate_timing(equivalence_result)
+                    else:
+                        equivalence_result = self.checker.check_three_step_equivalence(path1, path2)
+                        pair_time = time.time() - pair_start_time
                 
                         
-                timing_detail = {
-                    'path1_index': i,
-                    'path2_index': j,
-                    'total_time': pair_time,
-                    'constraint_time': equivalence_result['constraint_time'],
-                    'array_initial_time': equivalence_result['array_initial_time'],
-                    'array_final_time': equivalence_result['array_final_time'],
-                    'result': 'equivalent' if equivalence_result['overall_equivalent'] else 'not_equivalent'
-                }
-                self.detailed_timing.append(timing_detail)
+                    timing_detail = {
+                        'path1_index': i,
+                        'path2_index': j,
+                        'total_time': pair_time,
+                        'constraint_time': equivalence_result['constraint_time'],
+                        'array_initial_time': equivalence_result['array_initial_time'],
+                        'array_final_time': equivalence_result['array_final_time'],
+                        'result': 'equivalent' if equivalence_result['overall_equivalent'] else 'not_equivalent'
+                    }
+                    self.detailed_timing.append(timing_detail)
                 
                                               
-                pair_info = {
-                    'path1_index': i,
-                    'path2_index': j,
-                    'path1_file': path1['file'],
-                    'path2_file': path2['file'],
-                    'equivalence_result': equivalence_result,
-                    'comparison_time': pair_time
-                }
+                    pair_info = {
+                        'path1_index': i,
+                        'path2_index': j,
+                        'path1_file': path1['file'],
+                        'path2_file': path2['file'],
+                        'equivalence_result': equivalence_result,
+                        'comparison_time': pair_time
+                    }
                 
-                if equivalence_result['overall_equivalent']:
+                    if equivalence_result['overall_equivalent']:
                                       
-                    results['equivalent_pairs'].append(pair_info)
-                    if i in results['unmatched_paths1']:
-                        results['unmatched_paths1'].remove(i)
-                    if j in results['unmatched_paths2']:
-                        results['unmatched_paths2'].remove(j)
+                        matched = min(needed, remaining2[j])
+                        needed -= matched
+                        remaining2[j] -= matched
+                        pair_info['multiplicity'] = matched
+                        results['equivalent_pairs'].append(pair_info)
+                        if remaining2[j] == 0 and j in results['unmatched_paths2']:
+                            results['unmatched_paths2'].remove(j)
                     
-                    print(f"    🎉 Fully equivalent! Time: {pair_time:.3f}s")
-                    path1_matched = True
-                    break           
+                        print(f"    🎉 Fully equivalent! Time: {pair_time:.3f}s"
+                              + (f" (×{matched})" if matched > 1 else ""))
+                        if needed == 0:
+                            results['unmatched_paths1'].remove(i)
+                            path1_matched = True
+                            break           
                     
-                elif (equivalence_result['constraint_equivalent'] or 
-                      equivalence_result['array_initial_same'] or 
-                      equivalence_result['array_final_same']):
+                    elif (equivalence_result['constraint_equivalent'] or 
+                          equivalence_result['array_initial_same'] or 
+                          equivalence_result['array_final_same']):
                           
-                    results['partial_equivalent_pairs'].append(pair_info)
-                    print(f"    ⚠️  Partially equivalent "
-                          f"(constraint:{equivalence_result['constraint_equivalent']}, "
-                          f"initial:{equivalence_result['array_initial_same']}, "
-                          f"final:{equivalence_result['array_final_same']}) "
-                          f"time: {pair_time:.3f}s")
+                        results['partial_equivalent_pairs'].append(pair_info)
+                        print(f"    ⚠️  Partially equivalent "
+                              f"(constraint:{equivalence_result['constraint_equivalent']}, "
+                              f"initial:{equivalence_result['array_initial_same']}, "
+                              f"final:{equivalence_result['array_final_same']}) "
+                              f"time: {pair_time:.3f}s")
                     
-                else:
+                    else:
                          
-                    results['non_equivalent_pairs'].append(pair_info)
+                        results['non_equivalent_pairs'].append(pair_info)
                     
-            if not path1_matched:
-                print(f"    ❌ No equivalent path found for path {i+1}")
+                if pending:
+                    # checks past the early exit are discarded, as serial mode never runs them
+                    for future in pending.values():
+                        future.cancel()
+            
+                if not path1_matched:
+                    print(f"    ❌ No equivalent path found for path {i+1}")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
         
                                                   
         results['program_equivalent'] = (len(results['unmatched_paths1']) == 0 and 
                                        len(results['unmatched_paths2']) == 0)
         
-        print(f"\n📊 Analysis summary:")
-        print(f"  Fully equivalent path pairs: {len(results['equivalent_pairs'])}")
+        print("\n📊 Analysis summary:")
+        print(f"  Fully equivalent path pairs: {len(results['equivalent_pairs'])}"
+              f" ({sum(pair['multiplicity'] for pair in results['equivalent_pairs'])} with duplicates)")
         print(f"  Partially equivalent path pairs: {len(results['partial_equivalent_pairs'])}")
         print(f"  Unmatched paths in program 1: {len(results['unmatched_paths1'])}")
         print(f"  Unmatched paths in program 2: {len(results['unmatched_paths2'])}")
+        print(f"  Pairs pruned by signature: {self.pruned_pair_count}, pairs sent to solver: {self.solved_pair_count}")
         print(f"  Overall program equivalence: {'✅ equivalent' if results['program_equivalent'] else '❌ NOT equivalent'}")
         
         return results
     
+    def start_pair_pool(self, paths1, paths2):
+        """Start the worker pool used to check the candidates of one program-1 path concurrently."""
+        print(f"Checking pairs on {self.jobs} worker processes...")
+        
+        checker_options = {
+            'timeout': self.checker.timeout,
+            'verdict_cache': self.checker.verdict_cache,
+            'use_formula_store': self.checker.formula_store is not None,
+            'incremental': self.checker.incremental,
+            'refutation': self.checker.refuter is not None,
+            'intervals': self.checker.interval_decider is not None,
+            'normalize': self.checker.normalizer is not None,
+            'portfolio': self.checker.portfolio,
+            'decompose': self.checker.decomposer is not None
+        }
+        
+        return ProcessPoolExecutor(max_workers=self.jobs,
+                                   initializer=init_pair_worker,
+                                   initargs=(paths1, paths2, checker_options))
+    
+    def submit_pair_checks(self, executor, i, candidates):
+        """Submit the candidates of path ``i`` and return their futures keyed by program-2 index.
+
+        The matching loop consumes the futures in serial order and stops at the
+        same early exit as serial mode, so matches and call counts do not depend
+        on ``--jobs``.
+        """
+        return {j: executor.submit(check_pair_worker, (i, j)) for j in candidates}
+    
     def generate_comprehensive_report(self, results, output_file="enhanced_equivalence_report.txt"):
         """Generate a comprehensive human-readable report for the analysis."""
         with open(output_file, "w", encoding='utf-8') as f:
@@ -537,6 +1315,18 @@ class EnhancedPathAnalyzer:
                 f.write(f"  - Path comparison:              {timing['comparison_time']:.3f} seconds\n")
                 f.write(f"    * SMT constraint checking:    {timing['constraint_total_time']:.3f} seconds ({timing['constraint_call_count']} calls)\n")
                 f.write(f"    * Array state comparison:     {timing['array_total_time']:.3f} seconds ({timing['array_call_count']} calls)\n")
+                f.write(f"    * Candidate pruning:          {timing['pruned_pair_count']} pairs pruned, {timing['solved_pair_count']} pairs solved\n")
+                f.write(f"    * Verdict cache:              {timing['cache_hits']} hits, {timing['cache_misses']} misses\n")
+                f.write(f"    * Concrete refutation:        {timing['refuted_pair_count']} pairs decided ({timing['refuted_fraction']:.1%} of constraint checks)\n")
+                f.write(f"    * Interval fast path:         {timing['interval_pair_count']} pairs decided\n")
+                f.write(f"    * Structurally identical:     {timing['structural_pair_count']} pairs\n")
+                if timing['strategy_wins'] or timing['timeout_escalations']:
+                    wins = ', '.join(f"{name}={count}" for name, count in sorted(timing['strategy_wins'].items()))
+                    f.write(f"    * Portfolio strategy wins:    {wins or 'none'} ({timing['timeout_escalations']} timeout escalations)\n")
+                if timing['decomposed_pair_count']:
+                    f.write(f"    * Conjunct decomposition:     {timing['decomposed_pair_count']} pairs, "
+                            f"{timing['component_query_count']} component queries ({timing['component_cache_hits']} cached)\n")
+                f.write(f"    * Formula parsing:            {timing['formula_parse_time']:.3f} seconds ({timing['formula_parse_count']} paths)\n")
                 f.write(f"Average SMT solve time:           {timing['constraint_avg_time']:.3f} seconds\n")
                 f.write(f"Average array-compare time:       {timing['array_avg_time']:.3f} seconds\n\n")
             
@@ -544,6 +1334,9 @@ class EnhancedPathAnalyzer:
             f.write("📊 Analysis statistics:\n")
             f.write("-" * 30 + "\n")
             f.write(f"Fully equivalent path pairs:   {len(results['equivalent_pairs'])}\n")
+            if 'paths1_multiplicity' in results:
+                f.write(f"Paths incl. duplicates:        {results['paths1_multiplicity']} vs {results['paths2_multiplicity']} "
+                        f"({results['paths1_count']} vs {results['paths2_count']} distinct files)\n")
             f.write(f"Partially equivalent path pairs: {len(results['partial_equivalent_pairs'])}\n")
             f.write(f"Non-equivalent path pairs:     {len(results['non_equivalent_pairs'])}\n")
             f.write(f"Analysis errors:               {len(results['error_pairs'])}\n")
@@ -561,7 +1354,7 @@ class EnhancedPathAnalyzer:
                     f.write(f"   Comparison time: {pair['comparison_time']:.3f} seconds\n")
                     
                     equiv_result = pair['equivalence_result']
-                    f.write(f"   Timing breakdown:\n")
+                    f.write("   Timing breakdown:\n")
                     f.write(f"     - Constraint checking:     {equiv_result['constraint_time']:.3f} seconds\n")
                     f.write(f"     - Initial array comparison:{equiv_result['array_initial_time']:.3f} seconds\n")
                     f.write(f"     - Final array comparison:  {equiv_result['array_final_time']:.3f} seconds\n")
@@ -577,7 +1370,7 @@ class EnhancedPathAnalyzer:
                     f.write(f"   File 2: {pair['path2_file']}\n")
                     
                     equiv_result = pair['equivalence_result']
-                    f.write(f"   Equivalence breakdown:\n")
+                    f.write("   Equivalence breakdown:\n")
                     f.write(f"     - Constraints equivalent:        {'✅' if equiv_result['constraint_equivalent'] else '❌'}\n")
                     f.write(f"     - Initial array states match:    {'✅' if equiv_result['array_initial_same'] else '❌'}\n")
                     f.write(f"     - Final array states match:      {'✅' if equiv_result['array_final_same'] else '❌'}\n")
@@ -612,11 +1405,45 @@ def main():
     parser.add_argument('--output', default='enhanced_equivalence_report.txt', help='Report output file path')
     parser.add_argument('--timeout', type=int, default=30000, help='Z3 solver timeout in milliseconds')
     parser.add_argument('--se-time', type=float, default=0.0, help='Symbolic execution time (seconds), for stats only')
+    parser.add_argument('--prune', action='store_true', help='Only check pairs in the same signature bucket (faster, but pruned pairs are not reported as partially equivalent)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for pair checking (1 = serial)')
+    parser.add_argument('--no-preparse', action='store_true', help='Re-parse SMT text for every pair instead of parsing each path once')
+    parser.add_argument('--incremental', action='store_true', help='Keep one push/pop solver per program-1 path instead of a fresh solver per pair')
+    parser.add_argument('--no-refutation', action='store_true', help='Skip the concrete-evaluation pre-pass and send every pair straight to Z3')
+    parser.add_argument('--no-intervals', action='store_true', help='Skip the interval fast path for one- and two-variable range constraints')
+    parser.add_argument('--no-normalize', action='store_true', help='Skip canonical normalization (structural shortcut and name-independent cache keys)')
+    parser.add_argument('--portfolio', action='store_true', help='Race several Z3 configurations per query in separate processes and keep the first definitive answer')
+    parser.add_argument('--initial-timeout', type=int, help='Start each query at this timeout (ms) and escalate up to --timeout only when it comes back unknown')
+    parser.add_argument('--decompose', action='store_true', help='Split each query into variable-disjoint conjunct components and check them separately')
+    parser.add_argument('--cache', help='SQLite file used as a persistent verdict cache (disabled if omitted)')
+    parser.add_argument('--cache-size', type=int, default=100000, help='Maximum number of cached verdicts (LRU eviction)')
+    parser.add_argument('--corpus', help='Packed path corpus (see path_corpus.py) to read paths from instead of text files')
+    parser.add_argument('--result-file', help='Append a JSON-lines summary record to this file for batch drivers')
+    parser.add_argument('--quiet', action='store_true', help='Suppress console output (use with --result-file)')
     
     args = parser.parse_args()
     
-    analyzer = EnhancedPathAnalyzer()
+    if args.quiet:
+        sys.stdout = open(os.devnull, 'w')
+    
+    analyzer = EnhancedPathAnalyzer(prune_candidates=args.prune, jobs=args.jobs,
+                                    preparse_formulas=not args.no_preparse,
+                                    incremental=args.incremental,
+                                    refutation=not args.no_refutation,
+                                    intervals=not args.no_intervals,
+                                    normalize=not args.no_normalize,
+                                    portfolio=args.portfolio,
+                                    initial_timeout=args.initial_timeout,
+                                    decompose=args.decompose)
     analyzer.checker.timeout = args.timeout
+    if args.cache:
+        if not VERDICT_CACHE_AVAILABLE:
+            raise RuntimeError("--cache requires the verdict_cache module (src/symbolic_analysis/equivalence) on PYTHONPATH")
+        analyzer.checker.verdict_cache = EquivalenceVerdictCache(args.cache, max_entries=args.cache_size)
+    if args.corpus:
+        if not PATH_CORPUS_AVAILABLE:
+            raise RuntimeError("--corpus requires the path_corpus module (src/symbolic_analysis/equivalence) and NumPy on PYTHONPATH")
+        analyzer.checker.corpus = PathCorpus(args.corpus)
     analyzer.set_symbolic_execution_time(args.se_time)
     
     print("🚀 Starting enhanced program equivalence analysis...")
@@ -631,6 +1458,11 @@ def main():
     
     analyzer.generate_comprehensive_report(results, args.output)
     
+    if args.result_file:
+        record = analyzer.build_result_record(results, args.prefix1, args.prefix2, args.output)
+        with open(args.result_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
     print("\n" + "=" * 60)
     print("🎯 Final analysis result:")
     print(f"  Program equivalence: {'✅ equivalent' if results['program_equivalent'] else '❌ NOT equivalent'}")
@@ -640,11 +1472,18 @@ def main():
     
     if 'timing_info' in results:
         timing = results['timing_info']
-        print(f"\n⏱️  Performance statistics:")
+        print("\n⏱️  Performance statistics:")
         print(f"  Total time:        {timing['total_time']:.3f} seconds")
         print(f"  Symbolic execution:{timing['symbolic_execution_time']:.3f} seconds")
         print(f"  SMT solving:       {timing['constraint_total_time']:.3f} seconds ({timing['constraint_call_count']} calls)")
         print(f"  Array comparison:  {timing['array_total_time']:.3f} seconds ({timing['array_call_count']} calls)")
+        print(f"  Pruned pairs:      {timing['pruned_pair_count']} (solved: {timing['solved_pair_count']})")
+        print(f"  Verdict cache:     {timing['cache_hits']} hits, {timing['cache_misses']} misses")
+        print(f"  Refuted pre-Z3:    {timing['refuted_pair_count']} ({timing['refuted_fraction']:.1%})")
+        print(f"  Interval-decided:  {timing['interval_pair_count']}")
+        print(f"  Structural:        {timing['structural_pair_count']}")
+        if timing['strategy_wins']:
+            print(f"  Portfolio wins:    {timing['strategy_wins']} ({timing['timeout_escalations']} escalations)")
     
     print("=" * 60)
     print("✅ Analysis complete. Please check the output report file for full details.")
@@ -2,18 +2,32 @@
 """
 SMT约束公式等价性验证工具
 直接验证两个SMT-LIB格式的约束公式是否逻辑等价
-不进行任何简化或预处理
+不进行任何简化或预处理；只涉及一两个变量的区间约束先走区间快速路径（interval_analysis.py）
 """
 
 import sys
 import time
 from z3 import *
 
+try:
+    from verdict_cache import EquivalenceVerdictCache
+    VERDICT_CACHE_AVAILABLE = True
+except ImportError:
+    VERDICT_CACHE_AVAILABLE = False
+
+try:
+    from interval_analysis import IntervalDecider
+    INTERVAL_ANALYSIS_AVAILABLE = True
+except ImportError:
+    INTERVAL_ANALYSIS_AVAILABLE = False
+
 class SMTEquivalenceChecker:
     """SMT约束公式等价性检查器"""
     
-    def __init__(self, timeout=30000):
+    def __init__(self, timeout=30000, verdict_cache=None, interval_fast_path=True):
         self.timeout = timeout
+        self.verdict_cache = verdict_cache
+        self.interval_decider = IntervalDecider() if interval_fast_path and INTERVAL_ANALYSIS_AVAILABLE else None
         
     def parse_smt_file(self, file_path):
         """解析SMT-LIB文件，返回完整的公式"""
@@ -74,6 +88,23 @@ class SMTEquivalenceChecker:
                 
         start_time = time.time()
         
+        cache_key = None
+        if self.verdict_cache is not None:
+            with open(file1, 'r') as f:
+                content1 = f.read()
+            with open(file2, 'r') as f:
+                content2 = f.read()
+            cache_key = self.verdict_cache.make_key(content1, content2, None, self.timeout)
+            cached = self.verdict_cache.get(cache_key)
+            if cached is not None:
+                verdict = cached[0]
+                print(f"命中等价性缓存: {verdict} (耗时: {time.time() - start_time:.3f} 秒)")
+                if verdict == "equivalent":
+                    return True
+                elif verdict == "not_equivalent":
+                    return False
+                return None
+        
                   
         ctx = Context()
         
@@ -90,6 +121,20 @@ class SMTEquivalenceChecker:
         parse_time = time.time() - start_time
         print(f"文件解析耗时: {parse_time:.3f} 秒")
         
+        if self.interval_decider is not None:
+            decided = self.interval_decider.decide(formula1, formula2)
+            if decided is not None:
+                verdict, model = decided
+                print(f"\n区间快速路径判定: {verdict} (总耗时: {time.time() - start_time:.3f} 秒)")
+                if verdict == "equivalent":
+                    print("  ✓ 约束公式等价")
+                    self.store_verdict(cache_key, verdict, {"decided_by": "interval"})
+                    return True
+                print("  ✗ 约束公式不等价")
+                print(f"  反例模型: {model}")
+                self.store_verdict(cache_key, verdict, {"model": model, "decided_by": "interval"})
+                return False
+        
                
         print("\n开始等价性验证...")
         verification_start = time.time()
@@ -120,6 +165,7 @@ class SMTEquivalenceChecker:
         
         if result == unsat:
             print("  ✓ 约束公式等价")
+            self.store_verdict(cache_key, "equivalent", {})
             return True
         elif result == sat:
             print("  ✗ 约束公式不等价")
@@ -127,11 +173,17 @@ class SMTEquivalenceChecker:
             print(f"  反例模型:")
             for decl in model.decls():
                 print(f"    {decl.name()} = {model[decl]}")
+            self.store_verdict(cache_key, "not_equivalent", {"model": str(model)})
             return False
         else:
             print("  ? 无法确定等价性（超时或未知）")
             return None
     
+    def store_verdict(self, cache_key, verdict, details):
+        """将求解结果写入等价性缓存"""
+        if self.verdict_cache is not None and cache_key is not None:
+            self.verdict_cache.put(cache_key, verdict, details)
+    
     def parse_smt_file_with_context(self, file_path, ctx):
         """使用指定上下文解析SMT-LIB文件"""
         try:
@@ -228,12 +280,27 @@ class SMTEquivalenceChecker:
 
 def main():
     """主函数"""
+    verdict_cache = None
+    if '--cache' in sys.argv:
+        cache_index = sys.argv.index('--cache')
+        if cache_index + 1 >= len(sys.argv):
+            print("缓存参数用法: --cache <缓存数据库文件>")
+            sys.exit(1)
+        if not VERDICT_CACHE_AVAILABLE:
+            raise RuntimeError("--cache requires the verdict_cache module (src/symbolic_analysis/equivalence) on PYTHONPATH")
+        verdict_cache = EquivalenceVerdictCache(sys.argv[cache_index + 1])
+        del sys.argv[cache_index:cache_index + 2]
+    
+    interval_fast_path = '--no-intervals' not in sys.argv
+    if not interval_fast_path:
+        sys.argv.remove('--no-intervals')
+    
     if len(sys.argv) < 3:
-        print("用法: python smt_equivalence_checker.py <file1> <file2>")
+        print("用法: python smt_equivalence_checker.py <file1> <file2> [--cache <db>] [--no-intervals]")
         print("       python smt_equivalence_checker.py --analyze <file>")
         sys.exit(1)
     
-    checker = SMTEquivalenceChecker()
+    checker = SMTEquivalenceChecker(verdict_cache=verdict_cache, interval_fast_path=interval_fast_path)
     
     if sys.argv[1] == '--analyze':
               
@@ -257,6 +324,11 @@ def main():
                  
         result = checker.check_equivalence(file1, file2)
         
+        if verdict_cache is not None:
+            verdict_cache.flush()
+            stats = verdict_cache.stats()
+            print(f"\n缓存统计: 命中 {stats['cache_hits']} 次, 未命中 {stats['cache_misses']} 次")
+        
         print(f"\n最终结论:")
         if result is True:
             print("  ✓ 两个SMT约束公式在逻辑上等价")
@@ -0,0 +1,160 @@
+"""
+Persistent, content-addressed cache of SMT equivalence verdicts.
+
+Verdicts are keyed by a hash of both normalized formulas, the variable mapping
+and the solver timeout, and stored in a SQLite database so that several worker
+processes (and later runs) can share them safely. Only definitive verdicts are
+stored; an ``unknown`` is re-solved next time. The cache is bounded and
+evicts the least recently used entries once it grows past ``max_entries``.
+
+To keep the write path cheap, the size bound is only checked every
+``eviction_interval`` inserts per process, so the table may briefly exceed
+``max_entries`` by that many rows per writer. Last-access times of cache hits
+are buffered and written in one batch, either with the next insert or once
+``access_batch_size`` hits are pending.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+
+class EquivalenceVerdictCache:
+    """Disk-backed LRU cache mapping equivalence queries to solver verdicts."""
+
+    # "unknown" depends on the timeout, strategy and machine load, so it is never persisted
+    CACHEABLE_VERDICTS = ("equivalent", "not_equivalent")
+
+    def __init__(self, db_path, max_entries=100000, eviction_interval=256, access_batch_size=64):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.eviction_interval = eviction_interval
+        self.access_batch_size = access_batch_size
+        self.hits = 0
+        self.misses = 0
+        self.inserts_since_eviction = 0
+        self.pending_access = {}
+        self.connection = None
+        self.connection_pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['connection'] = None
+        state['connection_pid'] = None
+        state['inserts_since_eviction'] = 0
+        state['pending_access'] = {}
+        return state
+
+    @staticmethod
+    def normalize_formula(formula):
+        """Drop SMT-LIB comments and collapse whitespace so formatting does not change the key."""
+        lines = [line.split(';', 1)[0] for line in formula.splitlines()]
+        return re.sub(r'\s+', ' ', ' '.join(lines)).strip()
+
+    @classmethod
+    def make_key(cls, formula1, formula2, var_mapping=None, timeout=None):
+        """Build the content hash for a pair of formulas."""
+        payload = json.dumps([
+            cls.normalize_formula(formula1),
+            cls.normalize_formula(formula2),
+            sorted((var_mapping or {}).items()),
+            timeout
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def connect(self):
+        """Return a connection owned by the current process, opening it if needed."""
+        if self.connection is None or self.connection_pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                " key TEXT PRIMARY KEY,"
+                " verdict TEXT NOT NULL,"
+                " details TEXT NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS verdicts_lru ON verdicts(last_access)")
+            self.connection = connection
+            self.connection_pid = os.getpid()
+        return self.connection
+
+    def get(self, key):
+        """Return ``(verdict, details)`` for a cached key, or None on a miss."""
+        connection = self.connect()
+        row = connection.execute(
+            "SELECT verdict, details FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] not in self.CACHEABLE_VERDICTS:
+            self.misses += 1
+            return None
+
+        self.pending_access[key] = time.time()
+        if len(self.pending_access) >= self.access_batch_size:
+            self.flush()
+        self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def write_pending_access(self, connection):
+        """Write buffered last-access times inside the caller's transaction."""
+        if self.pending_access:
+            connection.executemany(
+                "UPDATE verdicts SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in self.pending_access.items()]
+            )
+            self.pending_access = {}
+
+    def flush(self):
+        """Write buffered last-access times of cache hits in one transaction."""
+        if not self.pending_access:
+            return
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.write_pending_access(connection)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def put(self, key, verdict, details):
+        """Store a verdict; every ``eviction_interval`` inserts, evict least recently used entries beyond the bound."""
+        if verdict not in self.CACHEABLE_VERDICTS:
+            return
+
+        stored_details = {k: v for k, v in details.items() if k not in ('solve_time', 'cache_hit')}
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, details, last_access) VALUES (?, ?, ?, ?)",
+                (key, verdict, json.dumps(stored_details, ensure_ascii=False), time.time())
+            )
+            self.write_pending_access(connection)
+            self.inserts_since_eviction += 1
+            if self.inserts_since_eviction >= self.eviction_interval:
+                self.inserts_since_eviction = 0
+                count = connection.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+                if count > self.max_entries:
+                    connection.execute(
+                        "DELETE FROM verdicts WHERE key IN ("
+                        " SELECT key FROM verdicts ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def stats(self):
+        """Return hit/miss counters for the timing summary."""
+        total = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / total if total else 0.0
+        }
@@ -8,6 +8,14 @@
 2. 对每个程序的不同优化等级进行两两比较
 3. 记录详细的时间统计信息
 4. 生成综合分析报告
+
+分析脚本以 --quiet 运行，结果通过 --result-file (JSON-lines) 结构化返回；
+--legacy-stdout 可退回到解析标准输出。
+
+结果清单 (--manifest) 记录每组路径文件的内容哈希和每次比较的判定/耗时，
+重新运行时只重算输入发生变化的比较，中途崩溃或超时后可直接续跑。输入哈希
+覆盖路径文件、分析脚本及其导入的辅助模块、--corpus 语料内容和传给分析脚本
+的参数。
 """
 
 import os
@@ -16,19 +24,52 @@ import glob
 import time
 import datetime
 import subprocess
+import tempfile
 import json
 import re
+import hashlib
 from pathlib import Path
 import argparse
 from itertools import combinations
 from collections import defaultdict
 
+# semantic_equivalence_analyzer.py 导入的辅助模块，任何一个变化都可能改变判定
+EQUIVALENCE_HELPER_MODULES = (
+    'verdict_cache', 'path_corpus', 'concrete_refutation', 'interval_analysis',
+    'formula_normalization', 'portfolio_solver', 'conjunct_decomposition',
+)
+
+def file_digest(file_path):
+    """文件内容的 sha256（分块读取，语料文件可能很大）"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_result_record(result_file):
+    """读取结果文件中的最后一条 JSON-lines 记录，没有记录时返回 None"""
+    try:
+        with open(result_file, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
 class BatchEquivalenceAnalyzer:
     """批量等价性分析管理器"""
     
-    def __init__(self, timeout=120, equivalence_script="semantic_equivalence_analyzer.py"):
+    def __init__(self, timeout=120, equivalence_script="semantic_equivalence_analyzer.py", cache_path=None,
+                 corpus_path=None, result_channel=True, manifest_path=None, force=False):
         self.timeout = timeout
         self.equivalence_script = equivalence_script
+        self.cache_path = cache_path
+        self.corpus_path = corpus_path
+        self.result_channel = result_channel
+        self.manifest_path = manifest_path
+        self.force = force
+        self.manifest = self.load_manifest()
+        self.reused_count = 0
         self.results = {}
         self.total_start_time = None
         self.total_end_time = None
@@ -37,6 +78,74 @@ class BatchEquivalenceAnalyzer:
         self.all_comparisons = []
         self.target_programs = None              
         
+    def load_manifest(self):
+        """加载结果清单，不存在或损坏时返回空清单"""
+        empty = {'version': 1, 'path_sets': {}, 'comparisons': {}}
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return empty
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  结果清单无法读取，将重新计算: {self.manifest_path}")
+            return empty
+        if manifest.get('version') != 1:
+            return empty
+        return manifest
+    
+    def save_manifest(self):
+        """原子地写回结果清单（先写临时文件再替换）"""
+        if not self.manifest_path:
+            return
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
+    
+    def hash_path_set(self, set_name, files):
+        """计算一组路径文件的内容哈希并记录到清单"""
+        digest = hashlib.sha256()
+        for file_path in sorted(files):
+            with open(file_path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            digest.update(f"{os.path.basename(file_path)}:{content_hash}\n".encode('utf-8'))
+        set_hash = digest.hexdigest()
+        self.manifest['path_sets'][set_name] = {'hash': set_hash, 'file_count': len(files)}
+        return set_hash
+    
+    def helper_module_paths(self):
+        """按分析脚本的导入顺序（脚本所在目录、PYTHONPATH）定位辅助模块，找不到的为 None"""
+        search_dirs = [os.path.dirname(os.path.abspath(self.equivalence_script))]
+        search_dirs += [entry for entry in os.environ.get('PYTHONPATH', '').split(os.pathsep) if entry]
+        paths = {}
+        for module in EQUIVALENCE_HELPER_MODULES:
+            candidates = (os.path.join(directory, f"{module}.py") for directory in search_dirs)
+            paths[module] = next((path for path in candidates if os.path.exists(path)), None)
+        return paths
+    
+    def analyzer_options(self):
+        """传给分析脚本的判定相关参数（不含输出文件路径）"""
+        options = ["--timeout", str(self.timeout * 1000)]
+        if self.cache_path:
+            options.extend(["--cache", self.cache_path])
+        if self.corpus_path:
+            options.extend(["--corpus", self.corpus_path])
+        return options
+    
+    def comparison_input_hash(self, program, opt1, opt2, files1, files2):
+        """比较的输入哈希：两组路径文件内容 + 分析脚本及辅助模块内容 + 语料内容 + 分析参数"""
+        digest = hashlib.sha256()
+        digest.update(self.hash_path_set(f"{program}_{opt1}", files1).encode('utf-8'))
+        digest.update(self.hash_path_set(f"{program}_{opt2}", files2).encode('utf-8'))
+        if os.path.exists(self.equivalence_script):
+            digest.update(file_digest(self.equivalence_script).encode('utf-8'))
+        for module, path in sorted(self.helper_module_paths().items()):
+            digest.update(f"{module}:{file_digest(path) if path else 'missing'}\n".encode('utf-8'))
+        if self.corpus_path and os.path.exists(self.corpus_path):
+            digest.update(file_digest(self.corpus_path).encode('utf-8'))
+        digest.update(json.dumps(self.analyzer_options()).encode('utf-8'))
+        return digest.hexdigest()
+    
     def discover_programs_and_optimizations(self):
         """发现所有程序和优化等级"""
                   
@@ -90,7 +199,22 @@ class BatchEquivalenceAnalyzer:
         
         print(f"    发现路径: {len(files1)} vs {len(files2)}")
         
+        comparison_key = f"{program}|{opt1}|{opt2}"
+        input_hash = None
+        if self.manifest_path:
+            input_hash = self.comparison_input_hash(program, opt1, opt2, files1, files2)
+            entry = self.manifest['comparisons'].get(comparison_key)
+            if entry and entry['input_hash'] == input_hash and not self.force:
+                reused_result = dict(entry['result'], reused=True)
+                equiv_status = "✅ 等价" if reused_result['program_equivalent'] else "❌ 不等价"
+                print(f"    ♻️  输入未变化，复用清单结果: {equiv_status} (原耗时: {reused_result['execution_time']:.1f}s)")
+                self.reused_count += 1
+                self.successful_analyses.append(reused_result)
+                self.all_comparisons.append(reused_result)
+                return reused_result
+        
         start_time = time.time()
+        result_file = None
         
         try:
                   
@@ -100,8 +224,11 @@ class BatchEquivalenceAnalyzer:
                 prefix1.rstrip('_'),            
                 prefix2.rstrip('_'),
                 "--output", output_file,
-                "--timeout", str(self.timeout * 1000)         
-            ]
+            ] + self.analyzer_options()
+            if self.result_channel:
+                fd, result_file = tempfile.mkstemp(prefix="equivalence_result_", suffix=".jsonl")
+                os.close(fd)
+                cmd.extend(["--result-file", result_file, "--quiet"])
             
             print(f"    执行命令: {' '.join(cmd)}")
             
@@ -127,24 +254,31 @@ class BatchEquivalenceAnalyzer:
             partial_pairs = 0
             total_paths_compared = 0
             
-            for line in stdout_lines:
-                if "程序等价性:" in line:
-                    program_equivalent = "✅ 等价" in line
-                elif "完全等价路径对:" in line:
-                    try:
-                        equivalent_pairs = int(line.split(":")[-1].strip())
-                    except:
-                        pass
-                elif "部分等价路径对:" in line:
-                    try:
-                        partial_pairs = int(line.split(":")[-1].strip())
-                    except:
-                        pass
-                elif "总分析路径对:" in line:
-                    try:
-                        total_paths_compared = int(line.split(":")[-1].strip())
-                    except:
-                        pass
+            record = read_result_record(result_file) if result_file else None
+            if record is not None:
+                program_equivalent = record['program_equivalent']
+                equivalent_pairs = record['equivalent_pairs']
+                partial_pairs = record['partial_pairs']
+                total_paths_compared = record['total_pairs']
+            else:
+                for line in stdout_lines:
+                    if "程序等价性:" in line:
+                        program_equivalent = "✅ 等价" in line
+                    elif "完全等价路径对:" in line:
+                        try:
+                            equivalent_pairs = int(line.split(":")[-1].strip())
+                        except:
+                            pass
+                    elif "部分等价路径对:" in line:
+                        try:
+                            partial_pairs = int(line.split(":")[-1].strip())
+                        except:
+                            pass
+                    elif "总分析路径对:" in line:
+                        try:
+                            total_paths_compared = int(line.split(":")[-1].strip())
+                        except:
+                            pass
             
             analysis_result = {
                 'program': program,
@@ -162,11 +296,23 @@ class BatchEquivalenceAnalyzer:
                 'output_file': output_file,
                 'timestamp': datetime.datetime.now().isoformat()
             }
+            if record is not None:
+                analysis_result['timing'] = {
+                    key: record[key] for key in ('load_time', 'comparison_time', 'solve_time', 'solver_calls',
+                                                 'array_time', 'formula_parse_time', 'total_time')
+                }
+                analysis_result['structural_pairs'] = record.get('structural_pair_count', 0)
             
             if result.returncode == 0:
                 equiv_status = "✅ 等价" if program_equivalent else "❌ 不等价"
                 print(f"    {equiv_status}: {equivalent_pairs} 完全等价对, {partial_pairs} 部分等价对 (耗时: {execution_time:.1f}s)")
                 self.successful_analyses.append(analysis_result)
+                if input_hash:
+                    self.manifest['comparisons'][comparison_key] = {
+                        'input_hash': input_hash,
+                        'result': analysis_result
+                    }
+                    self.save_manifest()
             else:
                 print(f"    ❌ 失败: 返回码 {result.returncode} (耗时: {execution_time:.1f}s)")
                 analysis_result['error_output'] = result.stderr[:500]
@@ -224,6 +370,10 @@ class BatchEquivalenceAnalyzer:
             self.failed_analyses.append(exception_result)
             self.all_comparisons.append(exception_result)
             return exception_result
+        
+        finally:
+            if result_file and os.path.exists(result_file):
+                os.remove(result_file)
     
     def analyze_program(self, program, optimizations):
         """分析单个程序的所有优化等级组合"""
@@ -294,6 +444,8 @@ class BatchEquivalenceAnalyzer:
         
         print(f"\n🎉 批量等价性分析完成!")
         print(f"总耗时: {total_time:.1f} 秒 ({total_time/60:.1f} 分钟)")
+        if self.manifest_path:
+            print(f"清单复用: {self.reused_count}/{len(self.all_comparisons)} 次比较 ({self.manifest_path})")
         print(f"结束时间: {end_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
         
               
@@ -374,6 +526,7 @@ class BatchEquivalenceAnalyzer:
         total_equivalent_pairs = sum(result['equivalent_pairs'] for result in self.successful_analyses)
         total_partial_pairs = sum(result['partial_pairs'] for result in self.successful_analyses)
         total_paths_compared = sum(result['total_paths_compared'] for result in self.successful_analyses)
+        total_structural_pairs = sum(result.get('structural_pairs', 0) for result in self.successful_analyses)
         
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write("批量等价性分析报告\n")
@@ -389,11 +542,16 @@ class BatchEquivalenceAnalyzer:
             f.write(f"总比较次数: {total_count}\n")
             f.write(f"成功比较: {successful_count}\n")
             f.write(f"失败比较: {failed_count}\n")
+            f.write(f"清单复用比较: {self.reused_count}\n")
             f.write(f"成功率: {successful_count/total_count*100:.1f}%\n")
             f.write(f"完全等价的程序对: {total_equivalent_programs}\n")
             f.write(f"完全等价路径对总数: {total_equivalent_pairs}\n")
             f.write(f"部分等价路径对总数: {total_partial_pairs}\n")
             f.write(f"总路径比较数: {total_paths_compared}\n")
+            f.write(f"结构等价直接判定的路径对: {total_structural_pairs}")
+            if total_paths_compared:
+                f.write(f" ({total_structural_pairs/total_paths_compared*100:.1f}%)")
+            f.write("\n")
             if successful_count > 0:
                 f.write(f"平均比较时间: {sum(r['execution_time'] for r in self.successful_analyses)/successful_count:.1f} 秒\n")
             f.write("\n")
@@ -494,7 +652,8 @@ class BatchEquivalenceAnalyzer:
                 'failed_count': failed_count,
                 'total_equivalent_programs': total_equivalent_programs,
                 'total_equivalent_pairs': total_equivalent_pairs,
-                'total_partial_pairs': total_partial_pairs
+                'total_partial_pairs': total_partial_pairs,
+                'reused_count': self.reused_count
             },
             'results': self.results,
             'successful_analyses': self.successful_analyses,
@@ -514,6 +673,14 @@ def main():
     parser.add_argument('--script', default='semantic_equivalence_analyzer.py', help='等价性分析脚本路径')
     parser.add_argument('--dry-run', action='store_true', help='预览模式，只显示要分析的比较，不实际执行')
     parser.add_argument('--programs', nargs='*', help='指定要分析的程序（如不指定则分析全部）')
+    parser.add_argument('--cache', help='等价性判定缓存数据库路径，跨批次复用求解结果')
+    parser.add_argument('--corpus', help='打包路径语料文件 (path_corpus.py 生成)，分析脚本将从中读取路径')
+    parser.add_argument('--legacy-stdout', action='store_true',
+                        help='不传递 --result-file/--quiet，改为解析分析脚本的标准输出')
+    parser.add_argument('--manifest', default='batch_equivalence_manifest.json',
+                        help='结果清单路径，输入未变化的比较直接复用已有结果')
+    parser.add_argument('--no-manifest', action='store_true', help='不读写结果清单，全部重新计算')
+    parser.add_argument('--force', action='store_true', help='忽略清单中的已有结果重新计算（仍会更新清单）')
     
     args = parser.parse_args()
     
@@ -525,7 +692,12 @@ def main():
              
     analyzer = BatchEquivalenceAnalyzer(
         timeout=args.timeout,
-        equivalence_script=args.script
+        equivalence_script=args.script,
+        cache_path=os.path.abspath(args.cache) if args.cache else None,
+        corpus_path=os.path.abspath(args.corpus) if args.corpus else None,
+        result_channel=not args.legacy_stdout,
+        manifest_path=None if args.no_manifest else os.path.abspath(args.manifest),
+        force=args.force
     )
     
             
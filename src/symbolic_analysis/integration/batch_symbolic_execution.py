@@ -8,25 +8,215 @@
 2. 对每个目录中的二进制文件运行符号执行
 3. 记录详细的时间统计信息
 4. 生成综合分析报告
+
+--workers N 时使用常驻工作进程池：每个工作进程只导入一次 angr/符号执行模块，
+通过管道接收二进制任务并直接返回结构化结果，不再为每个二进制启动子进程。
+
+子进程模式下通过 --result-file (JSON-lines) 读取结构化结果，并以 --quiet 运行
+符号执行脚本；--legacy-stdout 可退回到解析标准输出（用于不支持该选项的旧脚本）。
+
+任务调度：根据历史耗时 (batch_symbolic_execution_history.json) 估计每个二进制的
+代价，工作进程池按最长优先分配任务以缩短总完成时间，并据此输出预计剩余时间。
 """
 
 import os
 import sys
 import glob
 import time
+import signal
 import datetime
 import subprocess
+import tempfile
+import traceback
+import importlib.util
+import multiprocessing
+from multiprocessing.connection import wait
 import json
+import re
 from pathlib import Path
 import argparse
 
+def read_result_record(result_file):
+    """读取结果文件中的最后一条 JSON-lines 记录，没有记录时返回 None"""
+    try:
+        with open(result_file, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+class JobCostModel:
+    """根据历史运行记录估计单个二进制的符号执行耗时"""
+    
+    DEFAULT_COST = 30.0
+    HISTORY_RUNS = 5
+    
+    def __init__(self, history_path, timeout):
+        self.history_path = history_path
+        self.timeout = timeout
+        self.history = {}
+        if history_path and os.path.exists(history_path):
+            try:
+                with open(history_path, 'r', encoding='utf-8') as f:
+                    self.history = json.load(f).get('binaries', {})
+            except (OSError, ValueError):
+                self.history = {}
+    
+    @staticmethod
+    def opt_level(binary_name):
+        match = re.search(r'_(O\w+)$', binary_name)
+        return match.group(1) if match else 'unknown'
+    
+    def rate_per_kb(self, opt_level=None):
+        """历史上每 KB 二进制的平均耗时（可按优化等级过滤）"""
+        times, sizes = 0.0, 0.0
+        for entry in self.history.values():
+            if opt_level and entry.get('opt_level') != opt_level:
+                continue
+            for run in entry.get('runs', []):
+                times += run['execution_time']
+                sizes += max(entry.get('binary_size', 0) / 1024, 1.0)
+        return times / sizes if sizes else None
+    
+    def estimate(self, binary_path):
+        """估计耗时: 同名二进制历史均值 > 同优化等级按大小缩放 > 全局按大小缩放 > 默认值"""
+        binary_name = os.path.basename(binary_path)
+        size_kb = max(os.path.getsize(binary_path) / 1024, 1.0) if os.path.exists(binary_path) else 1.0
+        limit = self.timeout + 30
+        
+        runs = self.history.get(binary_name, {}).get('runs', [])
+        if runs:
+            recent = runs[-self.HISTORY_RUNS:]
+            return min(sum(run['execution_time'] for run in recent) / len(recent), limit)
+        
+        rate = self.rate_per_kb(self.opt_level(binary_name)) or self.rate_per_kb()
+        if rate is not None:
+            return min(rate * size_kb, limit)
+        return min(self.DEFAULT_COST, limit)
+    
+    def record(self, result):
+        """记录一次运行结果（成功或超时都代表真实耗时）"""
+        binary_path = result['binary_path']
+        binary_name = result['binary_name']
+        entry = self.history.setdefault(binary_name, {'runs': []})
+        entry['opt_level'] = self.opt_level(binary_name)
+        if os.path.exists(binary_path):
+            entry['binary_size'] = os.path.getsize(binary_path)
+        entry['runs'].append({
+            'execution_time': result['execution_time'],
+            'exploration_time': result.get('exploration_time', 0),
+            'paths_found': result.get('paths_found', 0),
+            'success': result['success'],
+            'timestamp': result.get('timestamp')
+        })
+        entry['runs'] = entry['runs'][-self.HISTORY_RUNS:]
+    
+    def save(self):
+        if not self.history_path:
+            return
+        temp_path = f"{self.history_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'binaries': self.history}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.history_path)
+
+def estimate_makespan(costs, workers, busy=()):
+    """按给定顺序贪心分配到最早空闲的工作进程，返回预计完成时间"""
+    finish_times = sorted(list(busy) + [0.0] * max(workers - len(busy), 0))[:max(workers, 1)]
+    for cost in costs:
+        finish_times.sort()
+        finish_times[0] += cost
+    return max(finish_times) if finish_times else 0.0
+
+def format_eta(seconds):
+    finish = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
+    return f"{seconds:.0f} 秒 (预计 {finish.strftime('%H:%M:%S')} 完成)"
+
+class SymbolicExecutionTimeout(Exception):
+    """工作进程内单个任务超时"""
+
+def load_se_module(se_script):
+    """按文件路径导入符号执行脚本（angr 在此时导入一次）"""
+    spec = importlib.util.spec_from_file_location("batch_se_module", os.path.abspath(se_script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def raise_job_timeout(signum, frame):
+    raise SymbolicExecutionTimeout()
+
+def se_worker_main(se_script, connection):
+    """常驻工作进程：循环接收 (binary_path, timeout, 选项) 任务，返回结构化结果字典"""
+    sys.stdout = open(os.devnull, 'w')
+    signal.signal(signal.SIGALRM, raise_job_timeout)
+    
+    try:
+        module = load_se_module(se_script)
+        load_error = None if hasattr(module, 'run_job') else f"{se_script} 未提供 run_job(binary_path, timeout)"
+    except Exception as e:
+        module = None
+        load_error = f"导入 {se_script} 失败: {e}"
+    
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        binary_path, timeout, job_options = job
+        
+        start_time = time.time()
+        result = {
+            'binary_path': binary_path,
+            'binary_name': os.path.basename(binary_path),
+            'success': False,
+            'paths_found': 0,
+            'setup_time': 0.0,
+            'exploration_time': 0.0,
+            'analysis_time': 0.0,
+            'worker_pid': os.getpid()
+        }
+        
+        try:
+            if load_error:
+                raise RuntimeError(load_error)
+            # same grace as the subprocess.run timeout in subprocess mode
+            signal.alarm(timeout + 30)
+            try:
+                result.update(module.run_job(binary_path, timeout, **job_options))
+            finally:
+                signal.alarm(0)
+            result['success'] = True
+            result['return_code'] = 0
+        except SymbolicExecutionTimeout:
+            result['return_code'] = -1
+            result['error'] = 'timeout'
+        except Exception as e:
+            result['return_code'] = -2
+            result['error'] = str(e)
+            result['error_output'] = traceback.format_exc()[-500:]
+        
+        result['execution_time'] = time.time() - start_time
+        result['timestamp'] = datetime.datetime.now().isoformat()
+        connection.send(result)
+
 class BatchSymbolicExecutor:
     """批量符号执行管理器"""
     
-    def __init__(self, root_dir=".", timeout=60, se_script="se_script.py"):
+    def __init__(self, root_dir=".", timeout=60, se_script="se_script.py", workers=0, result_channel=True,
+                 memory_budget_mb=None, summarize_loops=False, merge_mode='none', entry_mode='entry',
+                 array_init='concrete', unicorn=False, dedup_paths=False):
         self.root_dir = root_dir
         self.timeout = timeout
         self.se_script = se_script
+        self.workers = workers
+        self.result_channel = result_channel
+        self.memory_budget_mb = memory_budget_mb
+        self.summarize_loops = summarize_loops
+        self.merge_mode = merge_mode
+        self.entry_mode = entry_mode
+        self.array_init = array_init
+        self.unicorn = unicorn
+        self.dedup_paths = dedup_paths
+        self.cost_model = JobCostModel(os.path.join(root_dir, "batch_symbolic_execution_history.json"), timeout)
+        self.remaining_cost = 0.0
         self.results = {}
         self.total_start_time = None
         self.total_end_time = None
@@ -83,6 +273,7 @@ class BatchSymbolicExecutor:
         print(f"  正在分析: {binary_name}")
         
         start_time = time.time()
+        result_file = None
         
         try:
                            
@@ -94,6 +285,22 @@ class BatchSymbolicExecutor:
                 "--binary", abs_binary_path,
                 "--timeout", str(self.timeout)
             ]
+            if self.memory_budget_mb:
+                cmd.extend(["--memory-budget", str(self.memory_budget_mb)])
+            if self.summarize_loops:
+                cmd.append("--summarize-loops")
+            if self.merge_mode != 'none':
+                cmd.extend(["--merge-mode", self.merge_mode])
+            if self.entry_mode != 'entry':
+                cmd.extend(["--entry-mode", self.entry_mode, "--array-init", self.array_init])
+            if self.unicorn:
+                cmd.append("--unicorn")
+            if self.dedup_paths:
+                cmd.append("--dedup-paths")
+            if self.result_channel:
+                fd, result_file = tempfile.mkstemp(prefix="se_result_", suffix=".jsonl")
+                os.close(fd)
+                cmd.extend(["--result-file", result_file, "--quiet"])
             
             print(f"    执行命令: {' '.join(cmd)}")
             
@@ -119,27 +326,34 @@ class BatchSymbolicExecutor:
             setup_time = 0
             analysis_time = 0
             
-            for line in stdout_lines:
-                if "分析完成！共发现" in line and "条路径" in line:
-                    try:
-                        paths_found = int(line.split("共发现")[1].split("条路径")[0].strip())
-                    except:
-                        pass
-                elif "路径探索:" in line and "秒" in line:
-                    try:
-                        exploration_time = float(line.split("路径探索:")[1].split("秒")[0].strip())
-                    except:
-                        pass
-                elif "项目设置:" in line and "秒" in line:
-                    try:
-                        setup_time = float(line.split("项目设置:")[1].split("秒")[0].strip())
-                    except:
-                        pass
-                elif "状态分析:" in line and "秒" in line:
-                    try:
-                        analysis_time = float(line.split("状态分析:")[1].split("秒")[0].strip())
-                    except:
-                        pass
+            record = read_result_record(result_file) if result_file else None
+            if record is not None:
+                paths_found = record['paths_found']
+                setup_time = record['setup_time']
+                exploration_time = record['exploration_time']
+                analysis_time = record['analysis_time']
+            else:
+                for line in stdout_lines:
+                    if "分析完成！共发现" in line and "条路径" in line:
+                        try:
+                            paths_found = int(line.split("共发现")[1].split("条路径")[0].strip())
+                        except:
+                            pass
+                    elif "路径探索:" in line and "秒" in line:
+                        try:
+                            exploration_time = float(line.split("路径探索:")[1].split("秒")[0].strip())
+                        except:
+                            pass
+                    elif "项目设置:" in line and "秒" in line:
+                        try:
+                            setup_time = float(line.split("项目设置:")[1].split("秒")[0].strip())
+                        except:
+                            pass
+                    elif "状态分析:" in line and "秒" in line:
+                        try:
+                            analysis_time = float(line.split("状态分析:")[1].split("秒")[0].strip())
+                        except:
+                            pass
             
             analysis_result = {
                 'binary_path': binary_path,
@@ -201,6 +415,10 @@ class BatchSymbolicExecutor:
             }
             self.failed_analyses.append(exception_result)
             return exception_result
+        
+        finally:
+            if result_file and os.path.exists(result_file):
+                os.remove(result_file)
     
     def analyze_benchmark(self, benchmark_dir):
         """分析单个 benchmark 目录"""
@@ -222,12 +440,143 @@ class BatchSymbolicExecutor:
                    
         benchmark_results = []
         for binary_path in binary_files:
+            estimate = self.cost_model.estimate(binary_path)
             result = self.run_symbolic_execution(binary_path)
+            self.cost_model.record(result)
             benchmark_results.append(result)
+            
+            self.remaining_cost = max(self.remaining_cost - estimate, 0.0)
+            print(f"    ⏳ 预计剩余: {format_eta(self.remaining_cost)}")
         
         self.results[benchmark_name] = benchmark_results
         return benchmark_results
     
+    def job_options(self):
+        """传给工作进程 run_job 的额外关键字参数（仅包含已设置的选项）"""
+        options = {}
+        if self.memory_budget_mb:
+            options['memory_budget_mb'] = self.memory_budget_mb
+        if self.summarize_loops:
+            options['summarize_loops'] = True
+        if self.merge_mode != 'none':
+            options['merge_mode'] = self.merge_mode
+        if self.entry_mode != 'entry':
+            options['entry_mode'] = self.entry_mode
+            options['array_init'] = self.array_init
+        if self.unicorn:
+            options['unicorn'] = True
+        if self.dedup_paths:
+            options['dedup_paths'] = True
+        return options
+    
+    def start_worker(self):
+        """启动一个常驻工作进程，返回 (进程, 父端连接)"""
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=se_worker_main, args=(self.se_script, child_conn), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+    
+    def run_pool_analysis(self, benchmark_dirs):
+        """使用常驻工作进程池分析所有 benchmark 的二进制文件"""
+        jobs = []
+        for benchmark_dir in benchmark_dirs:
+            benchmark_name = os.path.basename(benchmark_dir)
+            binary_files = self.find_binary_files(benchmark_dir)
+            if not binary_files:
+                print(f"  ⚠️  {benchmark_name}: 未找到二进制文件")
+            self.results[benchmark_name] = [None] * len(binary_files)
+            for position, binary_path in enumerate(binary_files):
+                jobs.append((benchmark_name, position, os.path.abspath(binary_path),
+                             self.cost_model.estimate(binary_path)))
+        
+        worker_count = min(self.workers, len(jobs))
+        print(f"\n⚙️  工作进程池: {worker_count} 个工作进程, {len(jobs)} 个任务")
+        if not jobs:
+            return
+        
+        pending = sorted(jobs, key=lambda job: job[3])
+        print(f"  调度顺序: 最长优先 (最长预估 {pending[-1][3]:.1f}s, 最短预估 {pending[0][3]:.1f}s)")
+        print(f"  ⏳ 预计总耗时: {format_eta(estimate_makespan([job[3] for job in reversed(pending)], worker_count))}")
+        
+        workers = [self.start_worker() for _ in range(worker_count)]
+        running = {}
+        completed = 0
+        
+        try:
+            while pending or running:
+                for slot, (process, conn) in enumerate(workers):
+                    if slot not in running and pending:
+                        job = pending.pop()
+                        conn.send((job[2], self.timeout, self.job_options()))
+                        running[slot] = (job, time.time())
+                
+                ready = wait([workers[slot][1] for slot in running], timeout=1.0)
+                now = time.time()
+                
+                for slot, (job, started) in list(running.items()):
+                    process, conn = workers[slot]
+                    if conn in ready:
+                        try:
+                            result = conn.recv()
+                        except EOFError:
+                            result = self.worker_failure_result(job[2], now - started, -2, 'worker_crashed')
+                            workers[slot] = self.start_worker()
+                    elif now - started > self.timeout + 40:
+                        # the worker's own alarm fires at timeout + 30; this only catches hung workers
+                        process.kill()
+                        process.join()
+                        result = self.worker_failure_result(job[2], now - started, -1, 'timeout')
+                        workers[slot] = self.start_worker()
+                    else:
+                        continue
+                    
+                    del running[slot]
+                    completed += 1
+                    self.cost_model.record(result)
+                    self.record_pool_result(job, result, completed, len(jobs))
+                    
+                    busy = [max(running_job[3] - (now - running_started), 0.0)
+                            for running_job, running_started in running.values()]
+                    remaining = estimate_makespan([job[3] for job in reversed(pending)], worker_count, busy)
+                    print(f"    ⏳ 预计剩余: {format_eta(remaining)}")
+        finally:
+            for process, conn in workers:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for process, conn in workers:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.kill()
+    
+    def worker_failure_result(self, binary_path, execution_time, return_code, error):
+        """工作进程被终止或崩溃时构造结果"""
+        return {
+            'binary_path': binary_path,
+            'binary_name': os.path.basename(binary_path),
+            'success': False,
+            'execution_time': execution_time,
+            'paths_found': 0,
+            'return_code': return_code,
+            'error': error,
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+    
+    def record_pool_result(self, job, result, completed, total):
+        """记录工作进程返回的结构化结果"""
+        benchmark_name, position = job[0], job[1]
+        self.results[benchmark_name][position] = result
+        
+        prefix = f"  [{completed}/{total}] {result['binary_name']}"
+        if result['success']:
+            print(f"{prefix} ✅ 发现 {result['paths_found']} 条路径 (耗时: {result['execution_time']:.1f}s)")
+            self.successful_analyses.append(result)
+        else:
+            print(f"{prefix} ❌ 失败: {result.get('error')} (耗时: {result['execution_time']:.1f}s)")
+            self.failed_analyses.append(result)
+    
     def preview_analysis(self):
         """预览要分析的文件，不实际执行"""
         print("🔍 预览模式 - 扫描要分析的文件")
@@ -244,6 +593,7 @@ class BatchSymbolicExecutor:
         
         total_files = 0
         total_estimated_time = 0
+        all_estimates = []
         
         for i, benchmark_dir in enumerate(benchmark_dirs, 1):
             benchmark_name = os.path.basename(benchmark_dir)
@@ -257,14 +607,16 @@ class BatchSymbolicExecutor:
                 continue
             
             print(f"    发现 {len(binary_files)} 个二进制文件:")
+            estimated_time = 0
             for binary in binary_files:
                 binary_name = os.path.basename(binary)
                 file_size = os.path.getsize(binary)
-                print(f"      - {binary_name} ({file_size/1024:.1f} KB)")
+                estimate = self.cost_model.estimate(binary)
+                estimated_time += estimate
+                all_estimates.append(estimate)
+                print(f"      - {binary_name} ({file_size/1024:.1f} KB, 预估 {estimate:.1f}s)")
             
             total_files += len(binary_files)
-                            
-            estimated_time = len(binary_files) * 30
             total_estimated_time += estimated_time
             print(f"    预估分析时间: {estimated_time/60:.1f} 分钟")
         
@@ -272,6 +624,10 @@ class BatchSymbolicExecutor:
         print(f"  总benchmark数: {len(benchmark_dirs)}")
         print(f"  总二进制文件数: {total_files}")
         print(f"  预估总时间: {total_estimated_time/60:.1f} 分钟 ({total_estimated_time/3600:.1f} 小时)")
+        if self.workers > 0:
+            makespan = estimate_makespan(sorted(all_estimates, reverse=True), self.workers)
+            print(f"  预估完成时间 ({self.workers} 个工作进程, 最长优先): {makespan/60:.1f} 分钟")
+        print(f"  历史记录: {len(self.cost_model.history)} 个二进制 ({self.cost_model.history_path})")
         print(f"  使用超时设置: {self.timeout} 秒/文件")
         print(f"  符号执行脚本: {self.se_script}")
         
@@ -302,15 +658,25 @@ class BatchSymbolicExecutor:
         for i, benchmark_dir in enumerate(benchmark_dirs, 1):
             print(f"  {i}. {os.path.basename(benchmark_dir)}")
         
-                        
-        for i, benchmark_dir in enumerate(benchmark_dirs, 1):
-            print(f"\n🔄 进度: {i}/{len(benchmark_dirs)}")
-            self.analyze_benchmark(benchmark_dir)
+        if self.workers > 0:
+            self.run_pool_analysis(benchmark_dirs)
+        else:
+            self.remaining_cost = sum(
+                self.cost_model.estimate(binary_path)
+                for benchmark_dir in benchmark_dirs
+                for binary_path in self.find_binary_files(benchmark_dir)
+            )
+            print(f"⏳ 预计总耗时: {format_eta(self.remaining_cost)}")
+            for i, benchmark_dir in enumerate(benchmark_dirs, 1):
+                print(f"\n🔄 进度: {i}/{len(benchmark_dirs)}")
+                self.analyze_benchmark(benchmark_dir)
         
         self.total_end_time = time.time()
         total_time = self.total_end_time - self.total_start_time
         end_datetime = datetime.datetime.now()
         
+        self.cost_model.save()
+        
         print(f"\n🎉 批量分析完成!")
         print(f"总耗时: {total_time:.1f} 秒 ({total_time/60:.1f} 分钟)")
         print(f"结束时间: {end_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -462,6 +828,24 @@ def main():
     parser.add_argument('--se-script', default='se_script.py', help='符号执行脚本路径')
     parser.add_argument('--benchmarks', nargs='*', help='指定要分析的benchmark（如不指定则分析全部）')
     parser.add_argument('--dry-run', action='store_true', help='预览模式，只显示要分析的文件，不实际执行')
+    parser.add_argument('--workers', type=int, nargs='?', const=os.cpu_count(), default=0,
+                        help='使用常驻工作进程池（默认进程数为CPU核数，0 表示每个二进制启动一个子进程）')
+    parser.add_argument('--legacy-stdout', action='store_true',
+                        help='不传递 --result-file/--quiet，改为解析符号执行脚本的标准输出')
+    parser.add_argument('--memory-budget', type=int,
+                        help='每个符号执行进程的内存预算(MB)，便于在同一主机上并行运行多个探索')
+    parser.add_argument('--summarize-loops', action='store_true',
+                        help='启用计数循环摘要，每种循环形状只生成一条路径')
+    parser.add_argument('--merge-mode', choices=['none', 'veritesting', 'postdom'], default='none',
+                        help='符号执行的状态合并模式')
+    parser.add_argument('--entry-mode', choices=['entry', 'function'], default='entry',
+                        help='符号执行入口: entry（程序入口）/ function（直接从 s000 等内核函数入口开始）')
+    parser.add_argument('--array-init', choices=['concrete', 'symbolic'], default='concrete',
+                        help='function 入口模式下全局数组的预填充方式')
+    parser.add_argument('--unicorn', action='store_true',
+                        help='用 unicorn 具体执行不涉及符号数据的代码，缩短大数组初始化的探索时间')
+    parser.add_argument('--dedup-paths', action='store_true',
+                        help='按指纹归并重复路径，每组只写出一个规范路径文件并记录重复数')
     
     args = parser.parse_args()
     
@@ -474,7 +858,16 @@ def main():
     executor = BatchSymbolicExecutor(
         root_dir=args.root_dir,
         timeout=args.timeout,
-        se_script=args.se_script
+        se_script=args.se_script,
+        workers=args.workers,
+        result_channel=not args.legacy_stdout,
+        memory_budget_mb=args.memory_budget,
+        summarize_loops=args.summarize_loops,
+        merge_mode=args.merge_mode,
+        entry_mode=args.entry_mode,
+        array_init=args.array_init,
+        unicorn=args.unicorn,
+        dedup_paths=args.dedup_paths
     )
     
                              
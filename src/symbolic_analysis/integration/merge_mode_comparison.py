@@ -0,0 +1,227 @@
+"""
+状态合并模式对比脚本
+
+对 ARDiff 基准（每个用例目录含 symbolic_oldV / symbolic_newV）分别以不同的
+--merge-mode 运行符号执行，再用 semantic_equivalence_analyzer.py 比较两个版本，
+生成对比报告：路径数、探索时间、等价性结论（以及与目录名 Eq/NEq 的期望是否一致）。
+
+两个脚本都以 --result-file/--quiet 运行，结果通过 JSON-lines 结构化返回。
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+import argparse
+import tempfile
+import subprocess
+from batch_equivalence_analyzer import read_result_record
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SYMBOLIC_EXECUTION_DIR = os.path.join(SCRIPT_DIR, '..', 'symbolic_execution')
+
+def find_cases(benchmarks_dir, benchmarks=None):
+    """查找同时包含 symbolic_oldV 和 symbolic_newV 的用例目录"""
+    cases = []
+    for root, dirs, files in os.walk(benchmarks_dir):
+        dirs[:] = sorted(d for d in dirs if d != 'instrumented')
+        if 'symbolic_oldV' not in files or 'symbolic_newV' not in files:
+            continue
+        case = os.path.relpath(root, benchmarks_dir)
+        if benchmarks and case.split(os.sep)[0] not in benchmarks:
+            continue
+        parts = case.split(os.sep)
+        expected = True if 'Eq' in parts else False if 'NEq' in parts else None
+        cases.append((case, root, expected))
+    return cases
+
+class MergeModeComparison:
+    """按合并模式运行符号执行和等价性分析并汇总对比"""
+
+    def __init__(self, se_script, equivalence_script, work_dir, modes, timeout=120):
+        self.se_script = os.path.abspath(se_script)
+        self.equivalence_script = os.path.abspath(equivalence_script)
+        self.work_dir = os.path.abspath(work_dir)
+        self.modes = modes
+        self.timeout = timeout
+        self.results = []
+
+        self.env = os.environ.copy()
+        self.env['PYTHONPATH'] = os.pathsep.join(
+            p for p in (os.path.abspath(SYMBOLIC_EXECUTION_DIR), self.env.get('PYTHONPATH')) if p
+        )
+
+    def run_script(self, cmd, timeout):
+        """以 --result-file/--quiet 运行脚本，返回 (结果记录, 错误信息)"""
+        fd, result_file = tempfile.mkstemp(prefix="merge_cmp_", suffix=".jsonl")
+        os.close(fd)
+        try:
+            completed = subprocess.run(cmd + ["--result-file", result_file, "--quiet"],
+                                       capture_output=True, text=True, timeout=timeout, env=self.env)
+            record = read_result_record(result_file)
+            if record is None:
+                return None, completed.stderr.strip().splitlines()[-1:] or [f"返回码 {completed.returncode}"]
+            return record, None
+        except subprocess.TimeoutExpired:
+            return None, ["超时"]
+        finally:
+            os.remove(result_file)
+
+    def run_symbolic_execution(self, binary_path, output_prefix, mode):
+        cmd = [sys.executable, self.se_script, "--binary", binary_path, "--timeout", str(self.timeout),
+               "--output-prefix", output_prefix, "--merge-mode", mode]
+        return self.run_script(cmd, self.timeout + 120)
+
+    def run_equivalence(self, prefix1, prefix2, report_file):
+        cmd = [sys.executable, self.equivalence_script, prefix1 + "_path_", prefix2 + "_path_",
+               "--output", report_file]
+        return self.run_script(cmd, self.timeout * 10)
+
+    def compare_case(self, case, case_dir, expected):
+        """对一个用例按每种合并模式跑一遍完整流程"""
+        case_result = {'case': case, 'expected_equivalent': expected, 'modes': {}}
+        for mode in self.modes:
+            output_dir = os.path.join(self.work_dir, mode, case)
+            os.makedirs(output_dir, exist_ok=True)
+            mode_result = {'error': None}
+
+            for version in ('oldV', 'newV'):
+                record, error = self.run_symbolic_execution(
+                    os.path.join(case_dir, f"symbolic_{version}"), os.path.join(output_dir, version), mode)
+                if record is None:
+                    mode_result['error'] = f"{version} 符号执行失败: {' '.join(error)}"
+                    break
+                mode_result[f'{version}_paths'] = record['paths_found']
+                mode_result[f'{version}_exploration_time'] = record['exploration_time']
+
+            if mode_result['error'] is None:
+                record, error = self.run_equivalence(os.path.join(output_dir, 'oldV'), os.path.join(output_dir, 'newV'),
+                                                     os.path.join(output_dir, 'equivalence_report.txt'))
+                if record is None:
+                    mode_result['error'] = f"等价性分析失败: {' '.join(error)}"
+                else:
+                    mode_result['program_equivalent'] = record['program_equivalent']
+                    mode_result['solver_calls'] = record.get('solver_calls', 0)
+                    mode_result['equivalence_time'] = record['total_time']
+
+            case_result['modes'][mode] = mode_result
+            status = mode_result['error'] or (
+                f"路径 {mode_result['oldV_paths']}/{mode_result['newV_paths']}, "
+                f"探索 {mode_result['oldV_exploration_time'] + mode_result['newV_exploration_time']:.2f} 秒, "
+                f"{'等价' if mode_result['program_equivalent'] else '不等价'}")
+            print(f"  [{mode}] {status}")
+
+        self.results.append(case_result)
+        return case_result
+
+    def mode_totals(self, mode):
+        """某一合并模式在全部用例上的汇总"""
+        totals = {'cases': 0, 'errors': 0, 'paths': 0, 'exploration_time': 0.0, 'equivalence_time': 0.0,
+                  'solver_calls': 0, 'correct': 0, 'agree_with_baseline': 0}
+        baseline = self.modes[0]
+        for case_result in self.results:
+            mode_result = case_result['modes'][mode]
+            totals['cases'] += 1
+            if mode_result['error']:
+                totals['errors'] += 1
+                continue
+            totals['paths'] += mode_result['oldV_paths'] + mode_result['newV_paths']
+            totals['exploration_time'] += mode_result['oldV_exploration_time'] + mode_result['newV_exploration_time']
+            totals['equivalence_time'] += mode_result['equivalence_time']
+            totals['solver_calls'] += mode_result['solver_calls']
+            if mode_result['program_equivalent'] == case_result['expected_equivalent']:
+                totals['correct'] += 1
+            baseline_result = case_result['modes'][baseline]
+            if not baseline_result['error'] and baseline_result['program_equivalent'] == mode_result['program_equivalent']:
+                totals['agree_with_baseline'] += 1
+        return totals
+
+    def generate_report(self, report_file):
+        """生成文本对比报告和同名 JSON 数据文件"""
+        def verdict(mode_result):
+            if mode_result['error']:
+                return "错误"
+            return "等价" if mode_result['program_equivalent'] else "不等价"
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write("状态合并模式对比报告\n")
+            f.write("=" * 80 + "\n\n")
+            f.write(f"生成时间: {datetime.datetime.now().isoformat()}\n")
+            f.write(f"合并模式: {', '.join(self.modes)} (基线: {self.modes[0]})\n")
+            f.write(f"符号执行超时: {self.timeout} 秒\n\n")
+
+            f.write("汇总\n")
+            f.write("-" * 80 + "\n")
+            f.write(f"{'模式':<12} {'路径数':>8} {'探索时间(秒)':>14} {'等价分析(秒)':>14} {'求解次数':>10} "
+                    f"{'结论正确':>10} {'与基线一致':>10} {'错误':>6}\n")
+            for mode in self.modes:
+                totals = self.mode_totals(mode)
+                f.write(f"{mode:<12} {totals['paths']:>8} {totals['exploration_time']:>14.2f} "
+                        f"{totals['equivalence_time']:>14.2f} {totals['solver_calls']:>10} "
+                        f"{totals['correct']:>6}/{totals['cases'] - totals['errors']:<3} "
+                        f"{totals['agree_with_baseline']:>10} {totals['errors']:>6}\n")
+
+            f.write("\n各用例\n")
+            f.write("-" * 80 + "\n")
+            for case_result in self.results:
+                expected = case_result['expected_equivalent']
+                f.write(f"{case_result['case']} (期望: {'等价' if expected else '不等价' if expected is False else '未知'})\n")
+                for mode, mode_result in case_result['modes'].items():
+                    if mode_result['error']:
+                        f.write(f"  {mode:<12} {mode_result['error']}\n")
+                        continue
+                    f.write(f"  {mode:<12} 路径 {mode_result['oldV_paths']:>3}/{mode_result['newV_paths']:<3} "
+                            f"探索 {mode_result['oldV_exploration_time'] + mode_result['newV_exploration_time']:>8.2f} 秒  "
+                            f"等价分析 {mode_result['equivalence_time']:>7.2f} 秒  结论 {verdict(mode_result)}\n")
+
+        json_file = os.path.splitext(report_file)[0] + ".json"
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'modes': self.modes,
+                'timeout': self.timeout,
+                'totals': {mode: self.mode_totals(mode) for mode in self.modes},
+                'results': self.results
+            }, f, indent=2, ensure_ascii=False)
+
+        print(f"📄 对比报告已保存到: {report_file}")
+        print(f"📊 详细数据已保存到: {json_file}")
+
+def main():
+    """主函数"""
+    repo_root = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
+
+    parser = argparse.ArgumentParser(description='对比不同状态合并模式下的路径数、探索时间和等价性结论')
+    parser.add_argument('--benchmarks-dir', default=os.path.join(repo_root, 'experiments', 'ardiff_comparison', 'benchmarks'),
+                        help='ARDiff 基准目录')
+    parser.add_argument('--benchmarks', nargs='*', help='只对比指定的基准（如 Airy Bess gam）')
+    parser.add_argument('--modes', nargs='+', default=['none', 'postdom'],
+                        choices=['none', 'veritesting', 'postdom'], help='要对比的合并模式，第一个作为基线')
+    parser.add_argument('--timeout', type=int, default=120, help='单个符号执行的超时时间(秒)')
+    parser.add_argument('--se-script', default=os.path.join(repo_root, 'scripts', 'se_script_improved.py'),
+                        help='符号执行脚本路径')
+    parser.add_argument('--equivalence-script',
+                        default=os.path.join(SCRIPT_DIR, '..', 'equivalence', 'semantic_equivalence_analyzer.py'),
+                        help='等价性分析脚本路径')
+    parser.add_argument('--work-dir', default='merge_mode_comparison', help='路径文件和分项报告的输出目录')
+    parser.add_argument('--output', default='merge_mode_comparison_report.txt', help='对比报告文件')
+    args = parser.parse_args()
+
+    cases = find_cases(args.benchmarks_dir, args.benchmarks)
+    if not cases:
+        print(f"❌ 在 {args.benchmarks_dir} 中未找到 symbolic_oldV/symbolic_newV 用例")
+        sys.exit(1)
+
+    print(f"🔍 发现 {len(cases)} 个用例，对比模式: {', '.join(args.modes)}")
+    comparison = MergeModeComparison(args.se_script, args.equivalence_script, args.work_dir, args.modes, args.timeout)
+
+    start_time = time.time()
+    for i, (case, case_dir, expected) in enumerate(cases, 1):
+        print(f"\n[{i}/{len(cases)}] {case}")
+        comparison.compare_case(case, case_dir, expected)
+
+    print(f"\n⏱️  总耗时: {time.time() - start_time:.2f} 秒")
+    comparison.generate_report(args.output)
+
+if __name__ == "__main__":
+    main()
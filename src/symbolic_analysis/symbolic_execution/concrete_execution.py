@@ -0,0 +1,88 @@
+"""
+unicorn 具体执行加速
+
+TSVC 驱动里的 ``init_data()`` 要对 128 元素数组和 16x16 的 ``aa`` 逐个赋值，
+这些代码不涉及任何符号数据，angr 却按 VEX 逐块解释执行。
+
+enable_unicorn 给初始状态打开 unicorn 引擎：只要一段代码读写的都是具体值，
+angr 就把它交给 unicorn 原生执行，遇到符号数据再切回 VEX。这里只启用 unicorn
+本身及符号寄存器跟踪，不启用 ``INITIALIZE_ZERO_REGISTERS`` 这类会改变初始状态
+的选项，因此生成的约束与纯符号执行一致。
+
+ConcreteExecutionStats 探索技术按步统计 unicorn 与 VEX 各自执行的基本块和指令数。
+unicorn 步不更新 ``history.recent_instruction_count``，其基本块取自
+``UNICORN_TRACK_BBL_ADDRS`` 记录的 ``history.recent_bbl_addrs``，指令数按这些
+基本块各自的指令数累加（同一地址只提升一次）。
+"""
+
+import angr
+
+UNICORN_OPTIONS = {
+    angr.options.UNICORN,
+    angr.options.UNICORN_SYM_REGS_SUPPORT,
+    angr.options.UNICORN_TRACK_BBL_ADDRS,
+    angr.options.UNICORN_TRACK_STACK_POINTERS,
+}
+
+def enable_unicorn(state):
+    """在状态上启用 unicorn 具体执行（就地修改并返回该状态）"""
+    state.options.update(UNICORN_OPTIONS)
+    return state
+
+def executed_by_unicorn(history):
+    """状态历史的最近一步是否由 unicorn 执行（描述形如 ``Unicorn (<停止原因> after N steps)``）"""
+    return (history.recent_description or '').startswith('Unicorn (')
+
+class ConcreteExecutionStats(angr.exploration_techniques.ExplorationTechnique):
+    """统计 unicorn 具体执行与 VEX 符号执行工作量的探索技术"""
+
+    def __init__(self):
+        super().__init__()
+        self.concrete_steps = 0
+        self.concrete_blocks = 0
+        self.concrete_instructions = 0
+        self.symbolic_steps = 0
+        self.symbolic_blocks = 0
+        self.symbolic_instructions = 0
+        self.block_sizes = {}
+
+    def step_state(self, simgr, state, **kwargs):
+        stashes = simgr.step_state(state, **kwargs)
+        # 一步分叉出的后继共享同一段执行历史，只看其中一个，避免重复计数
+        successor = next((s for states in stashes.values() for s in states), None)
+        if successor is not None:
+            self.record(successor.history)
+        return stashes
+
+    def block_size(self, addr):
+        """addr 处基本块的指令数"""
+        if addr not in self.block_sizes:
+            self.block_sizes[addr] = self.project.factory.block(addr).instructions
+        return self.block_sizes[addr]
+
+    def record(self, history):
+        if executed_by_unicorn(history):
+            addrs = history.recent_bbl_addrs
+            self.concrete_steps += 1
+            self.concrete_blocks += len(addrs)
+            self.concrete_instructions += sum(self.block_size(addr) for addr in addrs)
+        else:
+            self.symbolic_steps += 1
+            self.symbolic_blocks += max(history.recent_block_count, 1)
+            self.symbolic_instructions += max(history.recent_instruction_count, 0)
+
+    def concrete_ratio(self):
+        total = self.concrete_blocks + self.symbolic_blocks
+        return self.concrete_blocks / total if total else 0.0
+
+    def summary(self):
+        """写入路径元数据的具体/符号执行统计"""
+        return {
+            'concrete_steps': self.concrete_steps,
+            'concrete_blocks': self.concrete_blocks,
+            'concrete_instructions': self.concrete_instructions,
+            'symbolic_steps': self.symbolic_steps,
+            'symbolic_blocks': self.symbolic_blocks,
+            'symbolic_instructions': self.symbolic_instructions,
+            'concrete_block_ratio': round(self.concrete_ratio(), 3)
+        }
@@ -0,0 +1,114 @@
+"""
+函数级入口状态
+
+从 ``entry_state()`` 出发时，angr 要先符号执行 ``_start``、libc 初始化桩和
+``init_data`` 里对每个数组逐元素赋值的循环，才能到达真正的 benchmark 内核。
+
+build_function_entry_state 直接在内核函数入口构造 ``call_state``。全局数组
+a..e 和 aa 都在 .bss 中，内容由 ``init_data()`` 在运行时写入（``a[i] = i % 100``
+等），因此先从 ``init_data`` 入口具体执行到返回，再以得到的状态为基础进入内核；
+二进制中没有 ``init_data`` 时保留镜像中的内容。之后按配置处理数组：concrete
+直接使用 init_data 写入的值，symbolic 为每个数组前 max_symbolic_elements 个元素
+创建带范围约束的符号变量。返回地址指向 ``return_deadend``，内核返回后状态即
+进入 deadended，探索只覆盖内核本身。
+"""
+
+import angr
+import claripy
+
+TSVC_ARRAY_SYMBOLS = ('a', 'b', 'c', 'd', 'e', 'aa')
+TSVC_INIT_FUNCTION = 'init_data'
+ARRAY_INIT_MODES = ('concrete', 'symbolic')
+
+class FunctionEntry:
+    """一次函数级入口构造的结果：入口状态及其创建的符号变量"""
+
+    def __init__(self, function_name, function_addr, state, variables, arrays, initialized_by=None):
+        self.function_name = function_name
+        self.function_addr = function_addr
+        self.state = state
+        self.variables = variables
+        self.arrays = arrays
+        self.initialized_by = initialized_by
+
+    def summary(self):
+        return {
+            'function': self.function_name,
+            'addr': hex(self.function_addr),
+            'arrays': dict(self.arrays),
+            'initialized_by': self.initialized_by,
+            'symbolic_variables': len(self.variables)
+        }
+
+def resolve_function(project, function_name):
+    """返回函数的重定位地址，找不到时返回 None"""
+    symbol = project.loader.find_symbol(function_name)
+    if symbol is None:
+        return None
+    return symbol.rebased_addr
+
+def entry_options(state):
+    state.options.add(angr.options.ZERO_FILL_UNCONSTRAINED_MEMORY)
+    state.options.add(angr.options.ZERO_FILL_UNCONSTRAINED_REGISTERS)
+    return state
+
+def run_initializer(project, function_name):
+    """从 function_name 入口具体执行到返回，返回执行后的状态；函数不存在时返回 None
+
+    初始化函数不读取任何符号数据，只会得到一条路径。
+    """
+    function_addr = resolve_function(project, function_name)
+    if function_addr is None:
+        return None
+
+    state = entry_options(project.factory.call_state(function_addr, ret_addr=project.simos.return_deadend))
+    simgr = project.factory.simulation_manager(state)
+    simgr.run()
+    if len(simgr.deadended) != 1:
+        raise RuntimeError(f"{function_name} 应当只有一条执行路径，实际得到 {len(simgr.deadended)} 条")
+    return simgr.deadended[0]
+
+def build_function_entry_state(project, function_name, args=(), array_init='concrete',
+                               array_symbols=TSVC_ARRAY_SYMBOLS, element_size=4,
+                               max_symbolic_elements=16, value_range=(0, 200),
+                               init_function=TSVC_INIT_FUNCTION):
+    """在 function_name 入口构造 call_state，并按 array_init 预填充全局数组
+
+    args 为按调用约定传入的参数（可以是符号变量）。init_function 先被具体执行，
+    其写入的数组内容是 concrete 模式的初始值；传 None 则跳过。symbolic 模式下每个
+    数组只有前 max_symbolic_elements 个元素被符号化，其余元素保留 init_function
+    写入的具体值，避免上百个符号变量拖慢求解。
+    """
+    if array_init not in ARRAY_INIT_MODES:
+        raise ValueError(f"未知的数组初始化模式: {array_init}")
+
+    function_addr = resolve_function(project, function_name)
+    if function_addr is None:
+        raise ValueError(f"二进制中未找到函数: {function_name}")
+
+    base_state = run_initializer(project, init_function) if init_function else None
+    state = entry_options(project.factory.call_state(function_addr, *args, base_state=base_state,
+                                                     ret_addr=project.simos.return_deadend))
+
+    variables = {}
+    arrays = {}
+    low, high = value_range
+    for name in array_symbols:
+        symbol = project.loader.find_symbol(name)
+        if symbol is None or not symbol.size:
+            continue
+        length = symbol.size // element_size
+        arrays[name] = length
+        if array_init != 'symbolic':
+            continue
+
+        for i in range(min(length, max_symbolic_elements)):
+            var_name = f'array_{name}_{i}'
+            var = claripy.BVS(var_name, element_size * 8)
+            state.solver.add(var >= low)
+            state.solver.add(var <= high)
+            state.memory.store(symbol.rebased_addr + i * element_size, var, endness=project.arch.memory_endness)
+            variables[var_name] = var
+
+    return FunctionEntry(function_name, function_addr, state, variables, arrays,
+                         init_function if base_state is not None else None)
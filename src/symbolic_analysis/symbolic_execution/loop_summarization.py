@@ -0,0 +1,198 @@
+"""
+TSVC计数循环摘要
+
+TSVC 内核形如 ``for (i = 0; i < count; i++) a[i] = b[i] + ...``，angr 在循环条件处
+按每个可能的迭代次数分叉，一个程序因此产生十几条只差迭代次数的路径。
+
+LoopSummarizer 探索技术识别访问 a..e 数组的计数循环区域，把从同一区域、同一出口
+离开的状态先收集起来，等区域内不再有活跃状态时合并成一个状态：路径条件是各迭代
+次数条件的析取（迭代次数保持符号化），数组内容按条件合并为 ITE。
+
+区域优先取整个内核函数（无函数调用、访问 a..e 数组），在返回点合并；其余函数
+（如内联了内核的 main）中的计数循环在循环出口处合并。循环旋转、首轮剥离和完全
+展开会让这些结构性合并点随优化等级变化，因此探索结束时再把所有执行过数组访问
+（即至少迭代一次）的终止状态按终止地址合并一次，使 O0..O3 得到相同的路径划分：
+零次迭代一条路径，其余迭代次数一条摘要路径。
+"""
+
+import angr
+from state_merging import merge_states
+from project_cache import recover_cfg
+
+TSVC_ARRAY_SYMBOLS = ('a', 'b', 'c', 'd', 'e')
+
+class SummaryRegion:
+    """一个可摘要的区域（内核函数或计数循环）"""
+
+    def __init__(self, kind, function_name, entry, block_addrs):
+        self.kind = kind
+        self.function_name = function_name
+        self.entry = entry
+        self.block_addrs = block_addrs
+
+    def contains(self, addr):
+        return addr in self.block_addrs
+
+    def left_by(self, state):
+        """状态是否刚离开本区域（上一个基本块在区域内，当前地址在区域外）"""
+        return self.contains(state.history.addr) and not self.contains(state.addr)
+
+class LoopSummarizer(angr.exploration_techniques.ExplorationTechnique):
+    """合并计数循环各迭代次数出口状态的探索技术"""
+
+    def __init__(self, functions=None, array_symbols=TSVC_ARRAY_SYMBOLS, max_break_edges=2):
+        super().__init__()
+        self.function_names = functions
+        self.array_symbols = array_symbols
+        self.max_break_edges = max_break_edges
+
+        self.regions = []
+        self.array_ranges = []
+        self.array_blocks = {}
+        self.pending = {}
+        self.finalized = False
+
+        self.summarized_paths = 0
+        self.merged_states = 0
+        self.merge_failures = 0
+        self.records = []
+
+    def setup(self, simgr):
+        project = simgr._project
+        self.array_ranges = []
+        for name in self.array_symbols:
+            symbol = project.loader.find_symbol(name)
+            if symbol is not None and symbol.size:
+                self.array_ranges.append((symbol.rebased_addr, symbol.rebased_addr + symbol.size))
+        if not self.array_ranges:
+            return
+
+        cfg = recover_cfg(project)
+        loop_functions = []
+        for function in cfg.kb.functions.values():
+            if function.is_plt or function.is_simprocedure or function.name == '_start':
+                continue
+            if self.function_names is not None and function.name not in self.function_names:
+                continue
+
+            block_addrs = set(function.block_addrs)
+            if not self.touches_arrays(project, block_addrs):
+                continue
+            if not list(function.get_call_sites()):
+                self.regions.append(SummaryRegion('function', function.name, function.addr, block_addrs))
+            else:
+                loop_functions.append(function)
+
+        if not loop_functions:
+            return
+        loop_finder = project.analyses.LoopFinder(functions=loop_functions)
+        for function_addr, loops in loop_finder.loops_hierarchy.items():
+            function_name = cfg.kb.functions[function_addr].name
+            pending_loops = list(loops)
+            while pending_loops:
+                loop = pending_loops.pop()
+                if loop.subloops:
+                    pending_loops.extend(loop.subloops)
+                    continue
+                if loop.has_calls or len(loop.break_edges) > self.max_break_edges:
+                    continue
+                block_addrs = {node.addr for node in loop.body_nodes}
+                if self.touches_arrays(project, block_addrs):
+                    self.regions.append(SummaryRegion('loop', function_name, loop.entry.addr, block_addrs))
+
+    def touches_arrays(self, project, block_addrs):
+        """基本块中是否出现指向 a..e 数组的常量地址"""
+        return any(self.block_touches_arrays(project, addr) for addr in block_addrs)
+
+    def block_touches_arrays(self, project, addr):
+        if addr not in self.array_blocks:
+            touches = False
+            if not project.is_hooked(addr):
+                try:
+                    constants = project.factory.block(addr).vex.all_constants
+                    touches = any(start <= const.value < end
+                                  for const in constants for start, end in self.array_ranges)
+                except Exception:
+                    pass
+            self.array_blocks[addr] = touches
+        return self.array_blocks[addr]
+
+    def in_kernel(self, state):
+        """状态是否执行过访问 a..e 数组的基本块（即计数循环至少迭代了一次）"""
+        return state.globals.get('loop_summary_kernel', False)
+
+    def step(self, simgr, stash='active', **kwargs):
+        simgr = simgr.step(stash=stash, **kwargs)
+        if not self.regions:
+            return simgr
+
+        project = simgr._project
+        remaining = []
+        for state in simgr.stashes[stash]:
+            if not self.in_kernel(state) and self.block_touches_arrays(project, state.history.addr):
+                state.globals['loop_summary_kernel'] = True
+
+            region = next((region for region in self.regions if region.left_by(state)), None)
+            if region is None:
+                remaining.append(state)
+            else:
+                self.pending.setdefault((region, state.addr, self.in_kernel(state)), []).append(state)
+        simgr.stashes[stash] = remaining
+
+        for key in list(self.pending):
+            region, exit_addr, _ = key
+            if any(region.contains(state.addr) for state in simgr.stashes[stash]):
+                continue
+            simgr.stashes[stash].extend(self.summarize(region, exit_addr, self.pending.pop(key)))
+
+        if not simgr.stashes[stash] and not self.pending and not self.finalized:
+            self.finalized = True
+            self.summarize_deadended(simgr)
+
+        return simgr
+
+    def summarize_deadended(self, simgr):
+        """把执行过计数循环、终止于同一地址的状态合并为一条摘要路径"""
+        groups = {}
+        others = []
+        for state in simgr.deadended:
+            if self.in_kernel(state):
+                groups.setdefault(state.addr, []).append(state)
+            else:
+                others.append(state)
+
+        for exit_addr, states in groups.items():
+            others.extend(self.summarize(None, exit_addr, states))
+        simgr.stashes['deadended'] = others
+
+    def summarize(self, region, exit_addr, states):
+        """把同一出口的状态合并为一个以迭代次数析取为路径条件的状态"""
+        if len(states) == 1:
+            return states
+
+        try:
+            merged = merge_states(states)
+        except Exception:
+            self.merge_failures += 1
+            return states
+
+        self.summarized_paths += 1
+        self.merged_states += len(states)
+        self.records.append({
+            'kind': region.kind if region else 'exit',
+            'function': region.function_name if region else None,
+            'entry': hex(region.entry) if region else None,
+            'exit': hex(exit_addr),
+            'merged_states': len(states)
+        })
+        return [merged]
+
+    def summary(self):
+        """写入路径元数据的循环摘要信息"""
+        return {
+            'regions': len(self.regions),
+            'summarized_paths': self.summarized_paths,
+            'merged_states': self.merged_states,
+            'merge_failures': self.merge_failures,
+            'merged': self.records
+        }
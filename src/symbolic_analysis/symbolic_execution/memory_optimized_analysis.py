@@ -1,24 +1,138 @@
                       
 """
 内存优化的TSVC符号执行脚本
+
+MemoryBudget 探索技术按当前进程的 RSS（而不是整机内存）控制 angr 探索：
+接近预算时先 gc，仍超出则按优先级丢弃（或溢出到磁盘）低优先级的活跃状态，
+并记录被丢弃的状态，供路径文件元数据使用。
 """
 
 import angr
 import os
 import gc
-import psutil
+import tempfile
+from project_cache import load_project
 
-def memory_aware_analysis(binary_path, max_memory_gb=4):
-    """内存感知的符号执行"""
-    
-    def check_memory():
-        """检查内存使用"""
-        memory = psutil.virtual_memory()
-        used_gb = memory.used / (1024**3)
-        return used_gb < max_memory_gb
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+def current_rss_mb():
+    """当前进程常驻内存 (MB)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 ** 2)
+    with open('/proc/self/statm') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 ** 2)
+
+def default_state_priority(state):
+    """默认优先级：约束越多、路径越深的状态优先级越低（先被丢弃）"""
+    return -(len(state.solver.constraints) * 1000 + state.history.depth)
+
+class MemoryBudget(angr.exploration_techniques.ExplorationTechnique):
+    """按进程 RSS 预算裁剪或溢出活跃状态的探索技术"""
+
+    def __init__(self, budget_mb, high_watermark=0.9, low_watermark=0.7, shed_fraction=0.5,
+                 spill=False, spill_dir=None, priority_key=None, check_every=1, max_records=50):
+        super().__init__()
+        self.budget_mb = budget_mb
+        self.high_mb = budget_mb * high_watermark
+        self.low_mb = budget_mb * low_watermark
+        self.shed_fraction = shed_fraction
+        self.priority_key = priority_key or default_state_priority
+        self.check_every = check_every
+        self.max_records = max_records
+
+        self.vault = None
+        if spill:
+            self.vault = angr.vaults.VaultDir(d=spill_dir or tempfile.mkdtemp(prefix="angr_spill_"))
+        self.spilled = []
+
+        self.step_count = 0
+        self.peak_rss_mb = 0.0
+        self.pruned_count = 0
+        self.spilled_count = 0
+        self.restored_count = 0
+        self.dropped = []
+
+    def step(self, simgr, stash='active', **kwargs):
+        simgr = simgr.step(stash=stash, **kwargs)
+        self.step_count += 1
+        if self.step_count % self.check_every:
+            return simgr
+
+        rss = current_rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+        if rss >= self.high_mb and simgr.stashes[stash]:
+            gc.collect()
+            rss = current_rss_mb()
+            if rss >= self.high_mb:
+                self.shed_states(simgr, stash, rss)
+        elif self.spilled and (rss < self.low_mb or not simgr.stashes[stash]):
+            self.restore_states(simgr, stash)
+
+        return simgr
+
+    def shed_states(self, simgr, stash, rss):
+        """丢弃（或溢出）一部分最低优先级的活跃状态，至少保留一个"""
+        states = sorted(simgr.stashes[stash], key=self.priority_key)
+        shed_count = min(max(1, int(len(states) * self.shed_fraction)), len(states) - 1)
+        if shed_count <= 0:
+            return
+
+        victims, simgr.stashes[stash] = states[:shed_count], states[shed_count:]
+        for state in victims:
+            action = 'pruned'
+            if self.vault is not None:
+                try:
+                    self.spilled.append((self.priority_key(state), self.vault.store(state)))
+                    action = 'spilled'
+                    self.spilled_count += 1
+                except Exception:
+                    pass
+            if action == 'pruned':
+                self.pruned_count += 1
+
+            if len(self.dropped) < self.max_records:
+                self.dropped.append({
+                    'action': action,
+                    'addr': hex(state.addr),
+                    'depth': state.history.depth,
+                    'constraint_count': len(state.solver.constraints),
+                    'step': self.step_count,
+                    'rss_mb': round(rss, 1)
+                })
+        gc.collect()
+
+    def restore_states(self, simgr, stash):
+        """内存回落后按优先级从磁盘取回溢出的状态"""
+        self.spilled.sort(key=lambda item: item[0], reverse=True)
+        restore_count = max(1, len(self.spilled) // 2) if simgr.stashes[stash] else 1
+        for _, state_id in self.spilled[:restore_count]:
+            simgr.stashes[stash].append(self.vault.load(state_id))
+            self.restored_count += 1
+        del self.spilled[:restore_count]
+
+    def summary(self):
+        """写入路径元数据的内存预算摘要"""
+        return {
+            'budget_mb': self.budget_mb,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'pruned_states': self.pruned_count,
+            'spilled_states': self.spilled_count,
+            'restored_states': self.restored_count,
+            'unrestored_states': len(self.spilled),
+            'dropped': self.dropped
+        }
+
+def memory_aware_analysis(binary_path, max_memory_gb=4, max_steps=None):
+    """内存感知的符号执行（按进程 RSS 预算裁剪状态）"""
     
               
-    project = angr.Project(str(binary_path), auto_load_libs=False)
+    project, _ = load_project(binary_path, auto_load_libs=False)
     
              
     state = project.factory.entry_state()
@@ -28,22 +142,15 @@ def memory_aware_analysis(binary_path, max_memory_gb=4):
     
                                
     simgr = project.factory.simulation_manager(state)
+    budget = MemoryBudget(max_memory_gb * 1024)
+    simgr.use_technique(budget)
     
     paths = []
-    step_count = 0
-    max_steps = 20        
+    simgr.run(n=max_steps)
     
-    while simgr.active and step_count < max_steps:
-        if not check_memory():
-            print(f"内存不足，停止符号执行")
-            break
-            
-        simgr.step()
-        step_count += 1
-        
-                
-        if step_count % 5 == 0:
-            gc.collect()
+    if budget.pruned_count or budget.spilled_count:
+        print(f"内存预算触发: 丢弃 {budget.pruned_count} 个状态, 溢出 {budget.spilled_count} 个状态 "
+              f"(峰值 RSS {budget.peak_rss_mb:.0f} MB)")
     
           
     for state in simgr.deadended + simgr.active:
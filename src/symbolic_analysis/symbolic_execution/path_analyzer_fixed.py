@@ -10,8 +10,17 @@ import re
 import glob
 import ast
 
-def extract_path_signature_from_file(file_path):
-    """从文件注释中提取路径签名信息"""
+try:
+    from path_corpus import PathCorpus
+    PATH_CORPUS_AVAILABLE = True
+except ImportError:
+    PATH_CORPUS_AVAILABLE = False
+
+def extract_path_signature_from_file(file_path, corpus=None):
+    """从文件注释中提取路径签名信息（若提供打包语料则直接读取索引）"""
+    if corpus is not None and file_path in corpus:
+        return corpus.path_signature(file_path)
+    
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -191,19 +200,23 @@ def find_path_matches_fixed(paths1, paths2):
     
     return matches
 
-def analyze_and_compare_fixed(prefix1, prefix2, output_file="fixed_comparison.txt"):
+def analyze_and_compare_fixed(prefix1, prefix2, output_file="fixed_comparison.txt", corpus=None):
     """修复版的路径比较分析"""
     print("开始修复版路径比较分析...")
     
           
-    files1 = sorted(glob.glob(f"{prefix1}*.txt"))
-    files2 = sorted(glob.glob(f"{prefix2}*.txt"))
+    if corpus is not None:
+        files1 = corpus.files_with_prefix(prefix1)
+        files2 = corpus.files_with_prefix(prefix2)
+    else:
+        files1 = sorted(glob.glob(f"{prefix1}*.txt"))
+        files2 = sorted(glob.glob(f"{prefix2}*.txt"))
     
     print(f"找到文件: {len(files1)} vs {len(files2)}")
     
           
-    paths1 = [extract_path_signature_from_file(f) for f in files1]
-    paths2 = [extract_path_signature_from_file(f) for f in files2]
+    paths1 = [extract_path_signature_from_file(f, corpus) for f in files1]
+    paths2 = [extract_path_signature_from_file(f, corpus) for f in files2]
     
             
     paths1 = [p for p in paths1 if p is not None]
@@ -289,10 +302,17 @@ def main():
     parser.add_argument('prefix1', help='第一组路径文件的前缀')
     parser.add_argument('prefix2', help='第二组路径文件的前缀')
     parser.add_argument('--output', default='fixed_comparison.txt', help='输出报告文件')
+    parser.add_argument('--corpus', help='打包路径语料文件 (path_corpus.py 生成)，替代逐个读取文本文件')
     
     args = parser.parse_args()
     
-    analyze_and_compare_fixed(args.prefix1, args.prefix2, args.output)
+    corpus = None
+    if args.corpus:
+        if not PATH_CORPUS_AVAILABLE:
+            parser.error("--corpus 需要 path_corpus 模块 (src/symbolic_analysis/equivalence) 位于 PYTHONPATH 中")
+        corpus = PathCorpus(args.corpus)
+    
+    analyze_and_compare_fixed(args.prefix1, args.prefix2, args.output, corpus)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+生成阶段的路径去重
+
+同一程序的不少终止状态在语义上完全相同：化简后的约束集只差符号变量的编号
+（如 scanf_0_57_32 与 scanf_0_91_32），全局数组的最终内容也一样。每条重复路径
+都会在等价性分析中再和对方程序的所有路径比较一遍。
+
+PathFingerprinter 对每个终止状态计算指纹：约束逐条 ``claripy.simplify`` 后只去掉
+变量名中 claripy 的 ``_<计数器>_<位宽>`` 后缀，保留变量的角色（``scanf_0``、
+``count_param``、``array_b_1`` 等，等价性分析正是按角色对齐两条路径）；同一角色
+出现多个变量时按首次出现顺序编号。约束排序后与数组 a..e 最终内容（同样改名）的
+摘要一起做 sha256。因此 ``array_b_0<5 ∧ array_b_1>7`` 与 ``array_b_1<5 ∧ array_b_0>7``
+的指纹不同，不会被合并。指纹相同的路径只写出第一条
+（规范路径），其余只累加重复数，最后在规范路径文件的签名信息块中写入 ``; 路径重复数: N``，
+等价性分析器按重复数计算匹配，结论与展开全部重复路径时相同。
+"""
+
+import re
+import hashlib
+import claripy
+
+TSVC_ARRAY_SYMBOLS = ('a', 'b', 'c', 'd', 'e')
+MULTIPLICITY_LINE = "; 路径重复数: {count}\n"
+SIGNATURE_HEADER = "; 路径签名信息:\n"
+
+# claripy 自动生成的变量名形如 <名字>_<计数器>_<位宽>
+GENERATED_NAME_PATTERN = re.compile(r'_(\d+)_(\d+)$')
+
+class PathFingerprinter:
+    """计算终止状态的指纹并把重复路径归并到第一条规范路径"""
+
+    def __init__(self, array_symbols=TSVC_ARRAY_SYMBOLS):
+        self.array_symbols = array_symbols
+        self.groups = {}
+        self.duplicate_count = 0
+
+    def rename_map(self, texts, names):
+        """去掉 claripy 计数器的改名表：角色名保留，同角色的多个变量按首次出现顺序编号"""
+        positions = {}
+        for name in names:
+            for offset, text in enumerate(texts):
+                found = text.find(name)
+                if found >= 0:
+                    positions[name] = (offset, found)
+                    break
+        mapping = {}
+        seen_roles = {}
+        for name in sorted(positions, key=positions.get):
+            match = GENERATED_NAME_PATTERN.search(name)
+            if match is None:
+                mapping[name] = name
+                continue
+            role = name[:match.start()]
+            occurrence = seen_roles.get(role, 0)
+            seen_roles[role] = occurrence + 1
+            mapping[name] = f"{role}#{occurrence}_{match.group(2)}"
+        return mapping
+
+    @staticmethod
+    def apply_renaming(text, mapping):
+        if not mapping:
+            return text
+        pattern = re.compile('|'.join(re.escape(name) for name in sorted(mapping, key=len, reverse=True)))
+        return pattern.sub(lambda match: mapping[match.group(0)], text)
+
+    def array_texts(self, state):
+        """数组 a..e 的最终内容（具体值或化简后的表达式文本）及其中的符号变量名"""
+        texts = []
+        names = set()
+        for name in self.array_symbols:
+            symbol = state.project.loader.find_symbol(name)
+            if symbol is None or not symbol.size:
+                continue
+            content = state.memory.load(symbol.rebased_addr, symbol.size)
+            if content.symbolic:
+                content = claripy.simplify(content)
+                names |= content.variables
+                texts.append(f"{name}={content}")
+            else:
+                texts.append(f"{name}={state.solver.eval(content):x}")
+        return texts, names
+
+    def fingerprint(self, state):
+        """返回状态的指纹（十六进制 sha256）"""
+        array_texts, names = self.array_texts(state)
+        return self.canonical_digest(state.solver.constraints, array_texts, names)
+
+    def canonical_digest(self, constraints, array_texts=(), names=()):
+        """约束与数组内容文本改名、排序后的 sha256"""
+        constraints = [claripy.simplify(constraint) for constraint in constraints]
+        constraints = [constraint for constraint in constraints if not constraint.is_true()]
+        constraint_texts = [str(constraint) for constraint in constraints]
+        array_texts = list(array_texts)
+        names = set(names)
+
+        for constraint in constraints:
+            names |= constraint.variables
+        mapping = self.rename_map(constraint_texts + array_texts, names)
+
+        canonical = sorted(self.apply_renaming(text, mapping) for text in constraint_texts)
+        canonical.append('|')
+        canonical.extend(self.apply_renaming(text, mapping) for text in array_texts)
+        return hashlib.sha256('\n'.join(canonical).encode('utf-8')).hexdigest()
+
+    def register(self, state, index):
+        """登记一条终止状态；若与已有路径重复，返回规范路径的索引，否则返回 None"""
+        key = self.fingerprint(state)
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = {'index': index, 'multiplicity': 1}
+            return None
+        group['multiplicity'] += 1
+        self.duplicate_count += 1
+        return group['index']
+
+    def multiplicities(self):
+        """规范路径索引 -> 重复数（只包含重复数大于 1 的路径）"""
+        return {group['index']: group['multiplicity'] for group in self.groups.values() if group['multiplicity'] > 1}
+
+    def summary(self):
+        return {
+            'distinct_paths': len(self.groups),
+            'duplicate_paths': self.duplicate_count
+        }
+
+def record_multiplicity(filename, count):
+    """把重复数写进规范路径文件的签名信息块（程序输出总在文件末尾，不能直接追加）"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        content = f.read()
+    line = MULTIPLICITY_LINE.format(count=count)
+    if SIGNATURE_HEADER in content:
+        content = content.replace(SIGNATURE_HEADER, SIGNATURE_HEADER + line, 1)
+    else:
+        content += "\n" + line
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(content)
@@ -0,0 +1,34 @@
+"""
+终止路径的流式输出
+
+原来的流程等探索全部结束后才逐个分析终止状态，期间所有 deadended 状态（连同
+完整的内存和历史）一直留在 simgr 里，峰值内存随总路径数增长。
+
+StreamDeadended 探索技术在每一步之后把新进入 deadended 的状态交给回调（序列化
+并写出路径文件），随后立即从 stash 中移除，峰值内存只与同时活跃的状态数有关。
+它应当最后一个加入 simgr，这样其他技术（如后支配点合并）处理完这一步之后才输出。
+"""
+
+import angr
+
+class StreamDeadended(angr.exploration_techniques.ExplorationTechnique):
+    """每步之后把终止状态交给回调并释放的探索技术"""
+
+    def __init__(self, callback, stash='deadended'):
+        super().__init__()
+        self.callback = callback
+        self.stash = stash
+        self.streamed = 0
+
+    def step(self, simgr, stash='active', **kwargs):
+        simgr = simgr.step(stash=stash, **kwargs)
+        self.flush(simgr)
+        return simgr
+
+    def flush(self, simgr):
+        """输出并释放当前所有终止状态"""
+        states = simgr.stashes[self.stash]
+        simgr.stashes[self.stash] = []
+        for state in states:
+            self.callback(state)
+            self.streamed += 1
@@ -0,0 +1,120 @@
+"""
+angr 项目缓存
+
+各入口（se_script_improved、clang_improved、ImprovedRealTSVCAnalyzer、memory_aware_analysis）
+每次都重新用 angr.Project 加载二进制、查找符号，循环摘要/状态合并还要重新恢复 CFG。
+ProjectCache 以二进制内容哈希（加上加载选项和 angr 版本）为键，把加载后的项目连同
+符号表和 CFGFast(normalize=True) 恢复出的知识库一起 pickle 到缓存目录，同一二进制
+再次分析时直接反序列化，跳过加载和 CFG 恢复。
+
+缓存目录默认是 ~/.cache/symbolic_analysis/angr_projects，可用环境变量
+ANGR_PROJECT_CACHE_DIR 修改。
+
+注意：缓存条目是 pickle 文件，反序列化时可以执行任意代码，缓存目录里只能有可信数据。
+不要把 ANGR_PROJECT_CACHE_DIR 指向共享或他人可写的目录；缓存目录以 0700 权限创建。
+不想使用缓存时，各入口可用 --no-project-cache 关闭。
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+import angr
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'ANGR_PROJECT_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'symbolic_analysis', 'angr_projects')
+)
+
+def binary_digest(binary_path):
+    """二进制文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(binary_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def recover_cfg(project):
+    """返回项目的 CFGFast(normalize=True) 结果；缓存加载的项目直接复用知识库中的 CFG"""
+    model = project.kb.cfgs.get_most_accurate() if project.kb.has_plugin('cfgs') else None
+    if model is not None and model.normalized:
+        return CachedCFG(project.kb, model)
+    return project.analyses.CFGFast(normalize=True)
+
+class CachedCFG:
+    """与 CFGFast 分析结果接口一致的只读视图（kb / model / functions）"""
+
+    def __init__(self, kb, model):
+        self.kb = kb
+        self.model = model
+        self.functions = kb.functions
+
+class ProjectCache:
+    """按二进制内容哈希缓存 angr 项目及其 CFG"""
+
+    def __init__(self, cache_dir=None, with_cfg=True):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.with_cfg = with_cfg
+
+    def entry_path(self, digest, load_options):
+        options_key = hashlib.sha256(
+            repr((sorted(load_options.items()), angr.__version__, self.with_cfg)).encode('utf-8')
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest[:32]}_{options_key[:12]}.pkl")
+
+    def load(self, binary_path, **load_options):
+        """加载项目，返回 (project, info)；info 记录冷/热启动及各自的设置时间"""
+        load_options.setdefault('auto_load_libs', False)
+        start_time = time.time()
+        digest = binary_digest(binary_path)
+        entry_path = self.entry_path(digest, load_options)
+
+        entry = None
+        if os.path.exists(entry_path):
+            try:
+                with open(entry_path, 'rb') as f:
+                    entry = pickle.load(f)
+            except Exception:
+                entry = None
+
+        if entry is not None:
+            project = entry['project']
+            return project, {
+                'cache': 'warm',
+                'setup_time': time.time() - start_time,
+                'cold_setup_time': entry['cold_setup_time'],
+                'binary_sha256': digest
+            }
+
+        project = angr.Project(binary_path, **load_options)
+        if self.with_cfg:
+            recover_cfg(project)
+        cold_setup_time = time.time() - start_time
+        self.store(entry_path, project, cold_setup_time)
+        return project, {
+            'cache': 'cold',
+            'setup_time': cold_setup_time,
+            'cold_setup_time': cold_setup_time,
+            'binary_sha256': digest
+        }
+
+    def store(self, entry_path, project, cold_setup_time):
+        """原子地写入缓存条目；写入失败（如项目含不可 pickle 的对象）时静默跳过"""
+        if project.kb.has_plugin('rtdb'):
+            project.kb.release_plugin('rtdb')
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'project': project, 'cold_setup_time': cold_setup_time}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+def load_project(binary_path, cache_dir=None, **load_options):
+    """使用默认缓存加载项目，返回 (project, info)"""
+    return ProjectCache(cache_dir).load(str(binary_path), **load_options)
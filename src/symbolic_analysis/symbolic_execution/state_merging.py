@@ -0,0 +1,179 @@
+"""
+在后支配点合并状态的探索技术
+
+angr 默认在每个条件分支处分叉，分支嵌套时路径数按指数增长。PostDominatorMerge
+在状态分叉时记下分支所在基本块的直接后支配点（同一函数内所有分支路径都会经过
+的汇合点），让各分支状态在汇合点等待，全部到达（或已终止）后合并为一个状态：
+路径条件是各分支条件的析取，寄存器和内存按条件合并为 ITE。
+
+这是以更少但更大的路径约束换取探索速度的做法，与 angr 自带的 Veritesting 一样
+可以通过 BenchmarkSymbolicExecution 的 merge_mode 选择。
+"""
+
+import itertools
+import angr
+import networkx
+from angr.state_plugins.sim_action_object import SimActionObject
+from project_cache import recover_cfg
+
+MERGE_WAIT_STASH = 'merge_wait'
+
+def merge_states(states):
+    """按各自独有的约束作为合并条件合并状态，返回合并后的状态"""
+    common = set.intersection(*({c.hash() for c in state.solver.constraints} for state in states))
+    merge_conditions = [
+        [SimActionObject(c) for c in state.solver.constraints if c.hash() not in common]
+        for state in states
+    ]
+    merged, _, _ = states[0].merge(*states[1:], merge_conditions=merge_conditions)
+    return merged
+
+def immediate_postdominators(function):
+    """函数内各基本块的直接后支配点 {块地址: 后支配块地址}，汇合于函数出口的分支不在其中"""
+    graph = networkx.DiGraph(function.graph)
+    exit_node = object()
+    graph.add_node(exit_node)
+    for node in list(graph.nodes):
+        if node is not exit_node and graph.out_degree(node) == 0:
+            graph.add_edge(node, exit_node)
+
+    postdominators = networkx.immediate_dominators(graph.reverse(copy=False), exit_node)
+    return {
+        node.addr: postdominator.addr
+        for node, postdominator in postdominators.items()
+        if node is not exit_node and postdominator is not exit_node and postdominator is not node
+    }
+
+class PostDominatorMerge(angr.exploration_techniques.ExplorationTechnique):
+    """在直接后支配点合并同一次分叉产生的状态"""
+
+    def __init__(self, functions=None, max_pending_forks=1000):
+        super().__init__()
+        self.function_names = functions
+        self.max_pending_forks = max_pending_forks
+
+        self.cfg = None
+        self.join_of = {}
+        self.join_points = set()
+        self.forks = {}
+        self.fork_ids = itertools.count()
+
+        self.fork_count = 0
+        self.merge_count = 0
+        self.merged_states = 0
+        self.merge_failures = 0
+
+    def setup(self, simgr):
+        project = simgr._project
+        simgr.populate(MERGE_WAIT_STASH, [])
+        self.cfg = recover_cfg(project)
+        for function in self.cfg.kb.functions.values():
+            if function.is_plt or function.is_simprocedure:
+                continue
+            if self.function_names is not None and function.name not in self.function_names:
+                continue
+            self.join_of.update(immediate_postdominators(function))
+        self.join_points = set(self.join_of.values())
+
+    def fork_stack(self, state):
+        return state.globals.get('merge_forks', ())
+
+    def branch_join(self, successors):
+        """条件分支产生多个后继时返回其汇合点地址，否则返回 None"""
+        if any(successor.history.jumpkind != 'Ijk_Boring' for successor in successors):
+            return None
+        source = successors[0].history.jump_source
+        if source is None:
+            return None
+        node = self.cfg.model.get_any_node(source, anyaddr=True)
+        return self.join_of.get(node.addr) if node is not None else None
+
+    def step_state(self, simgr, state, **kwargs):
+        stack = self.fork_stack(state)
+        stashes = simgr.step_state(state, **kwargs)
+        successors = stashes.get(None, [])
+
+        fork = self.forks.get(stack[-1]) if stack else None
+        if not successors:
+            if fork is not None:
+                fork['outstanding'] -= 1
+            return stashes
+
+        if len(successors) > 1:
+            join = self.branch_join(successors)
+            if join is not None and len(self.forks) < self.max_pending_forks:
+                fork_id = next(self.fork_ids)
+                self.forks[fork_id] = {
+                    'join': join,
+                    'depth': len(state.callstack),
+                    'outstanding': len(successors)
+                }
+                self.fork_count += 1
+                for successor in successors:
+                    successor.globals['merge_forks'] = stack + (fork_id,)
+            elif fork is not None:
+                fork['outstanding'] += len(successors) - 1
+
+        return stashes
+
+    def at_join(self, state):
+        """状态是否位于其最内层分叉的汇合点"""
+        stack = self.fork_stack(state)
+        fork = self.forks.get(stack[-1]) if stack else None
+        return fork is not None and fork['join'] == state.addr and fork['depth'] == len(state.callstack)
+
+    def filter(self, simgr, state, **kwargs):
+        if self.at_join(state):
+            return MERGE_WAIT_STASH
+        return simgr.filter(state, **kwargs)
+
+    def step(self, simgr, stash='active', **kwargs):
+        stop_points = set(kwargs.pop('extra_stop_points', None) or ()) | self.join_points
+        simgr = simgr.step(stash=stash, extra_stop_points=stop_points, **kwargs)
+
+        # 合并后的状态若正位于外层分叉的汇合点，继续等待外层分叉
+        while simgr.stashes[MERGE_WAIT_STASH]:
+            waiting = {}
+            for state in simgr.stashes[MERGE_WAIT_STASH]:
+                waiting.setdefault(self.fork_stack(state)[-1], []).append(state)
+
+            drained = not simgr.stashes[stash]
+            released = [fork_id for fork_id, states in waiting.items()
+                        if drained or len(states) >= self.forks[fork_id]['outstanding']]
+            if not released:
+                break
+
+            simgr.stashes[MERGE_WAIT_STASH] = [
+                state for state in simgr.stashes[MERGE_WAIT_STASH]
+                if self.fork_stack(state)[-1] not in released
+            ]
+            joined = [state for fork_id in released for state in self.join(fork_id, waiting[fork_id])]
+            for state in joined:
+                simgr.stashes[MERGE_WAIT_STASH if self.at_join(state) else stash].append(state)
+        return simgr
+
+    def join(self, fork_id, states):
+        """合并到达汇合点的状态，并把它们的分叉记录出栈"""
+        del self.forks[fork_id]
+        if len(states) > 1:
+            try:
+                merged = merge_states(states)
+                self.merge_count += 1
+                self.merged_states += len(states)
+                states = [merged]
+            except Exception:
+                self.merge_failures += 1
+
+        for state in states:
+            state.globals['merge_forks'] = self.fork_stack(state)[:-1]
+        return states
+
+    def summary(self):
+        """写入路径元数据的状态合并统计"""
+        return {
+            'join_points': len(self.join_points),
+            'forks': self.fork_count,
+            'merges': self.merge_count,
+            'merged_states': self.merged_states,
+            'merge_failures': self.merge_failures
+        }
@@ -4,34 +4,59 @@
 
 改进的符号执行脚本
 修复了angr API兼容性问题，改善了路径标识方法
+
+scanf 符号变量登记在各自的 ImprovedPathAnalyzer 实例上（每个分析器给自己项目的
+scanf hook 传入自己的登记表），没有模块级状态，同一进程中的多个分析器可以用
+run_path_analyzers（线程池）或 run_symbolic_execution_async（asyncio）并发运行，
+共享已加载的 angr/z3 模块。
 """
 
 import angr
 import claripy
 import re
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from claripy.backends.backend_z3 import claripy_solver_to_smt2
 import logging
 
+try:
+    from memory_optimized_analysis import MemoryBudget
+    MEMORY_BUDGET_AVAILABLE = True
+except ImportError:
+    MEMORY_BUDGET_AVAILABLE = False
+
+try:
+    from project_cache import ProjectCache
+    PROJECT_CACHE_AVAILABLE = True
+except ImportError:
+    PROJECT_CACHE_AVAILABLE = False
+
+try:
+    from path_fingerprint import PathFingerprinter, record_multiplicity
+    PATH_FINGERPRINT_AVAILABLE = True
+except ImportError:
+    PATH_FINGERPRINT_AVAILABLE = False
+
         
 logging.getLogger('angr').setLevel(logging.WARNING)
 logging.getLogger('claripy').setLevel(logging.WARNING)
 
-       
-scanf_counter = 0
-scanf_variables = {}
-
 class ScanfSymProc(angr.SimProcedure):
-    """改进的scanf符号化过程"""
+    """改进的scanf符号化过程，新建的符号变量登记到 variables（所属分析器的登记表）"""
+    
+    def __init__(self, variables=None, **kwargs):
+        super().__init__(**kwargs)
+        self.variables = variables if variables is not None else {}
     
     def run(self, fmt_ptr, value_ptr):
-        global scanf_counter, scanf_variables
+        var_name = f'scanf_{len(self.variables)}'
         
                     
-        sym_var = claripy.BVS(f'scanf_{scanf_counter}', 32)
+        sym_var = claripy.BVS(var_name, 32)
         
                   
-        scanf_variables[f'scanf_{scanf_counter}'] = sym_var
-        scanf_counter += 1
+        self.variables[var_name] = sym_var
         
                    
         self.state.memory.store(
@@ -45,21 +70,32 @@ class ScanfSymProc(angr.SimProcedure):
 class ImprovedPathAnalyzer:
     """改进的路径分析器"""
     
-    def __init__(self, binary_path, timeout=120):
+    def __init__(self, binary_path, timeout=120, memory_budget_mb=None, project_cache=True, dedup_paths=False):
         self.binary_path = binary_path
         self.timeout = timeout
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_budget = None
+        self.project_cache = ProjectCache() if project_cache and PROJECT_CACHE_AVAILABLE else None
+        self.project_cache_info = {'cache': 'disabled'}
+        self.setup_time = 0.0
+        self.dedup_paths = dedup_paths
+        self.path_fingerprinter = None
+        self.scanf_variables = {}
         self.project = None
         self.paths_info = []
     
     def setup_project(self):
         """设置angr项目"""
-        self.project = angr.Project(self.binary_path, auto_load_libs=False)
+        if self.project_cache:
+            self.project, self.project_cache_info = self.project_cache.load(self.binary_path, auto_load_libs=False)
+        else:
+            self.project = angr.Project(self.binary_path, auto_load_libs=False)
         
                           
         scanf_symbols = ['scanf', '__isoc99_scanf', '__isoc23_scanf', '__scanf_chk']
         for symbol in scanf_symbols:
             if self.project.loader.find_symbol(symbol):
-                self.project.hook_symbol(symbol, ScanfSymProc())
+                self.project.hook_symbol(symbol, ScanfSymProc(self.scanf_variables))
                 print(f"已hook符号: {symbol}")
     
     def extract_path_signature(self, state):
@@ -67,9 +103,8 @@ class ImprovedPathAnalyzer:
         signature = {}
         
                    
-        global scanf_variables
         variable_values = {}
-        for var_name, sym_var in scanf_variables.items():
+        for var_name, sym_var in list(self.scanf_variables.items()):
             try:
                          
                 if state.solver.satisfiable():
@@ -123,9 +158,14 @@ class ImprovedPathAnalyzer:
     def run_symbolic_execution(self):
         """运行符号执行"""
         print(f"开始符号执行: {self.binary_path}")
+        self.scanf_variables.clear()
+        self.paths_info = []
         
               
+        setup_start = time.time()
         self.setup_project()
+        self.setup_time = time.time() - setup_start
+        print(f"项目设置: {self.setup_time:.3f} 秒 (项目缓存: {self.project_cache_info['cache']})")
         
         if self.project is None:
             print("项目初始化失败")
@@ -136,6 +176,12 @@ class ImprovedPathAnalyzer:
         
                  
         simgr = self.project.factory.simulation_manager(initial_state)
+        if self.memory_budget_mb:
+            if not MEMORY_BUDGET_AVAILABLE:
+                raise RuntimeError("内存预算需要 memory_optimized_analysis 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.memory_budget = MemoryBudget(self.memory_budget_mb)
+            simgr.use_technique(self.memory_budget)
+            print(f"启用内存预算: {self.memory_budget_mb} MB (进程 RSS)")
         
                 
         print("开始探索路径...")
@@ -145,16 +191,33 @@ class ImprovedPathAnalyzer:
         print(f"  终止路径数: {len(simgr.deadended)}")
         print(f"  活跃路径数: {len(simgr.active)}")
         print(f"  错误路径数: {len(simgr.errored)}")
+        if self.memory_budget:
+            print(f"  内存预算丢弃状态数: {self.memory_budget.pruned_count} (溢出: {self.memory_budget.spilled_count})")
         
                   
+        if self.dedup_paths:
+            if not PATH_FINGERPRINT_AVAILABLE:
+                raise RuntimeError("路径去重需要 path_fingerprint 模块 (src/symbolic_analysis/symbolic_execution) 位于 PYTHONPATH 中")
+            self.path_fingerprinter = PathFingerprinter()
         self.analyze_deadended_states(simgr.deadended)
         
         return self.paths_info
     
+    async def run_symbolic_execution_async(self, executor=None):
+        """在 asyncio 事件循环中运行符号执行（放到 executor 线程中执行，默认使用循环的默认线程池）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.run_symbolic_execution)
+    
     def analyze_deadended_states(self, deadended_states):
         """分析所有终止状态"""
-        for i, state in enumerate(deadended_states):
-            print(f"\n分析路径 {i + 1}...")
+        for state in deadended_states:
+            index = len(self.paths_info) + 1
+            if self.path_fingerprinter:
+                canonical_index = self.path_fingerprinter.register(state, index)
+                if canonical_index is not None:
+                    print(f"\n终止状态与路径 {canonical_index} 指纹相同，计入其重复数")
+                    continue
+            print(f"\n分析路径 {index}...")
             
                     
             signature = self.extract_path_signature(state)
@@ -164,10 +227,11 @@ class ImprovedPathAnalyzer:
             
                     
             path_info = {
-                'index': i + 1,
+                'index': index,
                 'signature': signature,
                 'smt_constraints': smt_constraints,
-                'state': state                
+                'state': state,
+                'multiplicity': 1
             }
             
             self.paths_info.append(path_info)
@@ -179,6 +243,14 @@ class ImprovedPathAnalyzer:
             print(f"  变量值: {signature['variables']}")
             print(f"  约束数量: {signature['constraints']['count']}")
             print(f"  程序输出: {signature['output']}")
+        
+        if self.path_fingerprinter:
+            for index, count in self.path_fingerprinter.multiplicities().items():
+                path_info = self.paths_info[index - 1]
+                path_info['multiplicity'] = count
+                record_multiplicity(self.path_filename(path_info), count)
+            summary = self.path_fingerprinter.summary()
+            print(f"路径去重: {summary['distinct_paths']} 条不同路径，{summary['duplicate_paths']} 条重复路径已归并")
     
     def generate_smt_constraints(self, state):
         """生成SMT约束"""
@@ -192,9 +264,12 @@ class ImprovedPathAnalyzer:
             print(f"生成SMT约束失败: {e}")
             return ""
     
+    def path_filename(self, path_info):
+        return f"{self.binary_path.split('/')[-1]}_path_{path_info['index']}.txt"
+    
     def save_path_to_file(self, path_info):
         """保存路径信息到文件"""
-        filename = f"{self.binary_path.split('/')[-1]}_path_{path_info['index']}.txt"
+        filename = self.path_filename(path_info)
         
         with open(filename, "w", encoding='utf-8') as f:
             f.write(path_info['smt_constraints'])
@@ -202,11 +277,30 @@ class ImprovedPathAnalyzer:
             f.write(f"; 变量值: {path_info['signature']['variables']}\n")
             f.write(f"; 约束信息: {path_info['signature']['constraints']}\n")
             f.write(f"; 内存哈希: {path_info['signature']['memory_hash']}\n")
+            if self.memory_budget:
+                f.write(f"; 内存预算: {self.memory_budget.summary()}\n")
+            f.write("; \n")
+            f.write("; 时间信息:\n")
+            f.write(f"; 项目设置时间: {self.setup_time:.3f} 秒\n")
+            if self.project_cache_info['cache'] == 'warm':
+                f.write(f"; 项目缓存: 命中 (冷启动设置时间: {self.project_cache_info['cold_setup_time']:.3f} 秒)\n")
+            elif self.project_cache_info['cache'] == 'cold':
+                f.write("; 项目缓存: 未命中 (已写入缓存)\n")
             f.write(f"; 程序输出:\n")
             f.write(path_info['signature']['output'])
         
         print(f"  已保存到: {filename}")
 
+def run_path_analyzers(binary_paths, workers=None, **analyzer_options):
+    """用线程池在同一进程内并发分析多个二进制，返回 {binary_path: paths_info}
+
+    每个二进制对应一个独立的 ImprovedPathAnalyzer（各自的项目、hook 和符号变量登记表）。
+    """
+    analyzers = {path: ImprovedPathAnalyzer(path, **analyzer_options) for path in binary_paths}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {path: executor.submit(analyzer.run_symbolic_execution) for path, analyzer in analyzers.items()}
+        return {path: future.result() for path, future in futures.items()}
+
 def compare_path_collections_improved(analyzer1_results, analyzer2_results):
     """改进的路径集合比较"""
     print("\n开始改进的路径比较...")
@@ -268,15 +362,20 @@ def main():
     """主函数 - 示例用法"""
     import sys
     
-    if len(sys.argv) < 2:
-        print("用法: python clang_improved.py <binary_path>")
-        print("例如: python clang_improved.py ./test1_clang")
+    dedup_paths = '--dedup-paths' in sys.argv
+    project_cache = '--no-project-cache' not in sys.argv
+    argv = [arg for arg in sys.argv if arg not in ('--dedup-paths', '--no-project-cache')]
+    if len(argv) < 2:
+        print("用法: python clang_improved.py <binary_path> [memory_budget_mb] [--dedup-paths] [--no-project-cache]")
+        print("例如: python clang_improved.py ./test1_clang 2048")
         return
     
-    binary_path = sys.argv[1]
+    binary_path = argv[1]
+    memory_budget_mb = int(argv[2]) if len(argv) > 2 else None
     
               
-    analyzer = ImprovedPathAnalyzer(binary_path)
+    analyzer = ImprovedPathAnalyzer(binary_path, memory_budget_mb=memory_budget_mb, project_cache=project_cache,
+                                    dedup_paths=dedup_paths)
     results = analyzer.run_symbolic_execution()
     
     print(f"\n分析完成！共发现 {len(results)} 条路径")
@@ -0,0 +1,45 @@
+"""
+具体求值反驳测试
+不等价的路径对应被具体输入反驳，等价的路径对绝不能被反驳
+"""
+
+from z3 import BitVec, ULT, ULE, UGE, Not, And, ZeroExt, Extract
+from concrete_refutation import ConcreteRefuter, resolve_witness
+
+x = BitVec('scanf_0_57_32', 32)
+y = BitVec('scanf_1_58_32', 32)
+
+def test_refutes_off_by_one_bound():
+    """x < 10 与 x <= 10 只在 x = 10 处不同，边界值应命中该输入"""
+    refuter = ConcreteRefuter()
+    assert refuter.refute(ULT(x, 10), ULE(x, 10)) == "[scanf_0_57_32 = 10]"
+    assert refuter.refuted == 1
+
+def test_refutes_with_witness():
+    """只在路径见证值处不同的公式，由见证值反驳"""
+    refuter = ConcreteRefuter(random_samples=0)
+    formula1 = And(ULT(x, 1000), ULT(y, 1000))
+    formula2 = And(formula1, Not(And(x == 123, y == 456)))
+    witnesses = [resolve_witness({'scanf_0': 123, 'scanf_1': 456}, {'scanf_0_57_32': 32, 'scanf_1_58_32': 32})]
+    assert refuter.refute(formula1, formula2, witnesses) == "[scanf_0_57_32 = 123, scanf_1_58_32 = 456]"
+
+def test_does_not_refute_equivalent_pair():
+    """形式不同但等价的公式不得被反驳"""
+    refuter = ConcreteRefuter()
+    assert refuter.refute(ULT(x, 10), Not(UGE(x, 10))) is None
+    assert refuter.refute(ULT(ZeroExt(32, x), 16), Extract(31, 4, x) == 0) is None
+    assert refuter.refute(ULT(ZeroExt(32, x), 10), ULT(x, 10)) is None
+    assert refuter.refuted == 0
+
+def test_resolve_witness_renames_into_query_variables():
+    """见证值按短名匹配声明变量，再按路径2的重命名映射到查询变量"""
+    resolved = resolve_witness({'scanf_0': 7, 'note': 'text'}, {'scanf_0_91_32': 32},
+                               {'scanf_0_91_32': 'scanf_0_57_32'})
+    assert resolved == {'scanf_0_57_32': 7}
+
+if __name__ == "__main__":
+    test_refutes_off_by_one_bound()
+    test_refutes_with_witness()
+    test_does_not_refute_equivalent_pair()
+    test_resolve_witness_renames_into_query_variables()
+    print("具体求值反驳测试通过")
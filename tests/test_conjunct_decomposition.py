@@ -0,0 +1,50 @@
+"""
+合取分解测试
+变量不相交的合取项按分量分别求解；共享变量的查询不分解，交回整体求解
+"""
+
+from z3 import BitVec, ULT, UGE, UGT, Not, And, Xor, Solver, sat, unsat
+from conjunct_decomposition import ConjunctDecomposer
+
+x = BitVec('scanf_0_57_32', 32)
+y = BitVec('scanf_1_58_32', 32)
+
+def solve(formula1, formula2):
+    solver = Solver(ctx=formula1.ctx)
+    solver.add(Xor(formula1, formula2))
+    result = solver.check()
+    return result, str(solver.model()) if result == sat else None
+
+def test_disjoint_conjuncts_are_checked_per_component():
+    """x 与 y 的约束互不相关，拆成两个分量分别判定"""
+    decomposer = ConjunctDecomposer()
+    formula1 = And(ULT(x, 10), y == 3)
+    result, model, details = decomposer.check(formula1, And(y == 3, Not(UGE(x, 10))), solve)
+    assert result == unsat and model is None
+    assert details == {"components": 2, "component_queries": 2, "component_cache_hits": 0}
+
+    # the x component repeats the first query and comes from the component cache
+    result, model, details = decomposer.check(formula1, And(y == 4, Not(UGE(x, 10))), solve)
+    assert result == sat and model is not None
+    assert details["component_cache_hits"] == 1
+
+def test_both_sides_unsatisfiable():
+    """某分量两侧都不可满足时，整体公式都为假，即使另一分量不同也等价"""
+    decomposer = ConjunctDecomposer()
+    contradiction = And(ULT(x, 10), UGT(x, 20))
+    result, _, _ = decomposer.check(And(contradiction, y == 3), And(contradiction, y == 4), solve)
+    assert result == unsat
+
+def test_shared_variables_are_not_decomposed():
+    """合取项通过共享变量连成一个分量时返回 None，由调用方整体求解"""
+    decomposer = ConjunctDecomposer()
+    formula1 = And(ULT(x, y), y == 3)
+    formula2 = And(ULT(x, 3), y == 3)
+    assert len(decomposer.components(decomposer.conjuncts(formula1), decomposer.conjuncts(formula2))) == 1
+    assert decomposer.check(formula1, formula2, solve) is None
+
+if __name__ == "__main__":
+    test_disjoint_conjuncts_are_checked_per_component()
+    test_both_sides_unsatisfiable()
+    test_shared_variables_are_not_decomposed()
+    print("合取分解测试通过")
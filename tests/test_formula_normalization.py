@@ -0,0 +1,45 @@
+"""
+公式规范化测试
+变量重命名、操作数顺序不同的公式应得到相同的结构哈希；结构捷径和缓存键必须按路径2的重命名对齐变量
+"""
+
+from z3 import BitVec, ULT, UGT, And
+from formula_normalization import FormulaNormalizer, pair_key
+
+a1, b1 = BitVec('scanf_0_57_32', 32), BitVec('scanf_1_58_32', 32)
+a2, b2 = BitVec('scanf_0_91_32', 32), BitVec('scanf_1_92_32', 32)
+renaming = {'scanf_0_91_32': 'scanf_0_57_32', 'scanf_1_92_32': 'scanf_1_58_32'}
+
+def test_renamed_formula_has_same_structure():
+    """重命名并交换合取项顺序后，结构相同且按重命名对齐"""
+    normalizer = FormulaNormalizer()
+    form1 = normalizer.normalize(And(ULT(a1, 10), UGT(b1, a1)))
+    form2 = normalizer.normalize(And(UGT(b2, a2), ULT(a2, 10)))
+    assert form1.structural_hash == form2.structural_hash
+    assert form1.same_structure(form2, renaming)
+    assert not form1.same_structure(form2)
+
+def test_swapped_roles_are_not_the_same_structure():
+    """结构哈希相同但变量角色互换时，结构捷径不得成立"""
+    normalizer = FormulaNormalizer()
+    form1 = normalizer.normalize(And(ULT(a1, 10), UGT(b1, a1)))
+    swapped = normalizer.normalize(And(ULT(b2, 10), UGT(a2, b2)))
+    assert form1.structural_hash == swapped.structural_hash
+    assert not form1.same_structure(swapped, renaming)
+
+def test_pair_key_follows_renaming():
+    """缓存键与变量计数器无关，但区分不同的变量对齐"""
+    normalizer = FormulaNormalizer()
+    form1 = normalizer.normalize(And(ULT(a1, 10), UGT(b1, a1)))
+    form2 = normalizer.normalize(And(UGT(b2, a2), ULT(a2, 10)))
+    a3, b3 = BitVec('scanf_0_17_32', 32), BitVec('scanf_1_18_32', 32)
+    form3 = normalizer.normalize(And(ULT(a3, 10), UGT(b3, a3)))
+    renaming3 = {'scanf_0_17_32': 'scanf_0_57_32', 'scanf_1_18_32': 'scanf_1_58_32'}
+    assert pair_key(form1, form2, renaming) == pair_key(form1, form3, renaming3)
+    assert pair_key(form1, form2, renaming) != pair_key(form1, form2)
+
+if __name__ == "__main__":
+    test_renamed_formula_has_same_structure()
+    test_swapped_roles_are_not_the_same_structure()
+    test_pair_key_follows_renaming()
+    print("公式规范化测试通过")
@@ -0,0 +1,56 @@
+"""
+区间快速路径测试
+单变量/双变量的范围约束由区间比较直接判定，超出区间片段的公式交回 Z3
+"""
+
+from z3 import BitVec, ULT, ULE, UGT, UGE, Not, And, Or, ZeroExt
+from interval_analysis import IntervalDecider
+from semantic_equivalence_analyzer import EnhancedConstraintChecker
+
+x = BitVec('scanf_0_57_32', 32)
+y = BitVec('scanf_1_58_32', 32)
+z = BitVec('scanf_2_59_32', 32)
+
+def test_one_variable():
+    """单变量：等价的不同写法判为等价，差一的边界给出区分输入"""
+    decider = IntervalDecider()
+    assert decider.decide(ULT(x, 10), Not(UGE(x, 10))) == ("equivalent", None)
+    assert decider.decide(ULT(ZeroExt(32, x), 10), ULE(x, 9)) == ("equivalent", None)
+    assert decider.decide(ULT(x, 10), ULE(x, 10)) == ("not_equivalent", "[scanf_0_57_32 = 10]")
+
+def test_two_variables():
+    """双变量：按第一个变量分段比较第二个变量的取值集合"""
+    decider = IntervalDecider()
+    box = And(ULT(x, 10), UGT(y, 5))
+    assert decider.decide(box, And(UGT(y, 5), Not(UGE(x, 10)))) == ("equivalent", None)
+    assert decider.decide(Or(box, And(ULT(x, 5), UGT(y, 5))), box) == ("equivalent", None)
+    assert decider.decide(box, And(ULT(x, 10), UGT(y, 6))) == (
+        "not_equivalent", "[scanf_0_57_32 = 0, scanf_1_58_32 = 6]"
+    )
+
+def test_unsupported_shapes_fall_through():
+    """两项比较、三个变量等超出片段的形状返回 None"""
+    decider = IntervalDecider()
+    assert decider.decide(ULT(x, y), ULT(x, y)) is None
+    assert decider.decide(And(ULT(x, 1), ULT(y, 1), ULT(z, 1)), And(ULT(x, 1), ULT(y, 1))) is None
+    assert decider.decided == 0
+
+def test_checker_falls_through_to_z3():
+    """检查器遇到不支持的形状时由 Z3 判定，结果不标记为区间判定"""
+    checker = EnhancedConstraintChecker()
+    checker.interval_decider = IntervalDecider()
+    variables = {'scanf_0_57_32': 32, 'scanf_1_58_32': 32}
+    verdict, details = checker.check_constraint_equivalence(
+        ["(bvult scanf_0_57_32 scanf_1_58_32)"], ["(bvugt scanf_1_58_32 scanf_0_57_32)"],
+        variables, variables, {}
+    )
+    assert verdict == "equivalent"
+    assert 'decided_by' not in details
+    assert checker.interval_decider.attempts == 1 and checker.interval_decider.decided == 0
+
+if __name__ == "__main__":
+    test_one_variable()
+    test_two_variables()
+    test_unsupported_shapes_fall_through()
+    test_checker_falls_through_to_z3()
+    print("区间快速路径测试通过")
@@ -0,0 +1,71 @@
+"""
+路径去重一致性测试
+分析器在去重后的路径集（带 ``; 路径重复数``）与展开全部重复文件的路径集上应得到相同结论和匹配总数
+"""
+
+import os
+import tempfile
+from semantic_equivalence_analyzer import EnhancedPathAnalyzer
+
+# (约束上界, 数组最终值) 描述一条路径；同一程序内变量计数器各不相同
+PATH_A = (10, "{'a': {0: 2, 1: 2}}")
+PATH_B = (20, "{'a': {0: 1, 1: 3}}")
+
+def write_path(directory, prefix, index, path, counter, multiplicity=None):
+    bound, final_state = path
+    var_name = f"scanf_0_{counter}_32"
+    lines = [
+        "; 路径签名信息:",
+        "; 数组初始值: {'a': {0: 1, 1: 2}}",
+        f"; 数组最终值: {final_state}",
+    ]
+    if multiplicity is not None:
+        lines.append(f"; 路径重复数: {multiplicity}")
+    lines += [
+        "(set-logic QF_BV)",
+        f"(declare-fun {var_name} () (_ BitVec 32))",
+        f"(assert (bvult {var_name} #x{bound:08x}))",
+        "(check-sat)",
+    ]
+    with open(os.path.join(directory, f"{prefix}{index}.txt"), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def write_program(directory, prefix, paths, dedup, counter_base):
+    """paths 是 [(路径, 重复数)]；dedup 时每组写一个文件，否则把重复路径逐个展开"""
+    index = 1
+    for path, multiplicity in paths:
+        for copy in range(1 if dedup else multiplicity):
+            write_path(directory, prefix, index, path, counter_base + index,
+                       multiplicity if dedup and multiplicity > 1 else None)
+            index += 1
+
+def analyze(paths1, paths2, dedup):
+    with tempfile.TemporaryDirectory() as directory:
+        write_program(directory, "prog1_path_", paths1, dedup, 50)
+        write_program(directory, "prog2_path_", paths2, dedup, 90)
+        analyzer = EnhancedPathAnalyzer()
+        results = analyzer.analyze_program_equivalence(
+            os.path.join(directory, "prog1_path_"), os.path.join(directory, "prog2_path_")
+        )
+    return {
+        'program_equivalent': results['program_equivalent'],
+        'matched_total': sum(pair['multiplicity'] for pair in results['equivalent_pairs']),
+        'paths1_total': results['paths1_multiplicity'],
+        'paths2_total': results['paths2_multiplicity'],
+    }
+
+def test_dedup_matches_expanded_paths():
+    """等价与不等价两种情况下，去重与展开的结论、匹配总数和路径总数都相同"""
+    cases = [
+        ([(PATH_A, 2), (PATH_B, 1)], [(PATH_B, 1), (PATH_A, 2)], True),
+        ([(PATH_A, 3), (PATH_B, 1)], [(PATH_A, 1), (PATH_B, 2)], False),
+    ]
+    for paths1, paths2, expected in cases:
+        deduplicated = analyze(paths1, paths2, dedup=True)
+        expanded = analyze(paths1, paths2, dedup=False)
+        assert deduplicated == expanded, (deduplicated, expanded)
+        assert deduplicated['program_equivalent'] is expected
+
+if __name__ == "__main__":
+    test_dedup_matches_expanded_paths()
+    print("路径去重一致性测试通过")
@@ -0,0 +1,47 @@
+"""
+路径指纹测试
+只差 claripy 变量计数器的路径应合并；变量角色互换的路径不得合并
+"""
+
+import claripy
+from path_fingerprint import PathFingerprinter
+
+def test_counter_only_difference_is_merged():
+    """约束相同、变量计数器不同的两条路径指纹相同"""
+    fingerprinter = PathFingerprinter()
+    x1 = claripy.BVS('scanf_0', 32)
+    x2 = claripy.BVS('scanf_0', 32)
+    assert x1.args[0] != x2.args[0]
+    assert (fingerprinter.canonical_digest([x1 < 10, x1 > 2])
+            == fingerprinter.canonical_digest([x2 > 2, x2 < 10]))
+
+def test_swapped_roles_are_not_merged():
+    """array_b_0<5 ∧ array_b_1>7 与 array_b_1<5 ∧ array_b_0>7 的指纹不同"""
+    fingerprinter = PathFingerprinter()
+    b0 = claripy.BVS('array_b_0', 32)
+    b1 = claripy.BVS('array_b_1', 32)
+    assert (fingerprinter.canonical_digest([b0 < 5, b1 > 7])
+            != fingerprinter.canonical_digest([b1 < 5, b0 > 7]))
+
+def test_different_roles_are_not_merged():
+    """同构约束落在不同角色的变量上（count_param 与 scanf_0）时不合并"""
+    fingerprinter = PathFingerprinter()
+    count = claripy.BVS('count_param', 32)
+    scanf = claripy.BVS('scanf_0', 32)
+    assert fingerprinter.canonical_digest([count < 10]) != fingerprinter.canonical_digest([scanf < 10])
+
+def test_rename_map_keeps_roles():
+    """改名只去掉 _<计数器>_<位宽> 后缀，同角色的多个变量按首次出现编号"""
+    mapping = PathFingerprinter().rename_map(
+        ["scanf_0_91_32 < scanf_0_95_32", "array_b_1_12_32 > 7"],
+        {'scanf_0_91_32', 'scanf_0_95_32', 'array_b_1_12_32'}
+    )
+    assert mapping == {'scanf_0_91_32': 'scanf_0#0_32', 'scanf_0_95_32': 'scanf_0#1_32',
+                       'array_b_1_12_32': 'array_b_1#0_32'}
+
+if __name__ == "__main__":
+    test_counter_only_difference_is_merged()
+    test_swapped_roles_are_not_merged()
+    test_different_roles_are_not_merged()
+    test_rename_map_keeps_roles()
+    print("路径指纹测试通过")
@@ -0,0 +1,84 @@
+"""
+变量映射测试
+两条路径声明的 scanf 变量名不同（计数器不同）时，路径2的公式必须被改写成路径1的变量名再比较
+"""
+
+from semantic_equivalence_analyzer import EnhancedConstraintChecker, ParsedFormulaStore
+from formula_normalization import FormulaNormalizer
+
+def make_path(file_name, var_name, bound):
+    return {
+        'file': file_name,
+        'variables': {var_name: 32},
+        'constraints': [f"(bvult {var_name} #x{bound:08x})"],
+        'witness': {}
+    }
+
+def make_checker():
+    checker = EnhancedConstraintChecker()
+    checker.formula_store = ParsedFormulaStore(checker)
+    return checker
+
+def test_mapped_formula_uses_path1_names():
+    """mapped_formula 应把路径2声明的变量替换为对齐的路径1变量"""
+    checker = make_checker()
+    path1 = make_path('prog1_path_1.txt', 'scanf_0_57_32', 10)
+    path2 = make_path('prog2_path_1.txt', 'scanf_0_91_32', 10)
+
+    var_mapping = checker.create_variable_mapping(path1['variables'], path2['variables'])
+    assert var_mapping == {'scanf_0_57_32': 'scanf_0_91_32'}
+
+    mapped = str(checker.formula_store.mapped_formula(path2, var_mapping))
+    assert 'scanf_0_57_32' in mapped
+    assert 'scanf_0_91_32' not in mapped
+
+def test_stored_check_with_differing_names():
+    """声明名不同但对齐后相同的约束应判定为等价，不同的约束应给出反例"""
+    checker = make_checker()
+    path1 = make_path('prog1_path_1.txt', 'scanf_0_57_32', 10)
+    same = make_path('prog2_path_1.txt', 'scanf_0_91_32', 10)
+    different = make_path('prog2_path_2.txt', 'scanf_0_92_32', 11)
+
+    for path2, expected in ((same, "equivalent"), (different, "not_equivalent")):
+        var_mapping = checker.create_variable_mapping(path1['variables'], path2['variables'])
+        verdict, details = checker.check_stored_equivalence(path1, path2, var_mapping)
+        assert verdict == expected, details
+
+def two_variable_path(file_name, first, second):
+    return {
+        'file': file_name,
+        'variables': {first: 32, second: 32},
+        'constraints': [f"(bvult {first} #x0000000a)", f"(bvugt {second} {first})"],
+        'witness': {}
+    }
+
+def test_renamed_pair_verdict_independent_of_normalization():
+    """重命名后的路径对，开启与关闭结构归一化（--no-normalize）应得到相同结论"""
+    path1 = two_variable_path('prog1_path_1.txt', 'scanf_0_57_32', 'scanf_1_58_32')
+    renamed = two_variable_path('prog2_path_1.txt', 'scanf_0_91_32', 'scanf_1_92_32')
+    # 同构但变量角色互换：结构哈希相同，对齐后并不等价
+    swapped = two_variable_path('prog2_path_2.txt', 'scanf_1_92_32', 'scanf_0_91_32')
+
+    for path2, expected in ((renamed, "equivalent"), (swapped, "not_equivalent")):
+        verdicts = []
+        for normalize in (True, False):
+            for stored in (True, False):
+                checker = make_checker() if stored else EnhancedConstraintChecker()
+                if normalize:
+                    checker.normalizer = FormulaNormalizer()
+                var_mapping = checker.create_variable_mapping(path1['variables'], path2['variables'])
+                if stored:
+                    verdict, _ = checker.check_stored_equivalence(path1, path2, var_mapping)
+                else:
+                    verdict, _ = checker.check_constraint_equivalence(
+                        path1['constraints'], path2['constraints'],
+                        path1['variables'], path2['variables'], var_mapping
+                    )
+                verdicts.append(verdict)
+        assert verdicts == [expected] * 4, (path2['file'], verdicts)
+
+if __name__ == "__main__":
+    test_mapped_formula_uses_path1_names()
+    test_stored_check_with_differing_names()
+    test_renamed_pair_verdict_independent_of_normalization()
+    print("变量映射测试通过")